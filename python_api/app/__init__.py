@@ -2,11 +2,43 @@
 Initialize the Financial Advisor API application.
 This module sets up the FastAPI application and includes all routers.
 """
+import math
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from .api import users, documents, chat, financial_data, news, analysis
+from .api import users, documents, chat, financial_data, news, analysis, tax
+from .services.news_index import start_news_index, stop_news_index
+from .services.news_ingest import start_news_ingestion, stop_news_ingestion
+from .services.monte_carlo import shutdown_simulation_pool
+from .services.news_search import close_news_client
+from .services.passwords import shutdown_password_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background news indexing and ingestion, and release shared resources on shutdown."""
+    start_news_index()
+    start_news_ingestion()
+    yield
+    await stop_news_ingestion()
+    stop_news_index()
+    await close_news_client()
+    shutdown_password_pool()
+    shutdown_simulation_pool()
+
+def _json_safe(value):
+    """Replace non-finite floats (which JSON cannot encode) with their string form."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    return value
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
@@ -14,6 +46,7 @@ def create_app() -> FastAPI:
         title="Financial Advisor API",
         description="API for financial analysis and document processing with AI capabilities",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     # Configure CORS
@@ -25,6 +58,14 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    @app.exception_handler(RequestValidationError)
+    async def validation_exception_handler(request: Request, exc: RequestValidationError):
+        """422 with the validation errors, as by default, but encodable when a rejected input is inf or NaN."""
+        return JSONResponse(
+            status_code=422,
+            content={"detail": _json_safe(jsonable_encoder(exc.errors()))},
+        )
+
     # Include routers
     app.include_router(users.router, prefix="/api/users", tags=["users"])
     app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
@@ -32,6 +73,7 @@ def create_app() -> FastAPI:
     app.include_router(financial_data.router, prefix="/api/financial-data", tags=["financial-data"])
     app.include_router(news.router, prefix="/api/news", tags=["news"])
     app.include_router(analysis.router, prefix="/api/analysis", tags=["analysis"])
+    app.include_router(tax.router, prefix="/api/tax", tags=["tax"])
 
     @app.get("/", tags=["root"])
     async def root():
@@ -6,9 +6,10 @@ from sqlalchemy.orm import Session
 from typing import Dict, Any
 
 from ..schemas.schemas import AnalysisRequest, AnalysisResponse
-from ..models.models import Document, User
+from ..models.models import Document
 from ..database.database import get_db
 from ..utils.langchain_utils import analyze_financial_document
+from ..utils.users import ensure_user_exists
 
 # Create router
 router = APIRouter()
@@ -47,12 +48,7 @@ async def analyze_document(request: AnalysisRequest, analysis_type: str, db: Ses
         )
     
     # Check if user exists and has access to the document
-    user = db.query(User).filter(User.id == request.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    ensure_user_exists(db, request.user_id)
     
     if document.user_id != request.user_id:
         raise HTTPException(
@@ -1,14 +1,19 @@
 """
 API routes for chat messages and AI-powered conversations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from ..schemas.schemas import ChatMessageCreate, ChatMessageResponse
-from ..models.models import ChatMessage, User
-from ..database.database import get_db
+from ..schemas.schemas import ChatMessageCreate, ChatMessageResponse, ChatMessageSyncResponse
+from ..models.models import ChatMessage
+from ..database.database import get_db, get_read_db
+from ..services.sync import sync_changes
+from ..services.exports import EXPORT_FORMATS, CHAT_COLUMNS, chat_export_query, stream_export, accepts_gzip, export_headers
 from ..utils.langchain_utils import generate_chat_response
+from ..utils.etag import user_etag, not_modified
+from ..utils.users import ensure_user_exists, user_data_version
 
 # Create router
 router = APIRouter()
@@ -19,12 +24,7 @@ async def create_chat_message(message: ChatMessageCreate, db: Session = Depends(
     Create a new chat message and generate a response.
     """
     # Check if user exists
-    db_user = db.query(User).filter(User.id == message.user_id).first()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    ensure_user_exists(db, message.user_id)
     
     # Create user message in database
     db_message = ChatMessage(
@@ -94,19 +94,21 @@ async def create_chat_message(message: ChatMessageCreate, db: Session = Depends(
 @router.get("/user/{user_id}", response_model=List[ChatMessageResponse])
 def get_user_chat_history(
     user_id: int, 
+    request: Request,
+    response: Response,
     limit: Optional[int] = 20,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get chat history for a specific user.
+    Supports If-None-Match with the returned ETag.
     """
-    # Check if user exists
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    version = user_data_version(db, user_id)
+    
+    etag = user_etag(request, user_id, version)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
     # Get chat messages
     messages = db.query(ChatMessage)\
@@ -115,4 +117,40 @@ def get_user_chat_history(
         .limit(limit)\
         .all()
     
-    return messages
\ No newline at end of file
+    return messages
+
+@router.get("/export/{user_id}")
+def export_chat_history(
+    user_id: int,
+    request: Request,
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Export a user's full chat history as NDJSON or CSV, streamed oldest first.
+    The response is gzip-encoded when the client accepts it.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    compress = accepts_gzip(request.headers.get("accept-encoding"))
+    return StreamingResponse(
+        stream_export(chat_export_query(user_id), CHAT_COLUMNS, format, user_id, compress),
+        media_type=EXPORT_FORMATS[format],
+        headers=export_headers("chat_history", user_id, format, compress)
+    )
+
+@router.get("/sync/{user_id}", response_model=ChatMessageSyncResponse)
+def sync_chat_history(
+    user_id: int,
+    since: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Delta sync of a user's chat messages: rows created or updated after the since
+    cursor plus the ids deleted after it. Omit since for a full sync, and send the
+    returned cursor next time.
+    """
+    version = user_data_version(db, user_id)
+    
+    return sync_changes(db, ChatMessage, user_id, version, since)
\ No newline at end of file
@@ -1,19 +1,22 @@
 """
 API routes for document management and analysis.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Query, Request, Response
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from typing import List, Optional
 import base64
 import os
 import json
 from datetime import datetime
 
-from ..schemas.schemas import DocumentCreate, DocumentResponse, DocumentUpdate
-from ..models.models import Document, User
-from ..database.database import get_db
+from ..schemas.schemas import DocumentCreate, DocumentResponse, DocumentUpdate, DocumentSyncResponse
+from ..models.models import Document
+from ..database.database import get_db, get_read_db
+from ..services.sync import sync_changes
 from ..utils.pdf_utils import extract_pdf_content, get_pdf_data_url
+from ..utils.etag import user_etag, not_modified
+from ..utils.users import ensure_user_exists, user_data_version
 
 # Create router
 router = APIRouter()
@@ -35,12 +38,7 @@ async def create_document(
     Only PDF files are supported.
     """
     # Check if user exists
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    ensure_user_exists(db, user_id)
     
     # Validate file type (only PDF for now)
     if not file.filename.lower().endswith('.pdf'):
@@ -96,19 +94,21 @@ def get_document(document_id: int, db: Session = Depends(get_db)):
 @router.get("/user/{user_id}", response_model=List[DocumentResponse])
 def get_user_documents(
     user_id: int, 
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all documents for a specific user, optionally filtered by category.
+    Supports If-None-Match with the returned ETag.
     """
-    # Check if user exists
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    version = user_data_version(db, user_id)
+    
+    etag = user_etag(request, user_id, version)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
     # Query documents
     query = db.query(Document).filter(Document.user_id == user_id)
@@ -227,4 +227,19 @@ def get_document_data_url(document_id: int, db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating data URL: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/sync/{user_id}", response_model=DocumentSyncResponse)
+def sync_user_documents(
+    user_id: int,
+    since: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Delta sync of a user's documents: rows created or updated after the since
+    cursor plus the ids deleted after it. Omit since for a full sync, and send the
+    returned cursor next time.
+    """
+    version = user_data_version(db, user_id)
+    
+    return sync_changes(db, Document, user_id, version, since, [defer(Document.content_base64)])
\ No newline at end of file
@@ -2,15 +2,29 @@
 API routes for financial data management.
 All financial data is in INR currency.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-import json
+from typing import List, Optional
+from datetime import date, datetime
+import io
 
-from ..schemas.schemas import FinancialDataCreate, FinancialDataResponse, FinancialDataUpdate, FinancialSummary
-from ..models.models import FinancialData, User
-from ..database.database import get_db
+from ..schemas.schemas import FinancialDataCreate, FinancialDataResponse, FinancialDataUpdate, FinancialSummary, FinancialDataImportResult, FinancialRollup, CashFlowProjection, SimulationRequest, SimulationResult, PortfolioReturnsRequest, PortfolioReturns, ExpenseAnomalyResponse, FinancialSummaryBatchRequest, FinancialDataSyncResponse
+from ..models.models import FinancialData
+from ..database.database import get_db, get_read_db, mark_user_write
+from ..services.financial_summary import compute_financial_summary, stream_financial_summaries
+from ..services.financial_aggregates import add_financial_data, remove_financial_data, get_type_totals
+from ..services.financial_rollups import get_rollup
+from ..services.cash_flow_projection import compute_projection
+from ..services.monte_carlo import run_simulation
+from ..services.portfolio_returns import compute_portfolio_returns
+from ..services.anomaly_detection import run_anomaly_detection, get_user_anomalies
+from ..services.financial_import import import_financial_records, iter_csv_records, iter_ndjson_records
+from ..services.sync import sync_changes
+from ..services.exports import EXPORT_FORMATS, FINANCIAL_DATA_COLUMNS, financial_data_export_query, stream_export, accepts_gzip, export_headers
+from ..utils.pagination import encode_cursor, before_cursor
+from ..utils.etag import user_etag, not_modified
+from ..utils.users import ensure_user_exists, user_data_version
 
 # Create router
 router = APIRouter()
@@ -21,12 +35,7 @@ def create_financial_data(data: FinancialDataCreate, db: Session = Depends(get_d
     Create a new financial data entry.
     """
     # Check if user exists
-    db_user = db.query(User).filter(User.id == data.user_id).first()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    ensure_user_exists(db, data.user_id)
     
     # Create database record
     db_data = FinancialData(
@@ -41,28 +50,66 @@ def create_financial_data(data: FinancialDataCreate, db: Session = Depends(get_d
     )
     
     db.add(db_data)
+    add_financial_data(db, db_data)
     db.commit()
     db.refresh(db_data)
     
     return db_data
 
+@router.post("/import/{user_id}", response_model=FinancialDataImportResult)
+def import_financial_data(
+    user_id: int,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import financial data for a user from a CSV or NDJSON bank statement.
+    Columns/keys: category, type, amount, date, description, recurring, frequency.
+    The format is taken from the file extension unless given explicitly.
+    Invalid rows are skipped and reported; valid rows are committed in chunks.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            format = "csv"
+        elif filename.endswith((".ndjson", ".jsonl", ".json")):
+            format = "ndjson"
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only CSV and NDJSON files are supported"
+            )
+    
+    # Stream the spooled upload line by line instead of reading it into memory; bytes that
+    # are not UTF-8 are kept as surrogate escapes so their rows fail alone, after earlier chunks are committed
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    records = iter_csv_records(lines) if format == "csv" else iter_ndjson_records(lines)
+    
+    return import_financial_records(db, user_id, records)
+
 @router.get("/user/{user_id}", response_model=List[FinancialDataResponse])
 def get_user_financial_data(
     user_id: int, 
+    response: Response,
     category: Optional[str] = None,
     type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get financial data for a specific user, optionally filtered by category and/or type.
+    Get financial data for a specific user, newest first, optionally filtered by
+    category, type and date range. Results are paginated: when more rows exist,
+    the X-Next-Cursor header holds the cursor for the next page.
     """
     # Check if user exists
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    ensure_user_exists(db, user_id)
     
     # Query financial data
     query = db.query(FinancialData).filter(FinancialData.user_id == user_id)
@@ -73,7 +120,53 @@ def get_user_financial_data(
     if type:
         query = query.filter(FinancialData.type == type)
     
-    return query.all()
+    if start_date:
+        query = query.filter(FinancialData.date >= start_date)
+    
+    if end_date:
+        query = query.filter(FinancialData.date <= end_date)
+    
+    if cursor:
+        try:
+            query = query.filter(before_cursor(FinancialData.date, FinancialData.id, cursor))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(FinancialData.date.desc(), FinancialData.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].date, rows[-1].id)
+    
+    return rows
+
+@router.get("/export/{user_id}")
+def export_financial_data(
+    user_id: int,
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    category: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Export all of a user's financial data as CSV or NDJSON, streamed in date order.
+    The response is gzip-encoded when the client accepts it.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    compress = accepts_gzip(request.headers.get("accept-encoding"))
+    query = financial_data_export_query(user_id, category, start_date, end_date)
+    return StreamingResponse(
+        stream_export(query, FINANCIAL_DATA_COLUMNS, format, user_id, compress),
+        media_type=EXPORT_FORMATS[format],
+        headers=export_headers("financial_data", user_id, format, compress)
+    )
 
 @router.get("/{data_id}", response_model=FinancialDataResponse)
 def get_financial_data(data_id: int, db: Session = Depends(get_db)):
@@ -97,16 +190,18 @@ def update_financial_data(
     """
     Update a financial data entry.
     """
-    db_data = db.query(FinancialData).filter(FinancialData.id == data_id).first()
+    db_data = db.query(FinancialData).filter(FinancialData.id == data_id).with_for_update().first()
     if not db_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Financial data not found"
         )
     
-    # Update fields if provided
+    # Update fields if provided, moving the row's contribution between aggregates
+    remove_financial_data(db, db_data)
     for key, value in data_update.dict(exclude_unset=True).items():
         setattr(db_data, key, value)
+    add_financial_data(db, db_data)
     
     db.commit()
     db.refresh(db_data)
@@ -118,159 +213,188 @@ def delete_financial_data(data_id: int, db: Session = Depends(get_db)):
     """
     Delete a financial data entry.
     """
-    db_data = db.query(FinancialData).filter(FinancialData.id == data_id).first()
+    db_data = db.query(FinancialData).filter(FinancialData.id == data_id).with_for_update().first()
     if not db_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Financial data not found"
         )
     
+    remove_financial_data(db, db_data)
     db.delete(db_data)
     db.commit()
     
     return None
 
+@router.post("/summary/batch")
+def get_financial_summaries(request: FinancialSummaryBatchRequest):
+    """
+    Get financial summaries for many users (e.g. an advisor's clients), or for
+    all users when user_ids is omitted. Streams NDJSON lines of
+    {"user_id": ..., "summary": {...}}; unknown users get a null summary.
+    """
+    return StreamingResponse(
+        stream_financial_summaries(request.user_ids),
+        media_type="application/x-ndjson"
+    )
+
 @router.get("/summary/{user_id}", response_model=FinancialSummary)
-def get_financial_summary(user_id: int, db: Session = Depends(get_db)):
+def get_financial_summary(user_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """
     Get a summary of financial data for a user (income, expenses, investments, assets, liabilities).
-    All values are in INR.
+    All values are in INR. Supports If-None-Match with the returned ETag.
+    """
+    version = user_data_version(db, user_id)
+    
+    # The monthly figures cover the last 30 days, so the tag also changes daily
+    etag = user_etag(request, user_id, version, valid_on=date.today())
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    return compute_financial_summary(db, user_id)
+
+
+@router.get("/rollup/{user_id}", response_model=FinancialRollup)
+def get_financial_rollup(
+    user_id: int,
+    period: str = Query("month", pattern="^(month|quarter|fy)$"),
+    category: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get income/expense trends for a user as per-(category, type) series.
+    Periods are calendar months, financial-year quarters (Q1 = April-June)
+    or financial years (April-March). All values are in INR.
     """
     # Check if user exists
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
+    ensure_user_exists(db, user_id)
+    
+    return get_rollup(db, user_id, period, category)
+
+
+@router.get("/projection/{user_id}", response_model=CashFlowProjection)
+def get_cash_flow_projection(
+    user_id: int,
+    years: int = Query(10, ge=1, le=50),
+    inflation: float = Query(0.06, ge=0, le=1),
+    salary_growth: float = Query(0.08, ge=0, le=1),
+    investment_return: float = Query(0.10, gt=-1, le=1),
+    opening_balance: Optional[float] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Project a user's recurring income, expenses and investments month by month.
+    Income grows with salary_growth, expenses with inflation, and the invested
+    corpus compounds at investment_return (all annual rates). The opening cash
+    balance defaults to the user's net worth. All values are in INR.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    return compute_projection(db, user_id, years, inflation, salary_growth, investment_return, opening_balance)
+
+
+@router.post("/simulation/{user_id}", response_model=SimulationResult)
+def simulate_goal(user_id: int, request: SimulationRequest, db: Session = Depends(get_db)):
+    """
+    Run a Monte Carlo simulation of a retirement or goal corpus.
+    The allocation defaults to the user's investment allocation (equity, debt,
+    gold, PPF/EPF/NPS, ...) and the initial corpus to their total investments.
+    Returns the probability of reaching the target and yearly percentile bands.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    investment_allocation = {
+        type_: total
+        for (category, type_), (total, _count) in get_type_totals(db, user_id).items()
+        if category == "investment"
+    }
+    allocation = request.allocation or investment_allocation
+    if not any(amount > 0 for amount in allocation.values()):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No investment allocation to simulate"
         )
     
-    # Get all financial data for the user
-    financial_data = db.query(FinancialData).filter(FinancialData.user_id == user_id).all()
-    
-    # Initialize summaries
-    total_income = 0.0
-    total_expenses = 0.0
-    total_investments = 0.0
-    total_assets = 0.0
-    total_liabilities = 0.0
-    income_breakdown = {}
-    expense_breakdown = {}
-    investment_allocation = {}
-    
-    # Calculate monthly numbers (for last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    monthly_income = 0.0
-    monthly_expenses = 0.0
-    
-    # Process financial data
-    for data in financial_data:
-        # Handle data based on category
-        if data.category == "income":
-            total_income += data.amount
-            
-            # Add to income breakdown
-            if data.type in income_breakdown:
-                income_breakdown[data.type] += data.amount
-            else:
-                income_breakdown[data.type] = data.amount
-                
-            # Add to monthly income if within last 30 days
-            if data.date >= thirty_days_ago:
-                monthly_income += data.amount
-                
-        elif data.category == "expense":
-            total_expenses += data.amount
-            
-            # Add to expense breakdown
-            if data.type in expense_breakdown:
-                expense_breakdown[data.type] += data.amount
-            else:
-                expense_breakdown[data.type] = data.amount
-                
-            # Add to monthly expenses if within last 30 days
-            if data.date >= thirty_days_ago:
-                monthly_expenses += data.amount
-                
-        elif data.category == "investment":
-            total_investments += data.amount
-            
-            # Add to investment allocation
-            if data.type in investment_allocation:
-                investment_allocation[data.type] += data.amount
-            else:
-                investment_allocation[data.type] = data.amount
-                
-        elif data.category == "asset":
-            total_assets += data.amount
-            
-        elif data.category == "liability":
-            total_liabilities += data.amount
-    
-    # Calculate monthly savings
-    monthly_savings = monthly_income - monthly_expenses
-    
-    # Calculate yearly savings (estimated)
-    yearly_savings = monthly_savings * 12
-    
-    # Calculate net worth
-    net_worth = total_assets - total_liabilities
-    
-    # Determine emergency fund status
-    monthly_expenses_average = monthly_expenses
-    if monthly_expenses_average > 0:
-        emergency_fund_ratio = total_assets / monthly_expenses_average
-        if emergency_fund_ratio >= 6:
-            emergency_fund_status = "Excellent"
-        elif emergency_fund_ratio >= 3:
-            emergency_fund_status = "Good"
-        elif emergency_fund_ratio >= 1:
-            emergency_fund_status = "Needs improvement"
-        else:
-            emergency_fund_status = "Critical"
-    else:
-        emergency_fund_status = "Unknown"
-    
-    # Estimate tax based on Indian tax slabs (simplified)
-    # This is a simplified calculation for illustrative purposes
-    # In a real app, this would be much more complex
-    if total_income <= 250000:  # Up to 2.5 lakhs
-        tax_estimate = 0
-    elif total_income <= 500000:  # 2.5 to 5 lakhs
-        tax_estimate = (total_income - 250000) * 0.05
-    elif total_income <= 750000:  # 5 to 7.5 lakhs
-        tax_estimate = 12500 + (total_income - 500000) * 0.10
-    elif total_income <= 1000000:  # 7.5 to 10 lakhs
-        tax_estimate = 37500 + (total_income - 750000) * 0.15
-    elif total_income <= 1250000:  # 10 to 12.5 lakhs
-        tax_estimate = 75000 + (total_income - 1000000) * 0.20
-    elif total_income <= 1500000:  # 12.5 to 15 lakhs
-        tax_estimate = 125000 + (total_income - 1250000) * 0.25
-    else:  # Above 15 lakhs
-        tax_estimate = 187500 + (total_income - 1500000) * 0.30
-    
-    # Estimate standard Indian investment contributions
-    # These are simplified calculations
-    ppf_contribution = min(total_income * 0.1, 150000)  # 10% of income up to 1.5 lakhs
-    epf_contribution = total_income * 0.12  # 12% of salary
-    nps_contribution = total_income * 0.1  # 10% of salary
-    insurance_premium = total_income * 0.05  # 5% of income
-    
-    return FinancialSummary(
-        total_income=total_income,
-        total_expenses=total_expenses,
-        total_investments=total_investments,
-        total_assets=total_assets,
-        total_liabilities=total_liabilities,
-        net_worth=net_worth,
-        monthly_savings=monthly_savings,
-        yearly_savings=yearly_savings,
-        emergency_fund_status=emergency_fund_status,
-        investment_allocation=investment_allocation,
-        expense_breakdown=expense_breakdown,
-        income_breakdown=income_breakdown,
-        tax_estimate=tax_estimate,
-        ppf_contribution=ppf_contribution,
-        epf_contribution=epf_contribution,
-        nps_contribution=nps_contribution,
-        insurance_premium=insurance_premium
-    )
\ No newline at end of file
+    initial_corpus = request.initial_corpus
+    if initial_corpus is None:
+        initial_corpus = sum(investment_allocation.values())
+    
+    return run_simulation(
+        allocation=allocation,
+        target_amount=request.target_amount,
+        years=request.years,
+        initial_corpus=initial_corpus,
+        monthly_contribution=request.monthly_contribution,
+        contribution_growth=request.contribution_growth,
+        paths=request.paths,
+        seed=request.seed,
+        overrides={
+            name.lower(): (assumption.expected_return, assumption.volatility)
+            for name, assumption in request.assumptions.items()
+        },
+    )
+
+
+@router.post("/returns/{user_id}", response_model=PortfolioReturns)
+def get_portfolio_returns(user_id: int, request: PortfolioReturnsRequest, db: Session = Depends(get_read_db)):
+    """
+    Compute XIRR, CAGR and absolute returns per investment type and for the
+    whole portfolio. Investment rows are purchases (negative amounts are
+    redemptions); current_values gives each type's value on the valuation date.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    return compute_portfolio_returns(db, user_id, request.current_values, request.valuation_date)
+
+
+@router.get("/anomalies/{user_id}", response_model=List[ExpenseAnomalyResponse])
+def get_expense_anomalies(
+    user_id: int,
+    kind: Optional[str] = Query(None, pattern="^(spike|duplicate)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get expense anomalies (spikes and duplicate charges) found by the nightly
+    detection run.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    return get_user_anomalies(db, user_id, kind)
+
+@router.post("/anomalies/{user_id}/refresh", response_model=List[ExpenseAnomalyResponse])
+def refresh_expense_anomalies(
+    user_id: int,
+    kind: Optional[str] = Query(None, pattern="^(spike|duplicate)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-run anomaly detection for a user and return the anomalies found.
+    """
+    # Check if user exists
+    ensure_user_exists(db, user_id)
+    
+    run_anomaly_detection(db, [user_id])
+    # The results are written outside the ORM, so pin the user's next reads to the primary explicitly
+    mark_user_write(user_id)
+    
+    return get_user_anomalies(db, user_id, kind)
+
+@router.get("/sync/{user_id}", response_model=FinancialDataSyncResponse)
+def sync_financial_data(
+    user_id: int,
+    since: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Delta sync of a user's financial data: rows created or updated after the since
+    cursor plus the ids deleted after it. Omit since for a full sync, and send the
+    returned cursor next time.
+    """
+    version = user_data_version(db, user_id)
+    
+    return sync_changes(db, FinancialData, user_id, version, since)
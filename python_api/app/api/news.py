@@ -1,67 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
-import pytz
-import os
-import requests
-from dotenv import load_dotenv
 
-from ..database.database import get_db
+from ..database.database import get_db, get_read_db
 from ..models.models import NewsItem
-from ..schemas.schemas import NewsItemCreate, NewsItemResponse, NewsSearchRequest
-
-# Load environment variables
-load_dotenv()
+from ..schemas.schemas import NewsItemCreate, NewsItemResponse, NewsSearchRequest, PersonalizedNewsItemResponse
+from ..services.news_dedup import canonical_url
+from ..services.news_feed import news_feed_page
+from ..services.news_index import search_stored_news
+from ..services.news_ingest import get_news_ingestor
+from ..services.news_personalization import NEWS_FEED_SIZE, get_user_news_feed
+from ..services.news_search import NewsSearchError, cached_search_news, news_search_configured
+from ..services.news_store import store_search_results, upsert_news_items
+from ..utils.users import ensure_user_exists
 
 router = APIRouter()
 
-# Set the timezone to Indian Standard Time
-IST = pytz.timezone('Asia/Kolkata')
-
-# Get API key from environment
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-
 @router.post("/", response_model=NewsItemResponse, status_code=status.HTTP_201_CREATED)
 def create_news_item(news_item: NewsItemCreate, db: Session = Depends(get_db)):
     """
     Create a new news item.
+    An item whose URL is already stored (after canonicalization) is updated instead.
     """
-    db_news_item = NewsItem(
-        title=news_item.title,
-        content=news_item.content,
-        source=news_item.source,
-        url=news_item.url,
-        publish_date=news_item.publish_date,
-        category=news_item.category
-    )
+    url = canonical_url(news_item.url)
+    if url is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="News URL must be an http(s) URL of at most 255 characters"
+        )
     
-    db.add(db_news_item)
-    db.commit()
-    db.refresh(db_news_item)
+    upsert_news_items(db, [news_item.model_dump()], news_item.category)
     
-    return db_news_item
+    return db.query(NewsItem).filter(NewsItem.canonical_url == url).first()
 
 @router.get("/", response_model=List[NewsItemResponse])
 def get_news_items(
-    limit: Optional[int] = 10,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get news items, optionally filtered by category.
+    Get news items, newest first, optionally filtered by category.
+    Near-duplicate stories are returned once, as the first article of their cluster.
+    When more items exist, the X-Next-Cursor header holds the cursor for the next page.
     """
-    query = db.query(NewsItem)
-    
-    if category:
-        query = query.filter(NewsItem.category == category)
-    
-    news_items = query.order_by(NewsItem.publish_date.desc()).limit(limit).all()
+    try:
+        news_items, next_cursor = news_feed_page(db, limit, category, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return news_items
 
 @router.get("/{news_id}", response_model=NewsItemResponse)
-def get_news_item(news_id: int, db: Session = Depends(get_db)):
+def get_news_item(news_id: int, db: Session = Depends(get_read_db)):
     """
     Get a specific news item by ID.
     """
@@ -74,74 +73,103 @@ def get_news_item(news_id: int, db: Session = Depends(get_db)):
     
     return db_news_item
 
-@router.post("/search")
-def search_financial_news(search_request: NewsSearchRequest):
+@router.get("/ingest/status")
+def get_news_ingest_status():
     """
-    Search for financial news using the Tavily API.
+    Get background news ingestion metrics (per-category lag and error rates).
     """
-    if not TAVILY_API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Tavily API key not configured"
-        )
+    ingestor = get_news_ingestor()
+    if ingestor is None:
+        return {"running": False, "categories": {}}
+    
+    return ingestor.status()
+
+@router.get("/feed/{user_id}", response_model=List[PersonalizedNewsItemResponse])
+def get_personalized_news(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=NEWS_FEED_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get a user's personalized news feed, best match first.
+    Feeds are precomputed after ingestion from the user's investment allocation,
+    document categories and chat topics; users without one get the latest news.
+    """
+    ensure_user_exists(db, user_id)
     
-    # Add India-specific context to the query
-    india_query = f"{search_request.query} India finance market NSE BSE"
+    feed = get_user_news_feed(db, user_id, limit)
+    if not feed:
+        news_items, _ = news_feed_page(db, limit)
+        return news_items
+    
+    for news_item, score in feed:
+        news_item.score = score
+    return [news_item for news_item, _ in feed]
+
+@router.post("/search")
+async def search_financial_news(search_request: NewsSearchRequest, background_tasks: BackgroundTasks):
+    """
+    Search financial news, ranking stored articles first.
+    Falls back to the Tavily API when fewer than max_results stored articles match;
+    results are cached, and freshly fetched articles are saved to the news table.
+    """
+    max_results = search_request.max_results or 5
+    results = await run_in_threadpool(search_stored_news, search_request.query, max_results)
+    local_hits = len(results)
+    if local_hits >= max_results or not news_search_configured():
+        return {"results": results, "query": search_request.query, "local_hits": local_hits}
     
     try:
-        # Call Tavily API
-        response = requests.post(
-            "https://api.tavily.com/search",
-            json={
-                "api_key": TAVILY_API_KEY,
-                "query": india_query,
-                "search_depth": "advanced",
-                "max_results": search_request.max_results or 5,
-                "include_domains": ["economictimes.indiatimes.com", "financialexpress.com", "moneycontrol.com", "livemint.com", "businesstoday.in"]
-            }
-        )
-        
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Tavily API error: {response.text}"
-            )
-        
-        data = response.json()
-        
-        # Format results
-        results = []
-        for item in data.get("results", []):
-            results.append({
-                "title": item.get("title", ""),
-                "content": item.get("content", ""),
-                "url": item.get("url", ""),
-                "publish_date": item.get("published_date", datetime.now(IST).isoformat()),
-                "source": item.get("source", ""),
-                "score": item.get("score", 0)
-            })
-        
-        return {"results": results, "query": search_request.query}
-    except Exception as e:
+        result, fetched = await cached_search_news(search_request.query, max_results)
+    except NewsSearchError as e:
+        if results:
+            return {"results": results, "query": search_request.query, "local_hits": local_hits}
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error searching news: {str(e)}"
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT if e.timeout else status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
         )
+    
+    if fetched:
+        background_tasks.add_task(store_search_results, result["results"])
+    seen = {canonical_url(item["url"] or "") for item in results}
+    results += [item for item in result["results"] if canonical_url(item["url"]) not in seen][:max_results - local_hits]
+    return {"results": results, "query": search_request.query, "local_hits": local_hits}
 
 @router.get("/category/{category}")
-def get_news_by_category(category: str, limit: Optional[int] = 5, db: Session = Depends(get_db)):
+async def get_news_by_category(
+    category: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(5, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
     """
-    Get news items by category.
+    Get news items by category, newest first, paginated with the X-Next-Cursor header.
+    Categories refreshed by background ingestion are always read from the database;
+    for others, articles fetched from Tavily are saved under the category, so later reads are served locally.
     """
-    news_items = db.query(NewsItem).filter(NewsItem.category == category).order_by(NewsItem.publish_date.desc()).limit(limit).all()
+    try:
+        news_items, next_cursor = await run_in_threadpool(news_feed_page, db, limit, category, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    if not news_items and TAVILY_API_KEY:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    ingestor = get_news_ingestor()
+    ingested = ingestor is not None and ingestor.tracks(category)
+    if not news_items and not cursor and not ingested and news_search_configured():
         # If no news in database, try to fetch from Tavily API
         try:
-            search_request = NewsSearchRequest(query=f"India {category} finance news", max_results=limit)
-            return search_financial_news(search_request)
-        except Exception:
+            result, fetched = await cached_search_news(f"India {category} finance news", limit)
+        except NewsSearchError:
             # Return empty list if API call fails
             return []
+        if fetched:
+            background_tasks.add_task(store_search_results, result["results"], category)
+        return result
     
     return news_items
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+API routes for Indian income tax calculations.
+All values are in INR.
+"""
+from fastapi import APIRouter, HTTPException, status
+from typing import List
+import numpy as np
+
+from ..schemas.schemas import TaxWhatIfRequest, TaxWhatIfResponse, TaxTableResponse
+from ..services.tax_engine import TAX_TABLES, REGIMES, compare_regimes, default_financial_year
+
+# Create router
+router = APIRouter()
+
+# Upper bound on income x deduction scenarios evaluated in one call
+MAX_SCENARIOS = 200000
+
+@router.get("/tables", response_model=List[TaxTableResponse])
+def get_tax_tables():
+    """
+    List the slab tables available for each financial year and regime.
+    """
+    return [
+        TaxTableResponse(
+            financial_year=financial_year,
+            regime=regime,
+            slabs=[[lower, rate] for lower, rate in table["slabs"]],
+            standard_deduction=table["standard_deduction"],
+            rebate_limit=table["rebate_limit"],
+            max_rebate=table["max_rebate"],
+            allows_deductions=table["allows_deductions"],
+            cess=table["cess"],
+        )
+        for financial_year, regimes in sorted(TAX_TABLES.items())
+        for regime, table in regimes.items()
+    ]
+
+@router.post("/what-if", response_model=TaxWhatIfResponse)
+def tax_what_if(request: TaxWhatIfRequest):
+    """
+    Evaluate every combination of gross income and deduction amount under each
+    requested regime, and report which regime is cheaper for each scenario.
+    Results are indexed as [income][deduction].
+    """
+    financial_year = request.financial_year or default_financial_year()
+    if financial_year not in TAX_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No tax tables for financial year {financial_year}"
+        )
+    
+    unknown = [regime for regime in request.regimes if regime not in REGIMES]
+    if unknown or not request.regimes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Regimes must be chosen from: {', '.join(REGIMES)}"
+        )
+    
+    if len(request.incomes) * len(request.deductions) > MAX_SCENARIOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many scenarios; the limit is {MAX_SCENARIOS} income x deduction combinations"
+        )
+    
+    incomes = np.array(request.incomes, dtype=np.float64)
+    deductions = np.array(request.deductions, dtype=np.float64)
+    results = compare_regimes(incomes[:, None], deductions[None, :], financial_year, request.regimes)
+    
+    # Cheapest regime per scenario (ties go to the first regime listed)
+    regimes = list(results)
+    totals = np.stack([results[regime]["total_tax"] for regime in regimes])
+    best = np.array(regimes)[np.argmin(totals, axis=0)]
+    
+    safe_incomes = np.where(incomes > 0, incomes, 1.0)[:, None]
+    return {
+        "financial_year": financial_year,
+        "incomes": request.incomes,
+        "deductions": request.deductions,
+        "results": {
+            regime: {
+                "taxable_income": result["taxable_income"].round(2).tolist(),
+                "total_tax": result["total_tax"].round(2).tolist(),
+                "effective_rate": (result["total_tax"] / safe_incomes).round(4).tolist(),
+            }
+            for regime, result in results.items()
+        },
+        "best_regime": best.tolist(),
+    }
@@ -1,34 +1,25 @@
 """
 API routes for user management.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from typing import List
+from typing import List, Optional
 
-from ..schemas.schemas import UserCreate, UserResponse, UserUpdate
+from ..schemas.schemas import UserCreate, UserLogin, UserResponse, UserUpdate
 from ..models.models import User
-from ..database.database import get_db
+from ..database.database import get_db, get_read_db
+from ..services.passwords import PasswordHashBusy, hash_password, verify_password
+from ..services.user_deletion import purge_user, remove_user_files
+from ..utils.users import forget_user, remember_user
 
 # Create router
 router = APIRouter()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str):
-    """Generate password hash."""
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str):
-    """Verify password against hash."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    """
-    Create a new user with the given data.
-    """
+def _check_registration(db: Session, user: UserCreate) -> None:
+    """Reject a sign-up whose username or email is taken."""
     # Check if username exists
     db_user = db.query(User).filter(User.username == user.username).first()
     if db_user:
@@ -44,9 +35,9 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # Create user object
-    hashed_password = get_password_hash(user.password)
+
+def _add_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """Store a new user with an already hashed password."""
     db_user = User(
         username=user.username,
         email=user.email,
@@ -55,16 +46,87 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         profile_image=user.profile_image,
         preferences={"theme": "light", "currency": "INR", "notifications": True, "language": "en"}
     )
-    
-    # Add to database
     db.add(db_user)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent sign-up took the username or email while the password was being hashed
+        db.rollback()
+        _check_registration(db, user)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already registered"
+        )
+    db.refresh(db_user)
+    remember_user(db_user.id)
+    return db_user
+
+def _find_login_user(db: Session, username: str) -> Optional[User]:
+    """
+    Look up a user by email when the login contains "@", by username otherwise.
+    Usernames may contain "@" too, so a login that matches no email is tried as a username.
+    """
+    if "@" in username:
+        db_user = db.query(User).filter(User.email == username).first()
+        if db_user is not None:
+            return db_user
+    return db.query(User).filter(User.username == username).first()
+
+def _upgrade_password_hash(db: Session, db_user: User, new_hash: str) -> None:
+    """Replace a user's hash after a successful login, unless the password changed meanwhile."""
+    # A Core update: rehashing is not a change to the user's data, so data_version is left alone
+    db.execute(
+        update(User)
+        .where(User.id == db_user.id, User.password_hash == db_user.password_hash)
+        .values(password_hash=new_hash)
+    )
     db.commit()
     db.refresh(db_user)
+
+@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    """
+    Create a new user with the given data.
+    The password is hashed on the password worker pool, so sign-ups do not hold request threads.
+    """
+    await run_in_threadpool(_check_registration, db, user)
+    
+    try:
+        hashed_password = await hash_password(user.password)
+    except PasswordHashBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    return await run_in_threadpool(_add_user, db, user, hashed_password)
+
+@router.post("/login", response_model=UserResponse)
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+    """
+    Verify a username (or email) and password, and return the user.
+    Stored hashes made with outdated cost parameters are upgraded on success.
+    """
+    db_user = await run_in_threadpool(_find_login_user, db, credentials.username)
+    try:
+        valid, new_hash = await verify_password(credentials.password, db_user.password_hash if db_user else None)
+    except PasswordHashBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password"
+        )
     
+    if new_hash:
+        await run_in_threadpool(_upgrade_password_hash, db, db_user, new_hash)
     return db_user
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """
     Get a specific user by ID.
     """
@@ -118,8 +180,26 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
     
     return db_user
 
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Delete a user and all of their data.
+    Rows are removed by database cascades in one statement; uploaded files are removed in the background.
+    """
+    file_paths = purge_user(db, user_id)
+    if file_paths is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    forget_user(user_id)
+    background_tasks.add_task(remove_user_files, file_paths)
+    
+    return None
+
 @router.get("/", response_model=List[UserResponse])
-def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """
     Get all users.
     """
@@ -2,10 +2,13 @@
 Database connection and session management for Financial Advisor API.
 """
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.orm import sessionmaker, Session
+from typing import Callable, Generator, List, Optional
+from fastapi import Request
 from dotenv import load_dotenv
 
 # Load environment variables to access database configuration
@@ -17,17 +20,192 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# Optional read replica; when unset all reads go to the primary
+READ_REPLICA_URL = os.environ.get("READ_REPLICA_URL")
+
+# Seconds a user's reads stay on the primary after that user writes
+READ_YOUR_WRITES_WINDOW = float(os.environ.get("READ_YOUR_WRITES_WINDOW", 5))
+
 # Create SQLAlchemy engine and session
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Replica engine and session (falls back to the primary when not configured)
+replica_engine = create_engine(READ_REPLICA_URL) if READ_REPLICA_URL else engine
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only enforces foreign keys, and runs their ON DELETE actions, when enabled per connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+for _engine in {engine, replica_engine}:
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", _enable_sqlite_foreign_keys)
+
 # Create declarative base for models
 Base = declarative_base()
 
+# user_id -> monotonic time of that user's last committed write
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+
+# Callbacks run with a user id after each committed write to that user's data
+_user_write_listeners: List[Callable[[int], None]] = []
+
+def on_user_write(listener: Callable[[int], None]) -> Callable[[int], None]:
+    """Register a callback (e.g. cache invalidation) for committed user writes."""
+    _user_write_listeners.append(listener)
+    return listener
+
+def mark_user_write(user_id: int) -> None:
+    """Pin a user's reads to the primary for the read-your-writes window."""
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now
+        # Drop expired entries so the map only holds recently active users
+        expired = [uid for uid, ts in _recent_writes.items() if now - ts > READ_YOUR_WRITES_WINDOW]
+        for uid in expired:
+            del _recent_writes[uid]
+
+def user_recently_wrote(user_id: int) -> bool:
+    """Check whether a user wrote within the read-your-writes window."""
+    with _recent_writes_lock:
+        ts = _recent_writes.get(user_id)
+    return ts is not None and time.monotonic() - ts <= READ_YOUR_WRITES_WINDOW
+
+def _written_user_ids(session: Session) -> set:
+    """Collect the user ids touched by pending changes in a session."""
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if getattr(obj, "__tablename__", None) == "users":
+            user_id = obj.id
+        else:
+            user_id = getattr(obj, "user_id", None)
+        if user_id is not None:
+            user_ids.add(user_id)
+    return user_ids
+
+def track_user_write(session: Session, user_id: int) -> None:
+    """Record a write made outside the ORM unit of work (e.g. Core bulk inserts)."""
+    session.info.setdefault("written_user_ids", set()).add(user_id)
+
+def reserve_data_version(session: Session, user_id: int) -> int:
+    """
+    Bump a user's data version now rather than at commit and return it, so bulk
+    writes can insert rows already stamped with it. Also tracks the write.
+    Holds the users row lock until the transaction ends.
+    """
+    versions = session.info.setdefault("data_versions", {})
+    if user_id not in versions:
+        users = Base.metadata.tables["users"]
+        versions[user_id] = session.execute(
+            users.update()
+            .where(users.c.id == user_id)
+            .values(data_version=users.c.data_version + 1, updated_at=users.c.updated_at)
+            .returning(users.c.data_version)
+        ).scalar_one()
+    track_user_write(session, user_id)
+    return versions[user_id]
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_written_users(session, flush_context):
+    """Remember which users this transaction wrote to."""
+    session.info.setdefault("written_user_ids", set()).update(_written_user_ids(session))
+
+@event.listens_for(SessionLocal, "before_flush")
+def _mark_synced_changes(session, flush_context, instances):
+    """
+    Clear change_seq on written rows of synced tables so the commit stamps them,
+    and remember deleted rows for tombstones.
+    """
+    for obj in list(session.new) + list(session.dirty):
+        if obj.__table__.info.get("synced"):
+            obj.change_seq = None
+    for obj in session.deleted:
+        if obj.__table__.info.get("synced") and obj.user_id is not None:
+            session.info.setdefault("deleted_rows", []).append((obj.user_id, obj.__tablename__, obj.id))
+
+@event.listens_for(SessionLocal, "before_commit")
+def _bump_data_versions(session):
+    """
+    Bump the data version of every user written in this transaction, atomically
+    with the writes, and stamp the transaction's synced rows and tombstones with it.
+    The users row lock makes each user's versions follow commit order.
+    """
+    session.flush()
+    user_ids = session.info.get("written_user_ids")
+    versions = session.info.pop("data_versions", {})
+    pending = set(user_ids or ()) - set(versions)
+    if pending:
+        users = Base.metadata.tables["users"]
+        versions.update(session.execute(
+            users.update()
+            .where(users.c.id.in_(pending))
+            .values(data_version=users.c.data_version + 1, updated_at=users.c.updated_at)
+            .returning(users.c.id, users.c.data_version)
+        ).all())
+    if not versions:
+        return
+
+    for table in Base.metadata.sorted_tables:
+        if table.info.get("synced"):
+            for user_id, version in versions.items():
+                session.execute(
+                    table.update()
+                    .where(table.c.user_id == user_id, table.c.change_seq.is_(None))
+                    .values(change_seq=version)
+                )
+    tombstones = [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "change_seq": versions[user_id]}
+        for user_id, entity, entity_id in session.info.pop("deleted_rows", [])
+        if user_id in versions
+    ]
+    if tombstones:
+        session.execute(Base.metadata.tables["sync_tombstones"].insert(), tombstones)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _notify_written_users(session):
+    """After commit, stick the written users' reads to the primary and notify listeners."""
+    for user_id in session.info.pop("written_user_ids", set()):
+        mark_user_write(user_id)
+        for listener in _user_write_listeners:
+            listener(user_id)
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_written_users(session, previous_transaction):
+    """Discard tracked users when the outermost transaction is rolled back (not a savepoint)."""
+    if previous_transaction.parent is not None:
+        return
+    session.info.pop("written_user_ids", None)
+    session.info.pop("deleted_rows", None)
+    session.info.pop("data_versions", None)
+
 def get_db() -> Generator:
     """Dependency for database sessions."""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def read_session(user_id: Optional[int] = None) -> Session:
+    """
+    Open a read-only session: the replica, unless the user wrote recently.
+    The caller is responsible for closing it.
+    """
+    use_primary = replica_engine is engine or (user_id is not None and user_recently_wrote(user_id))
+    return SessionLocal() if use_primary else ReplicaSessionLocal()
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Dependency for read-only database sessions.
+    Uses the read replica unless the user in the path wrote recently.
+    """
+    user_id: Optional[str] = request.path_params.get("user_id")
+    db = read_session(int(user_id) if user_id is not None and user_id.isdigit() else None)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -2,8 +2,8 @@
 Database models for Financial Advisor API.
 All models are designed for the Indian context with INR currency.
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Index, LargeBinary, text
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import pytz
 
@@ -24,14 +24,23 @@ class User(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(IST))
     updated_at = Column(DateTime, default=lambda: datetime.now(IST), onupdate=lambda: datetime.now(IST))
     preferences = Column(JSON, nullable=True)  # Store user preferences as JSON
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every write to the user's data
 
-    # Relationships
-    documents = relationship("Document", back_populates="user", cascade="all, delete-orphan")
-    chat_messages = relationship("ChatMessage", back_populates="user", cascade="all, delete-orphan")
-    financial_data = relationship("FinancialData", back_populates="user", cascade="all, delete-orphan")
+    # Relationships; child rows are deleted by ON DELETE CASCADE, so deleting a user loads none of them
+    documents = relationship("Document", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    chat_messages = relationship("ChatMessage", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    financial_data = relationship("FinancialData", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    financial_aggregates = relationship("FinancialAggregate", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    expense_anomalies = relationship("ExpenseAnomaly", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    sync_tombstones = relationship("SyncTombstone", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    news_feed = relationship("UserNewsFeed", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_user_change_seq", "user_id", "change_seq"),
+        {"info": {"synced": True}},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255))
@@ -40,27 +49,40 @@ class Document(Base):
     file_path = Column(String(255))
     content_base64 = Column(Text, nullable=True)  # For storing small files directly
     upload_date = Column(DateTime, default=lambda: datetime.now(IST))
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     analysis = Column(JSON, nullable=True)  # Store analysis results as JSON
+    change_seq = Column(Integer, nullable=True)  # User's data version when last written; NULL until committed
 
     # Relationships
     user = relationship("User", back_populates="documents")
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_user_change_seq", "user_id", "change_seq"),
+        {"info": {"synced": True}},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     message = Column(Text)
     is_user = Column(Boolean, default=True)
     timestamp = Column(DateTime, default=lambda: datetime.now(IST))
     related_to = Column(String(100), nullable=True)  # Category the message relates to
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    change_seq = Column(Integer, nullable=True)  # User's data version when last written; NULL until committed
 
     # Relationships
     user = relationship("User", back_populates="chat_messages")
 
 class FinancialData(Base):
     __tablename__ = "financial_data"
+    __table_args__ = (
+        # Per-user listings, rollups and date-range scans, with or without a category filter
+        Index("ix_financial_data_user_category_date", "user_id", "category", "date"),
+        Index("ix_financial_data_user_date", "user_id", "date"),
+        Index("ix_financial_data_user_change_seq", "user_id", "change_seq"),
+        {"info": {"synced": True}},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     date = Column(DateTime, default=lambda: datetime.now(IST))
@@ -70,19 +92,108 @@ class FinancialData(Base):
     description = Column(String(255), nullable=True)
     recurring = Column(Boolean, default=False)
     frequency = Column(String(20), nullable=True)  # monthly, quarterly, etc.
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    change_seq = Column(Integer, nullable=True)  # User's data version when last written; NULL until committed
 
     # Relationships
     user = relationship("User", back_populates="financial_data")
 
+class FinancialAggregate(Base):
+    __tablename__ = "financial_aggregates"
+
+    # Running totals per (user, category, type), maintained on every financial data write
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    type = Column(String(50), primary_key=True)
+    total_amount = Column(Float, default=0.0)  # In INR
+    row_count = Column(Integer, default=0)
+
+    # Relationships
+    user = relationship("User", back_populates="financial_aggregates")
+
+class ExpenseAnomaly(Base):
+    __tablename__ = "expense_anomalies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    financial_data_id = Column(Integer, ForeignKey("financial_data.id", ondelete="CASCADE"))
+    kind = Column(String(20))  # spike, duplicate
+    type = Column(String(50))  # Expense type the anomaly was found in
+    amount = Column(Float)  # In INR
+    baseline = Column(Float, nullable=True)  # Rolling median of the type's recent expenses
+    score = Column(Float)  # Robust z-score for spikes, days apart for duplicates
+    date = Column(DateTime)
+    detected_at = Column(DateTime, default=lambda: datetime.now(IST))
+
+    # Relationships
+    user = relationship("User", back_populates="expense_anomalies")
+
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_change_seq", "user_id", "change_seq"),
+    )
+
+    # Deleted rows of synced tables, so delta-sync clients can remove them
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    entity = Column(String(50))  # Table name of the deleted row
+    entity_id = Column(Integer)
+    change_seq = Column(Integer)  # User's data version of the deleting transaction
+    deleted_at = Column(DateTime, default=lambda: datetime.now(IST))
+
+    # Relationships
+    user = relationship("User", back_populates="sync_tombstones")
+
 class NewsItem(Base):
     __tablename__ = "news_items"
+    __table_args__ = (
+        Index("ix_news_items_canonical_url", "canonical_url", unique=True),
+        # Feeds of cluster representatives, newest first, overall and per category
+        Index(
+            "ix_news_items_category_publish_date", "category", "publish_date", "id",
+            sqlite_where=text("cluster_id IS NULL"), postgresql_where=text("cluster_id IS NULL"),
+        ),
+        Index(
+            "ix_news_items_publish_date", "publish_date", "id",
+            sqlite_where=text("cluster_id IS NULL"), postgresql_where=text("cluster_id IS NULL"),
+        ),
+        # Search index refreshes read articles changed since their last pass
+        Index("ix_news_items_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255))
     content = Column(Text)
     source = Column(String(100))
     url = Column(String(255))
-    publish_date = Column(DateTime)
+    publish_date = Column(DateTime)  # Naive UTC
     category = Column(String(50), nullable=True)  # finance, markets, economy, etc.
-    created_at = Column(DateTime, default=lambda: datetime.now(IST))
\ No newline at end of file
+    created_at = Column(DateTime, default=lambda: datetime.now(IST))
+    updated_at = Column(DateTime, default=lambda: datetime.now(IST), onupdate=lambda: datetime.now(IST), nullable=True)
+
+    # Deduplication: canonical_url is unique, near-duplicates point at their cluster's first article
+    canonical_url = Column(String(255), nullable=True)
+    minhash = deferred(Column(LargeBinary, nullable=True))  # MinHash signature of title and content, loaded on access
+    cluster_id = Column(Integer, nullable=True)  # NULL for cluster representatives
+
+class NewsLSHBucket(Base):
+    __tablename__ = "news_lsh_buckets"
+
+    # Banded LSH index over news MinHash signatures, one row per article and band
+    bucket = Column(BigInteger, primary_key=True)
+    news_id = Column(Integer, ForeignKey("news_items.id", ondelete="CASCADE"), primary_key=True)
+
+class UserNewsFeed(Base):
+    __tablename__ = "user_news_feeds"
+
+    # Precomputed personalized feed: a user's top-ranked articles, read by (user_id, rank)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    news_id = Column(Integer, ForeignKey("news_items.id", ondelete="CASCADE"))
+    score = Column(Float)
+    computed_at = Column(DateTime, default=lambda: datetime.now(IST))
+
+    # Relationships
+    user = relationship("User", back_populates="news_feed")
+    news_item = relationship("NewsItem")
\ No newline at end of file
@@ -3,7 +3,7 @@ Pydantic schemas for data validation and serialization.
 All financial data is specified in INR currency.
 """
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any
 from datetime import datetime
 
 
@@ -19,6 +19,11 @@ class UserCreate(UserBase):
     password: str
 
 
+class UserLogin(BaseModel):
+    username: str  # Username or email
+    password: str
+
+
 class UserPreferences(BaseModel):
     theme: Optional[str] = "light"
     currency: str = "INR"
@@ -42,6 +47,13 @@ class UserResponse(UserBase):
         orm_mode = True
 
 
+# Delta sync schemas (items holds rows written since the cursor)
+class SyncResponse(BaseModel):
+    deleted: List[int]
+    cursor: int
+    full: bool
+
+
 # Document related schemas
 class DocumentBase(BaseModel):
     title: str
@@ -77,6 +89,10 @@ class DocumentResponse(DocumentBase):
         orm_mode = True
 
 
+class DocumentSyncResponse(SyncResponse):
+    items: List[DocumentResponse]
+
+
 # Chat related schemas
 class ChatMessageBase(BaseModel):
     message: str
@@ -97,6 +113,10 @@ class ChatMessageResponse(ChatMessageBase):
         orm_mode = True
 
 
+class ChatMessageSyncResponse(SyncResponse):
+    items: List[ChatMessageResponse]
+
+
 # Financial data related schemas
 class FinancialDataBase(BaseModel):
     category: str
@@ -132,6 +152,155 @@ class FinancialDataResponse(FinancialDataBase):
         orm_mode = True
 
 
+class FinancialDataSyncResponse(SyncResponse):
+    items: List[FinancialDataResponse]
+
+
+class FinancialDataImportError(BaseModel):
+    line: int
+    error: str
+
+
+class FinancialDataImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[FinancialDataImportError]
+
+
+class FinancialRollupSeries(BaseModel):
+    category: str
+    type: str
+    values: List[float]
+
+
+class FinancialRollup(BaseModel):
+    period: str
+    buckets: List[str]
+    series: List[FinancialRollupSeries]
+    category_totals: Dict[str, List[float]]
+
+
+class ProjectionAssumptions(BaseModel):
+    inflation: float
+    salary_growth: float
+    investment_return: float
+
+
+class CashFlowProjection(BaseModel):
+    months: List[str]
+    income: List[float]
+    expenses: List[float]
+    investments: List[float]
+    net_cash_flow: List[float]
+    cash_balance: List[float]
+    investment_balance: List[float]
+    opening_balance: float
+    recurring_items: int
+    skipped_items: int
+    assumptions: ProjectionAssumptions
+
+
+class AssetAssumption(BaseModel):
+    expected_return: float = Field(..., gt=-1, le=1)
+    volatility: float = Field(..., ge=0, le=1)
+
+
+class SimulationRequest(BaseModel):
+    target_amount: float = Field(..., gt=0)
+    years: int = Field(20, ge=1, le=60)
+    monthly_contribution: float = Field(0.0, ge=0)
+    contribution_growth: float = Field(0.0, ge=0, le=1)
+    initial_corpus: Optional[float] = Field(None, ge=0)
+    paths: int = Field(10000, ge=1000, le=100000)
+    seed: Optional[int] = None
+    allocation: Optional[Dict[str, float]] = None
+    assumptions: Dict[str, AssetAssumption] = {}
+
+
+class SimulationResult(BaseModel):
+    success_probability: float
+    target_amount: float
+    paths: int
+    years: List[int]
+    percentiles: Dict[str, List[float]]
+    median_final_corpus: float
+    allocation: Dict[str, float]
+    expected_annual_return: float
+    annual_volatility: float
+
+
+class PortfolioReturnsRequest(BaseModel):
+    current_values: Dict[str, float]
+    valuation_date: Optional[datetime] = None
+
+
+class InstrumentReturns(BaseModel):
+    type: str
+    invested: float
+    redeemed: float
+    current_value: float
+    absolute_return: Optional[float] = None
+    cagr: Optional[float] = None
+    xirr: Optional[float] = None
+    first_investment_date: datetime
+
+
+class PortfolioReturns(BaseModel):
+    valuation_date: datetime
+    instruments: List[InstrumentReturns]
+    portfolio: Optional[InstrumentReturns] = None
+    unvalued_types: List[str]
+
+
+class ExpenseAnomalyResponse(BaseModel):
+    id: int
+    user_id: int
+    financial_data_id: int
+    kind: str
+    type: Optional[str] = None
+    amount: float
+    baseline: Optional[float] = None
+    score: float
+    date: datetime
+    detected_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Tax related schemas
+class TaxWhatIfRequest(BaseModel):
+    incomes: List[Annotated[float, Field(ge=0, allow_inf_nan=False)]] = Field(..., min_length=1, max_length=10000)
+    deductions: List[Annotated[float, Field(ge=0, allow_inf_nan=False)]] = Field([0.0], min_length=1, max_length=100)
+    financial_year: Optional[str] = None
+    regimes: List[str] = ["old", "new"]
+
+
+class TaxRegimeResult(BaseModel):
+    taxable_income: List[List[float]]
+    total_tax: List[List[float]]
+    effective_rate: List[List[float]]
+
+
+class TaxWhatIfResponse(BaseModel):
+    financial_year: str
+    incomes: List[float]
+    deductions: List[float]
+    results: Dict[str, TaxRegimeResult]
+    best_regime: List[List[str]]
+
+
+class TaxTableResponse(BaseModel):
+    financial_year: str
+    regime: str
+    slabs: List[List[float]]
+    standard_deduction: float
+    rebate_limit: float
+    max_rebate: float
+    allows_deductions: bool
+    cess: float
+
+
 # News related schemas
 class NewsItemBase(BaseModel):
     title: str
@@ -154,6 +323,10 @@ class NewsItemResponse(NewsItemBase):
         orm_mode = True
 
 
+class PersonalizedNewsItemResponse(NewsItemResponse):
+    score: Optional[float] = None
+
+
 # Analysis related schemas
 class NewsSearchRequest(BaseModel):
     query: str
@@ -190,4 +363,8 @@ class FinancialSummary(BaseModel):
     ppf_contribution: float
     epf_contribution: float
     nps_contribution: float
-    insurance_premium: float
\ No newline at end of file
+    insurance_premium: float
+
+
+class FinancialSummaryBatchRequest(BaseModel):
+    user_ids: Optional[List[int]] = Field(None, max_length=50000)
\ No newline at end of file
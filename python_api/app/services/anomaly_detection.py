@@ -0,0 +1,175 @@
+"""
+Batch anomaly detection over expense history.
+Expenses are processed as columnar NumPy arrays grouped by (user, type):
+spikes are flagged with a robust z-score against the rolling median/MAD of
+the type's previous expenses, and duplicates are repeated charges of the same
+type and amount within a few days. Rows are streamed from the database one
+batch of users at a time.
+"""
+import warnings
+import numpy as np
+from datetime import datetime
+from sqlalchemy import select, delete, insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional
+
+from ..models.models import ExpenseAnomaly, FinancialData, User
+
+SPIKE_WINDOW = 12  # Previous expenses of the same type used as the baseline
+SPIKE_MIN_HISTORY = 5
+SPIKE_THRESHOLD = 3.5  # Robust z-score (Iglewicz and Hoaglin)
+MAD_FLOOR_RATIO = 0.05  # Keeps fixed-amount types (rent, EMIs) from flagging every rupee of change
+DUPLICATE_DAYS = 3
+USERS_PER_BATCH = 500
+STREAM_ROWS = 10000
+
+def detect_anomalies(
+    user_ids: np.ndarray,
+    type_codes: np.ndarray,
+    days: np.ndarray,
+    amounts: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Flag spikes and duplicates in flat expense arrays (any number of users).
+    Returns the positions of flagged rows in the input arrays with their kind,
+    score and baseline.
+    """
+    count = len(amounts)
+    if count == 0:
+        empty = np.empty(0)
+        return {"index": empty.astype(np.int64), "kind": empty.astype(object), "score": empty, "baseline": empty}
+
+    # Spikes: order by (user, type, date) and compare each expense with its predecessors
+    order = np.lexsort((days, type_codes, user_ids))
+    sorted_users, sorted_types, sorted_amounts = user_ids[order], type_codes[order], amounts[order]
+    new_group = np.ones(count, dtype=bool)
+    new_group[1:] = (sorted_users[1:] != sorted_users[:-1]) | (sorted_types[1:] != sorted_types[:-1])
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(count), 0))
+
+    positions = np.arange(count)[:, None] - np.arange(SPIKE_WINDOW, 0, -1)[None, :]
+    in_group = positions >= group_start[:, None]
+    window = np.where(in_group, sorted_amounts[np.clip(positions, 0, None)], np.nan)
+    history = in_group.sum(axis=1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN windows (no history yet)
+        median = np.nanmedian(window, axis=1)
+        mad = np.nanmedian(np.abs(window - median[:, None]), axis=1)
+    mad = np.maximum(mad, MAD_FLOOR_RATIO * np.abs(np.nan_to_num(median)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_score = 0.6745 * (sorted_amounts - median) / mad
+    spike = (history >= SPIKE_MIN_HISTORY) & (mad > 0) & (z_score > SPIKE_THRESHOLD)
+
+    # Duplicates: same user, type and amount within DUPLICATE_DAYS of the previous charge
+    duplicate_order = np.lexsort((days, amounts, type_codes, user_ids))
+    d_users, d_types = user_ids[duplicate_order], type_codes[duplicate_order]
+    d_amounts, d_days = amounts[duplicate_order], days[duplicate_order]
+    gap = np.full(count, np.inf)
+    same_charge = (d_users[1:] == d_users[:-1]) & (d_types[1:] == d_types[:-1]) & (d_amounts[1:] == d_amounts[:-1])
+    gap[1:] = np.where(same_charge, d_days[1:] - d_days[:-1], np.inf)
+    duplicate = gap <= DUPLICATE_DAYS
+
+    spike_index = order[spike]
+    duplicate_index = duplicate_order[duplicate]
+    return {
+        "index": np.concatenate([spike_index, duplicate_index]),
+        "kind": np.array(["spike"] * len(spike_index) + ["duplicate"] * len(duplicate_index), dtype=object),
+        "score": np.concatenate([z_score[spike], gap[duplicate]]),
+        "baseline": np.concatenate([median[spike], np.full(len(duplicate_index), np.nan)]),
+    }
+
+def _stream_expenses(db: Session, user_ids: List[int]) -> Iterator[List]:
+    """
+    Stream a batch of users' expense rows with a server-side cursor, yielding them in
+    chunks of about STREAM_ROWS rows that each hold all of their users' rows.
+    """
+    result = db.execute(select(
+        FinancialData.id,
+        FinancialData.user_id,
+        FinancialData.type,
+        FinancialData.date,
+        FinancialData.amount,
+    ).where(
+        FinancialData.user_id.in_(user_ids),
+        FinancialData.category == "expense",
+        FinancialData.date.isnot(None),
+        FinancialData.amount.isnot(None),
+    ).order_by(FinancialData.user_id).execution_options(yield_per=STREAM_ROWS))
+    pending: List = []
+    for partition in result.partitions():
+        rows = pending + list(partition)
+        # The last user's rows may continue in the next partition, so they wait for it
+        split = len(rows)
+        while split > 0 and rows[split - 1].user_id == rows[-1].user_id:
+            split -= 1
+        if split:
+            yield rows[:split]
+        pending = rows[split:]
+    if pending:
+        yield pending
+
+def _detect_chunk(rows: List, now: datetime) -> List[Dict]:
+    """Detect anomalies in a chunk of expense rows holding all rows of its users."""
+    ids, users, types, dates, amounts = zip(*rows)
+    type_codes: Dict[str, int] = {}
+    result = detect_anomalies(
+        np.array(users, dtype=np.int64),
+        np.fromiter((type_codes.setdefault(type_ or "", len(type_codes)) for type_ in types), dtype=np.int64, count=len(rows)),
+        np.fromiter((date.timestamp() / 86400.0 for date in dates), dtype=np.float64, count=len(rows)),
+        np.array(amounts, dtype=np.float64),
+    )
+    return [
+        {
+            "user_id": users[index],
+            "financial_data_id": ids[index],
+            "kind": kind,
+            "type": types[index],
+            "amount": amounts[index],
+            "baseline": None if np.isnan(baseline) else round(float(baseline), 2),
+            "score": round(float(score), 4),
+            "date": dates[index],
+            "detected_at": now,
+        }
+        for index, kind, score, baseline in zip(result["index"].tolist(), result["kind"], result["score"], result["baseline"])
+    ]
+
+def _process_batch(db: Session, user_ids: List[int]) -> int:
+    """Detect anomalies for a batch of users, chunk by chunk as rows arrive, and replace their stored results."""
+    now = datetime.now()
+    anomalies = []
+    for rows in _stream_expenses(db, user_ids):
+        anomalies.extend(_detect_chunk(rows, now))
+
+    db.execute(delete(ExpenseAnomaly).where(ExpenseAnomaly.user_id.in_(user_ids)))
+    if anomalies:
+        db.execute(insert(ExpenseAnomaly), anomalies)
+    db.commit()
+    return len(anomalies)
+
+def run_anomaly_detection(
+    db: Session,
+    user_ids: Optional[List[int]] = None,
+    users_per_batch: int = USERS_PER_BATCH,
+) -> Dict[str, int]:
+    """
+    Detect anomalies for all users, or the given users, and store the results.
+    Users are processed in batches: each batch's expenses are streamed and analysed
+    a chunk of users at a time, and its results written in one transaction, so
+    memory is bounded by STREAM_ROWS (plus one user's expenses), not the batch size.
+    """
+    if user_ids is None:
+        user_ids = [user_id for (user_id,) in db.execute(select(User.id).order_by(User.id))]
+
+    anomalies_found = 0
+    for start in range(0, len(user_ids), users_per_batch):
+        batch = user_ids[start:start + users_per_batch]
+        anomalies_found += _process_batch(db, batch)
+
+    return {"users": len(user_ids), "anomalies": anomalies_found}
+
+def get_user_anomalies(db: Session, user_id: int, kind: Optional[str] = None) -> List[ExpenseAnomaly]:
+    """Stored anomalies for a user, most recent expense first."""
+    query = db.query(ExpenseAnomaly).filter(ExpenseAnomaly.user_id == user_id)
+    if kind:
+        query = query.filter(ExpenseAnomaly.kind == kind)
+    return query.order_by(ExpenseAnomaly.date.desc()).all()
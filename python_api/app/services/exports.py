@@ -0,0 +1,121 @@
+"""
+Streaming CSV and NDJSON exports of a user's financial data and chat history.
+Rows are read through a server-side cursor in partitions and encoded (and
+optionally gzip-compressed) one partition at a time, so memory stays constant
+regardless of the number of rows exported.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from sqlalchemy import select
+from typing import Dict, Iterator, List, Optional
+
+from ..database.database import read_session
+from ..models.models import ChatMessage, FinancialData
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+STREAM_ROWS = 1000
+
+FINANCIAL_DATA_COLUMNS = ["id", "date", "category", "type", "amount", "description", "recurring", "frequency"]
+CHAT_COLUMNS = ["id", "timestamp", "is_user", "related_to", "message"]
+
+def financial_data_export_query(
+    user_id: int,
+    category: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    """Select a user's financial data in date order, optionally filtered."""
+    query = select(*(getattr(FinancialData, column) for column in FINANCIAL_DATA_COLUMNS))\
+        .where(FinancialData.user_id == user_id)
+    if category:
+        query = query.where(FinancialData.category == category)
+    if start_date:
+        query = query.where(FinancialData.date >= start_date)
+    if end_date:
+        query = query.where(FinancialData.date <= end_date)
+    return query.order_by(FinancialData.date, FinancialData.id)
+
+def chat_export_query(user_id: int):
+    """Select a user's chat history in the order it happened."""
+    return select(*(getattr(ChatMessage, column) for column in CHAT_COLUMNS))\
+        .where(ChatMessage.user_id == user_id)\
+        .order_by(ChatMessage.timestamp, ChatMessage.id)
+
+def _format_value(value):
+    """Render dates as ISO 8601; leave everything else to the encoder."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _encode_csv(rows: List, columns: List[str], header: bool) -> bytes:
+    """Encode a partition of rows as CSV lines."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_format_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+def _encode_ndjson(rows: List, columns: List[str]) -> bytes:
+    """Encode a partition of rows as one JSON object per line."""
+    lines = (
+        json.dumps({column: _format_value(value) for column, value in zip(columns, row)}, ensure_ascii=False)
+        for row in rows
+    )
+    return "".join(line + "\n" for line in lines).encode("utf-8")
+
+def stream_export(
+    query,
+    columns: List[str],
+    format: str,
+    user_id: int,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """
+    Yield an export as encoded byte chunks, one per cursor partition.
+    Opens its own read session so it can outlive the request's dependencies.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    db = read_session(user_id)
+    try:
+        result = db.execute(query.execution_options(yield_per=STREAM_ROWS))
+        header = True
+        for rows in result.partitions():
+            if format == "csv":
+                chunk = _encode_csv(rows, columns, header)
+            else:
+                chunk = _encode_ndjson(rows, columns)
+            header = False
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+        # An empty CSV export still gets its header row
+        if format == "csv" and header:
+            chunk = _encode_csv([], columns, header)
+            yield compressor.compress(chunk) if compressor else chunk
+        if compressor:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Check whether an Accept-Encoding header allows gzip."""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def export_headers(prefix: str, user_id: int, format: str, compress: bool) -> Dict[str, str]:
+    """Response headers for an export download."""
+    filename = f"{prefix}_{user_id}_{datetime.now():%Y%m%d}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return headers
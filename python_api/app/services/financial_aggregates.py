@@ -0,0 +1,116 @@
+"""
+Incrementally maintained per-user financial aggregates.
+Financial data writes apply deltas to the financial_aggregates table in the
+same transaction, so summaries read a handful of rows instead of scanning.
+"""
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+
+from ..models.models import FinancialAggregate, FinancialData
+
+# (category, type) -> (total amount, row count)
+TypeTotals = Dict[Tuple[str, str], Tuple[float, int]]
+
+def apply_financial_delta(db: Session, user_id: int, category: str, type_: Optional[str], amount: float, count: int) -> None:
+    """
+    Add amount and count to a user's (category, type) aggregate.
+    Must be called inside the transaction that writes the financial data.
+    """
+    key = (
+        FinancialAggregate.user_id == user_id,
+        FinancialAggregate.category == category,
+        FinancialAggregate.type == (type_ or ""),
+    )
+    values = {
+        FinancialAggregate.total_amount: FinancialAggregate.total_amount + amount,
+        FinancialAggregate.row_count: FinancialAggregate.row_count + count,
+    }
+
+    # Atomic in-place update; insert the aggregate row the first time a type is seen
+    updated = db.query(FinancialAggregate).filter(*key).update(values, synchronize_session=False)
+    if updated:
+        return
+    try:
+        with db.begin_nested():
+            db.add(FinancialAggregate(
+                user_id=user_id,
+                category=category,
+                type=type_ or "",
+                total_amount=amount,
+                row_count=count,
+            ))
+    except IntegrityError:
+        # A concurrent transaction inserted the row first
+        db.query(FinancialAggregate).filter(*key).update(values, synchronize_session=False)
+
+def add_financial_data(db: Session, data: FinancialData) -> None:
+    """Apply the delta for a newly created financial data row."""
+    apply_financial_delta(db, data.user_id, data.category, data.type, data.amount or 0.0, 1)
+
+def remove_financial_data(db: Session, data: FinancialData) -> None:
+    """Apply the delta for a deleted financial data row."""
+    apply_financial_delta(db, data.user_id, data.category, data.type, -(data.amount or 0.0), -1)
+
+def get_type_totals(db: Session, user_id: int) -> TypeTotals:
+    """Read a user's maintained aggregates."""
+    rows = db.query(
+        FinancialAggregate.category,
+        FinancialAggregate.type,
+        FinancialAggregate.total_amount,
+        FinancialAggregate.row_count,
+    ).filter(
+        FinancialAggregate.user_id == user_id,
+        FinancialAggregate.row_count > 0,
+    ).all()
+    return {(category, type_): (total, count) for category, type_, total, count in rows}
+
+def scan_type_totals(db: Session, user_id: int) -> TypeTotals:
+    """Recompute a user's aggregates from the financial_data table."""
+    rows = db.query(
+        FinancialData.category,
+        FinancialData.type,
+        func.coalesce(func.sum(FinancialData.amount), 0.0),
+        func.count(FinancialData.id),
+    ).filter(
+        FinancialData.user_id == user_id
+    ).group_by(
+        FinancialData.category,
+        FinancialData.type,
+    ).all()
+    return {(category, type_ or ""): (total, count) for category, type_, total, count in rows}
+
+def find_drift(db: Session, user_id: int, tolerance: float = 0.01) -> List[Dict]:
+    """
+    Compare a user's maintained aggregates against a full recomputation.
+    Returns one entry per (category, type) that disagrees.
+    """
+    stored = get_type_totals(db, user_id)
+    actual = scan_type_totals(db, user_id)
+    drift = []
+    for key in sorted(set(stored) | set(actual)):
+        stored_total, stored_count = stored.get(key, (0.0, 0))
+        actual_total, actual_count = actual.get(key, (0.0, 0))
+        if stored_count != actual_count or abs(stored_total - actual_total) > tolerance:
+            drift.append({
+                "category": key[0],
+                "type": key[1],
+                "stored_total": stored_total,
+                "actual_total": actual_total,
+                "stored_count": stored_count,
+                "actual_count": actual_count,
+            })
+    return drift
+
+def rebuild_user_aggregates(db: Session, user_id: int) -> None:
+    """
+    Replace a user's aggregates with a full recomputation.
+    The caller is responsible for committing.
+    """
+    actual = scan_type_totals(db, user_id)
+    db.query(FinancialAggregate).filter(FinancialAggregate.user_id == user_id).delete(synchronize_session=False)
+    db.add_all([
+        FinancialAggregate(user_id=user_id, category=category, type=type_, total_amount=total, row_count=count)
+        for (category, type_), (total, count) in actual.items()
+    ])
@@ -0,0 +1,207 @@
+"""
+Bulk import of financial data from CSV or NDJSON bank statements.
+Rows are validated in batches and written with multi-row INSERTs (COPY on
+PostgreSQL), one transaction per chunk, so a bad row never aborts the import.
+"""
+import csv
+import io
+import json
+import math
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..database.database import reserve_data_version
+from ..models.models import FinancialData
+from .financial_aggregates import apply_financial_delta
+
+IMPORT_COLUMNS = ("user_id", "category", "type", "amount", "date", "description", "recurring", "frequency", "change_seq")
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+_TRUE_VALUES = {"true", "1", "yes", "y"}
+_FALSE_VALUES = {"false", "0", "no", "n", ""}
+_DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%d/%m/%Y %H:%M:%S")
+
+def _parse_date(value) -> datetime:
+    """Parse ISO dates, falling back to the DD/MM/YYYY formats used by Indian bank statements."""
+    if isinstance(value, datetime):
+        return value
+    value = str(value).strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"invalid date '{value}'")
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value or "").strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid boolean '{value}'")
+
+def _text(raw: Dict, field: str, max_length: int) -> Optional[str]:
+    """A stripped text field, or None when empty. Raises ValueError if it is not text or too long."""
+    value = raw.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"invalid {field}")
+    value = str(value).strip()
+    if len(value) > max_length:
+        raise ValueError(f"{field} is longer than {max_length} characters")
+    return value or None
+
+def _undecodable(record: Dict) -> bool:
+    """Whether a record holds bytes that were not valid UTF-8 (decoded with surrogateescape)."""
+    for value in (*record.keys(), *record.values()):
+        if isinstance(value, str):
+            try:
+                value.encode("utf-8")
+            except UnicodeEncodeError:
+                return True
+    return False
+
+def validate_row(raw: Dict, user_id: int, now: datetime) -> Dict:
+    """
+    Validate one raw row and return it as a financial_data insert dict.
+    Raises ValueError describing the first problem found.
+    """
+    category = _text(raw, "category", FinancialData.category.type.length)
+    if not category:
+        raise ValueError("category is required")
+    type_ = _text(raw, "type", FinancialData.type.type.length)
+    if not type_:
+        raise ValueError("type is required")
+
+    amount = raw.get("amount")
+    if amount is None or amount == "":
+        raise ValueError("amount is required")
+    try:
+        amount = float(str(amount).replace(",", "")) if isinstance(amount, str) else float(amount)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid amount '{amount}'")
+    if not math.isfinite(amount):
+        raise ValueError(f"invalid amount '{raw.get('amount')}'")
+
+    date = raw.get("date")
+    description = raw.get("description")
+    # Free text, so it is trimmed to fit rather than rejected
+    description = str(description).strip()[:FinancialData.description.type.length] if description not in (None, "") else None
+    return {
+        "user_id": user_id,
+        "category": category.lower(),
+        "type": type_,
+        "amount": amount,
+        "date": _parse_date(date) if date else now,
+        "description": description or None,
+        "recurring": _parse_bool(raw.get("recurring")),
+        "frequency": _text(raw, "frequency", FinancialData.frequency.type.length),
+    }
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, record) pairs from CSV text with a header row."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        yield reader.line_num, record
+
+def iter_ndjson_records(lines: Iterable[str]) -> Iterator[Tuple[int, Optional[Dict]]]:
+    """Yield (line number, record) pairs from newline-delimited JSON; bad lines yield None."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+def _copy_rows(db: Session, rows: List[Dict]) -> None:
+    """Write rows with PostgreSQL COPY on the session's connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[column] is None else row[column] for column in IMPORT_COLUMNS])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {FinancialData.__tablename__} ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+def _write_chunk(db: Session, user_id: int, rows: List[Dict]) -> None:
+    """Insert a chunk of validated rows and apply their aggregate deltas in one transaction."""
+    version = reserve_data_version(db, user_id)
+    for row in rows:
+        row["change_seq"] = version
+
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, rows)
+    else:
+        db.execute(insert(FinancialData), rows)
+
+    deltas: Dict[Tuple[str, str], List[float]] = {}
+    for row in rows:
+        delta = deltas.setdefault((row["category"], row["type"]), [0.0, 0])
+        delta[0] += row["amount"]
+        delta[1] += 1
+    for (category, type_), (amount, count) in deltas.items():
+        apply_financial_delta(db, user_id, category, type_, amount, count)
+
+    db.commit()
+
+def import_financial_records(
+    db: Session,
+    user_id: int,
+    records: Iterable[Tuple[int, Optional[Dict]]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict:
+    """
+    Validate and insert (line number, record) pairs for a user in chunked transactions.
+    Invalid rows are skipped and reported; valid rows are always imported. Records should be
+    read with errors="surrogateescape", so lines that are not UTF-8 are reported like other bad rows.
+    """
+    now = datetime.now()
+    imported = 0
+    failed = 0
+    errors = []
+    chunk: List[Dict] = []
+
+    for line_number, record in records:
+        try:
+            if record is None:
+                raise ValueError("malformed record")
+            if _undecodable(record):
+                raise ValueError("not valid UTF-8")
+            chunk.append(validate_row(record, user_id, now))
+        except ValueError as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_number, "error": str(e)})
+            continue
+
+        if len(chunk) >= chunk_size:
+            _write_chunk(db, user_id, chunk)
+            imported += len(chunk)
+            chunk = []
+
+    if chunk:
+        _write_chunk(db, user_id, chunk)
+        imported += len(chunk)
+
+    return {"imported": imported, "failed": failed, "errors": errors}
@@ -0,0 +1,136 @@
+"""
+Time-series rollups of a user's financial data.
+Rows are loaded as columnar NumPy arrays and bucketed by month, Indian
+financial-year quarter (Q1 = April-June) or financial year (April-March).
+"""
+import os
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+
+from ..database.database import on_user_write
+from ..models.models import FinancialData
+from ..utils.cache import LRUCache
+
+ROLLUP_PERIODS = ("month", "quarter", "fy")
+
+# One entry per (user_id, period, category), so free-form categories count against the size bound.
+# Entries are dropped whenever the user's data changes; the TTL bounds staleness of rollups read from a lagging replica.
+ROLLUP_CACHE_SIZE = int(os.getenv("ROLLUP_CACHE_SIZE", 4096))
+ROLLUP_CACHE_TTL = float(os.getenv("ROLLUP_CACHE_TTL", 300))
+
+_rollup_cache = LRUCache(ROLLUP_CACHE_SIZE, ROLLUP_CACHE_TTL)
+
+@on_user_write
+def invalidate_rollups(user_id: int) -> None:
+    """Drop cached rollups for a user after a committed write."""
+    _rollup_cache.pop_matching(lambda key: key[0] == user_id)
+
+def load_columns(db: Session, user_id: int, category: Optional[str] = None) -> Dict:
+    """
+    Load a user's date, amount, category and type columns as NumPy arrays.
+    Dates become month numbers (months since 1970-01) and category/type
+    become integer codes into the "categories"/"types" name lists.
+    """
+    query = select(
+        FinancialData.date,
+        FinancialData.amount,
+        FinancialData.category,
+        FinancialData.type,
+    ).where(
+        FinancialData.user_id == user_id,
+        FinancialData.date.isnot(None),
+        FinancialData.amount.isnot(None),
+    )
+    if category:
+        query = query.where(FinancialData.category == category)
+
+    rows = db.execute(query).all()
+    count = len(rows)
+    dates, amounts, categories, types = zip(*rows) if rows else ((), (), (), ())
+    category_codes: Dict[str, int] = {}
+    type_codes: Dict[str, int] = {}
+    return {
+        "month": np.fromiter(((date.year - 1970) * 12 + date.month - 1 for date in dates), dtype=np.int64, count=count),
+        "amount": np.fromiter(amounts, dtype=np.float64, count=count),
+        "category": np.fromiter((category_codes.setdefault(name, len(category_codes)) for name in categories), dtype=np.int64, count=count),
+        "type": np.fromiter((type_codes.setdefault(name or "", len(type_codes)) for name in types), dtype=np.int64, count=count),
+        "categories": list(category_codes),
+        "types": list(type_codes),
+    }
+
+def bucket_index(month_number: np.ndarray, period: str) -> np.ndarray:
+    """
+    Map month numbers (months since 1970-01) to integer bucket ids for the given period.
+    Ids are consecutive, so empty periods between buckets stay visible.
+    """
+    year = month_number // 12 + 1970
+    month = month_number % 12  # 0 = January
+    fy_start = year - (month < 3)
+    if period == "month":
+        return month_number
+    if period == "quarter":
+        return fy_start * 4 + ((month - 3) % 12) // 3
+    if period == "fy":
+        return fy_start
+    raise ValueError(f"Unknown rollup period '{period}'")
+
+def bucket_label(bucket: int, period: str) -> str:
+    """Human-readable label for a bucket id, e.g. 2024-04, FY2024-25 Q1, FY2024-25."""
+    if period == "month":
+        return f"{bucket // 12 + 1970}-{bucket % 12 + 1:02d}"
+    if period == "quarter":
+        fy_start, quarter = divmod(bucket, 4)
+        return f"FY{fy_start}-{(fy_start + 1) % 100:02d} Q{quarter + 1}"
+    return f"FY{bucket}-{(bucket + 1) % 100:02d}"
+
+def rollup_columns(columns: Dict, period: str) -> Dict:
+    """
+    Sum amounts per (category, type) and period bucket without a per-row Python loop.
+    """
+    if period not in ROLLUP_PERIODS:
+        raise ValueError(f"Unknown rollup period '{period}'")
+    if len(columns["amount"]) == 0:
+        return {"period": period, "buckets": [], "series": [], "category_totals": {}}
+
+    buckets = bucket_index(columns["month"], period)
+    first_bucket = int(buckets.min())
+    bucket_count = int(buckets.max()) - first_bucket + 1
+    bucket_offsets = buckets - first_bucket
+
+    # Dense group ids for each distinct (category, type) pair
+    category_names = columns["categories"]
+    type_names = columns["types"]
+    pair_ids, group_ids = np.unique(columns["category"] * len(type_names) + columns["type"], return_inverse=True)
+
+    sums = np.bincount(
+        group_ids * bucket_count + bucket_offsets,
+        weights=columns["amount"],
+        minlength=len(pair_ids) * bucket_count,
+    ).reshape(len(pair_ids), bucket_count)
+
+    series = []
+    category_totals: Dict[str, np.ndarray] = {}
+    for row, pair_id in enumerate(pair_ids):
+        category = category_names[pair_id // len(type_names)]
+        type_ = type_names[pair_id % len(type_names)]
+        series.append({"category": category, "type": type_, "values": sums[row].round(2).tolist()})
+        category_totals[category] = category_totals.get(category, 0.0) + sums[row]
+    series.sort(key=lambda entry: (entry["category"], entry["type"]))
+
+    return {
+        "period": period,
+        "buckets": [bucket_label(first_bucket + offset, period) for offset in range(bucket_count)],
+        "series": series,
+        "category_totals": {category: totals.round(2).tolist() for category, totals in category_totals.items()},
+    }
+
+def get_rollup(db: Session, user_id: int, period: str, category: Optional[str] = None) -> Dict:
+    """Return a user's rollup for a period, computing and caching it on a miss."""
+    key = (user_id, period, category)
+    rollup = _rollup_cache.get(key)
+    if rollup is None:
+        rollup = rollup_columns(load_columns(db, user_id, category), period)
+        _rollup_cache.set(key, rollup)
+    return rollup
@@ -0,0 +1,194 @@
+"""
+Financial summary calculations for Financial Advisor API.
+Totals come from the maintained aggregates; all values are in INR.
+"""
+import json
+from sqlalchemy import func, case, select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from ..database.database import read_session
+from ..models.models import FinancialAggregate, FinancialData, User
+from ..schemas.schemas import FinancialSummary
+from .financial_aggregates import TypeTotals, get_type_totals
+from .tax_engine import compute_tax, estimate_tax
+
+SUMMARY_BATCH_USERS = 1000
+
+def query_recent_totals(db: Session, user_id: int) -> Tuple[float, float]:
+    """
+    Sum a user's income and expenses over the last 30 days in a single query.
+    The rolling window cannot be maintained incrementally, so it stays a date-range scan.
+    """
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    income = case((FinancialData.category == "income", FinancialData.amount), else_=0.0)
+    expense = case((FinancialData.category == "expense", FinancialData.amount), else_=0.0)
+
+    monthly_income, monthly_expenses = db.query(
+        func.coalesce(func.sum(income), 0.0),
+        func.coalesce(func.sum(expense), 0.0),
+    ).filter(
+        FinancialData.user_id == user_id,
+        FinancialData.date >= thirty_days_ago,
+    ).one()
+    return monthly_income, monthly_expenses
+
+def build_financial_summary(
+    type_totals: TypeTotals,
+    monthly_income: float,
+    monthly_expenses: float,
+    tax_estimate: Optional[float] = None,
+) -> FinancialSummary:
+    """
+    Build a FinancialSummary from per-(category, type) totals and last-30-days figures.
+    tax_estimate may be passed in when it was computed for many users at once.
+    """
+    totals = {"income": 0.0, "expense": 0.0, "investment": 0.0, "asset": 0.0, "liability": 0.0}
+    breakdowns: Dict[str, Dict[str, float]] = {"income": {}, "expense": {}, "investment": {}}
+
+    for (category, type_), (total, _count) in type_totals.items():
+        if category not in totals:
+            continue
+        totals[category] += total
+        if category in breakdowns:
+            breakdown = breakdowns[category]
+            breakdown[type_] = breakdown.get(type_, 0.0) + total
+
+    total_income = totals["income"]
+    total_assets = totals["asset"]
+    total_liabilities = totals["liability"]
+
+    # Calculate monthly savings
+    monthly_savings = monthly_income - monthly_expenses
+
+    # Calculate yearly savings (estimated)
+    yearly_savings = monthly_savings * 12
+
+    # Calculate net worth
+    net_worth = total_assets - total_liabilities
+
+    # Determine emergency fund status
+    monthly_expenses_average = monthly_expenses
+    if monthly_expenses_average > 0:
+        emergency_fund_ratio = total_assets / monthly_expenses_average
+        if emergency_fund_ratio >= 6:
+            emergency_fund_status = "Excellent"
+        elif emergency_fund_ratio >= 3:
+            emergency_fund_status = "Good"
+        elif emergency_fund_ratio >= 1:
+            emergency_fund_status = "Needs improvement"
+        else:
+            emergency_fund_status = "Critical"
+    else:
+        emergency_fund_status = "Unknown"
+
+    # Estimate tax under the default (new) regime for the current financial year
+    if tax_estimate is None:
+        tax_estimate = estimate_tax(total_income)
+
+    # Estimate standard Indian investment contributions
+    # These are simplified calculations
+    ppf_contribution = min(total_income * 0.1, 150000)  # 10% of income up to 1.5 lakhs
+    epf_contribution = total_income * 0.12  # 12% of salary
+    nps_contribution = total_income * 0.1  # 10% of salary
+    insurance_premium = total_income * 0.05  # 5% of income
+
+    return FinancialSummary(
+        total_income=total_income,
+        total_expenses=totals["expense"],
+        total_investments=totals["investment"],
+        total_assets=total_assets,
+        total_liabilities=total_liabilities,
+        net_worth=net_worth,
+        monthly_savings=monthly_savings,
+        yearly_savings=yearly_savings,
+        emergency_fund_status=emergency_fund_status,
+        investment_allocation=breakdowns["investment"],
+        expense_breakdown=breakdowns["expense"],
+        income_breakdown=breakdowns["income"],
+        tax_estimate=tax_estimate,
+        ppf_contribution=ppf_contribution,
+        epf_contribution=epf_contribution,
+        nps_contribution=nps_contribution,
+        insurance_premium=insurance_premium
+    )
+
+def compute_financial_summary(db: Session, user_id: int) -> FinancialSummary:
+    """
+    Compute a user's financial summary from the maintained aggregates
+    plus a last-30-days range query.
+    """
+    monthly_income, monthly_expenses = query_recent_totals(db, user_id)
+    return build_financial_summary(get_type_totals(db, user_id), monthly_income, monthly_expenses)
+
+
+def compute_financial_summaries(db: Session, user_ids: List[int]) -> Dict[int, FinancialSummary]:
+    """
+    Compute summaries for a batch of users with one grouped query over the
+    aggregates and one over the last 30 days, plus a single vectorized tax call.
+    Users that do not exist are left out.
+    """
+    existing = set(db.execute(select(User.id).where(User.id.in_(user_ids))).scalars())
+    type_totals: Dict[int, TypeTotals] = {user_id: {} for user_id in existing}
+    for user_id, category, type_, total, count in db.execute(select(
+        FinancialAggregate.user_id,
+        FinancialAggregate.category,
+        FinancialAggregate.type,
+        FinancialAggregate.total_amount,
+        FinancialAggregate.row_count,
+    ).where(
+        FinancialAggregate.user_id.in_(existing),
+        FinancialAggregate.row_count > 0,
+    )):
+        type_totals[user_id][(category, type_)] = (total, count)
+
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    income = case((FinancialData.category == "income", FinancialData.amount), else_=0.0)
+    expense = case((FinancialData.category == "expense", FinancialData.amount), else_=0.0)
+    recent = {
+        user_id: (monthly_income, monthly_expenses)
+        for user_id, monthly_income, monthly_expenses in db.execute(select(
+            FinancialData.user_id,
+            func.coalesce(func.sum(income), 0.0),
+            func.coalesce(func.sum(expense), 0.0),
+        ).where(
+            FinancialData.user_id.in_(existing),
+            FinancialData.date >= thirty_days_ago,
+        ).group_by(FinancialData.user_id))
+    }
+
+    ordered = sorted(existing)
+    total_incomes = [
+        sum(total for (category, _type), (total, _count) in type_totals[user_id].items() if category == "income")
+        for user_id in ordered
+    ]
+    taxes = compute_tax(total_incomes)["total_tax"] if ordered else []
+    return {
+        user_id: build_financial_summary(type_totals[user_id], *recent.get(user_id, (0.0, 0.0)), tax_estimate=float(tax))
+        for user_id, tax in zip(ordered, taxes)
+    }
+
+def stream_financial_summaries(user_ids: Optional[List[int]] = None, batch_users: int = SUMMARY_BATCH_USERS) -> Iterator[bytes]:
+    """
+    Yield NDJSON lines of {"user_id", "summary"} for the given users, or all users,
+    one batch at a time. Unknown user ids get a null summary.
+    Opens its own read session so it can outlive the request's dependencies.
+    """
+    db = read_session()
+    try:
+        if user_ids is None:
+            user_ids = list(db.execute(select(User.id).order_by(User.id)).scalars())
+        for start in range(0, len(user_ids), batch_users):
+            batch = user_ids[start:start + batch_users]
+            summaries = compute_financial_summaries(db, batch)
+            lines = []
+            for user_id in batch:
+                summary = summaries.get(user_id)
+                lines.append(json.dumps({
+                    "user_id": user_id,
+                    "summary": summary.model_dump() if summary else None,
+                }))
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+    finally:
+        db.close()
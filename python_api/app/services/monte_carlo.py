@@ -0,0 +1,140 @@
+"""
+Monte Carlo simulation of retirement and goal corpus outcomes.
+Return paths are generated as batched NumPy arrays from the user's investment
+allocation, in chunks of paths that can optionally run on a process pool.
+"""
+import os
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Annual (expected return, volatility) per asset class, in the Indian context
+DEFAULT_ASSET_ASSUMPTIONS: Dict[str, Tuple[float, float]] = {
+    "equity": (0.12, 0.18),
+    "debt": (0.07, 0.04),
+    "gold": (0.08, 0.15),
+    "ppf": (0.071, 0.0),
+    "epf": (0.0825, 0.0),
+    "nps": (0.10, 0.10),
+    "other": (0.06, 0.05),
+}
+PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_PATHS = 10000
+MIN_MONTHLY_RETURN = -0.99  # Normal draws are floored here: a month cannot lose the whole corpus or more
+
+# Worker processes for large simulations; 0 or 1 runs everything in-process
+SIMULATION_WORKERS = int(os.environ.get("SIMULATION_WORKERS", 0))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Create the shared simulation process pool on first use."""
+    global _pool
+    if SIMULATION_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS)
+        return _pool
+
+def shutdown_simulation_pool() -> None:
+    """Stop the simulation workers (on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def resolve_allocation(
+    allocation: Dict[str, float],
+    overrides: Dict[str, Tuple[float, float]],
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Normalise an allocation to weights and look up each asset class's assumptions.
+    Unknown investment types fall back to the "other" assumptions.
+    """
+    assumptions = {**DEFAULT_ASSET_ASSUMPTIONS, **overrides}
+    names = [name for name, amount in allocation.items() if amount > 0]
+    amounts = np.array([allocation[name] for name in names], dtype=np.float64)
+    weights = amounts / amounts.sum()
+    pairs = np.array([assumptions.get(name.lower(), assumptions["other"]) for name in names], dtype=np.float64).reshape(-1, 2)
+    return names, weights, pairs[:, 0], pairs[:, 1]
+
+def simulate_chunk(
+    seed: np.random.SeedSequence,
+    paths: int,
+    months: int,
+    monthly_mean: float,
+    monthly_std: float,
+    initial_corpus: float,
+    contributions: np.ndarray,
+) -> np.ndarray:
+    """
+    Simulate corpus paths and return year-end values, shape (paths, years).
+    With monthly rebalancing and independent normal asset returns, the portfolio
+    return is itself normal, so one (paths x months) draw covers all assets.
+    """
+    rng = np.random.default_rng(seed)
+    returns = np.maximum(rng.normal(monthly_mean, monthly_std, size=(paths, months)), MIN_MONTHLY_RETURN)
+    growth = np.cumprod(1.0 + returns, axis=1)
+
+    # C_t = G_t * (C_0 + sum_{s<=t} c_s / G_s), with G_t the cumulative growth factor
+    corpus = growth * (initial_corpus + np.cumsum(contributions / growth, axis=1))
+    return corpus[:, 11::12]
+
+def run_simulation(
+    allocation: Dict[str, float],
+    target_amount: float,
+    years: int,
+    initial_corpus: float,
+    monthly_contribution: float = 0.0,
+    contribution_growth: float = 0.0,
+    paths: int = 10000,
+    seed: Optional[int] = None,
+    overrides: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> Dict:
+    """
+    Run a Monte Carlo simulation of a goal corpus and return percentile bands
+    per year plus the probability of reaching the target.
+    """
+    names, weights, expected, volatility = resolve_allocation(allocation, overrides or {})
+
+    # Convert annual assumptions to monthly portfolio mean and standard deviation
+    monthly_means = (1 + expected) ** (1 / 12) - 1
+    monthly_stds = volatility / np.sqrt(12)
+    monthly_mean = float(weights @ monthly_means)
+    monthly_std = float(np.sqrt((weights ** 2) @ (monthly_stds ** 2)))
+
+    months = years * 12
+    contributions = monthly_contribution * (1 + contribution_growth) ** (np.arange(months) // 12)
+
+    # Independent child seeds per chunk keep results reproducible for any worker count
+    chunk_sizes = [min(CHUNK_PATHS, paths - start) for start in range(0, paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    chunk_args = [
+        (chunk_seed, size, months, monthly_mean, monthly_std, initial_corpus, contributions)
+        for chunk_seed, size in zip(seeds, chunk_sizes)
+    ]
+
+    pool = _get_pool() if len(chunk_args) > 1 else None
+    if pool is not None:
+        chunks = list(pool.map(simulate_chunk, *zip(*chunk_args)))
+    else:
+        chunks = [simulate_chunk(*args) for args in chunk_args]
+    yearly = np.concatenate(chunks)
+
+    bands = np.percentile(yearly, PERCENTILES, axis=0)
+    final = yearly[:, -1]
+    return {
+        "success_probability": float(np.mean(final >= target_amount)),
+        "target_amount": target_amount,
+        "paths": paths,
+        "years": list(range(1, years + 1)),
+        "percentiles": {f"p{p}": band.round(2).tolist() for p, band in zip(PERCENTILES, bands)},
+        "median_final_corpus": float(np.median(final)),
+        "allocation": {name: float(weight) for name, weight in zip(names, weights)},
+        "expected_annual_return": float((1 + monthly_mean) ** 12 - 1),
+        "annual_volatility": float(monthly_std * np.sqrt(12)),
+    }
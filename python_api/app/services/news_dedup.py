@@ -0,0 +1,192 @@
+"""
+Deduplication of news articles.
+Exact duplicates are caught by a canonical form of the article URL, which is
+unique in news_items. Near-duplicates (the same wire story republished with
+small edits) are caught with MinHash signatures over word shingles, indexed
+by banded LSH: an article is only compared with articles sharing at least one
+band bucket, so the check stays sub-linear in the size of the table.
+"""
+import hashlib
+import os
+import re
+import zlib
+import numpy as np
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ..models.models import IST, NewsItem, NewsLSHBucket
+
+# Estimated Jaccard similarity of word 3-shingles above which articles are one story
+NEWS_DUPLICATE_THRESHOLD = float(os.getenv("NEWS_DUPLICATE_THRESHOLD", 0.5))
+
+SHINGLE_WORDS = 3
+LSH_BANDS = 20
+LSH_ROWS = 3  # 20 bands of 3 rows: articles ~40% similar or more usually share a bucket
+NUM_PERM = LSH_BANDS * LSH_ROWS
+
+# Hash family h(x) = (a * x + b) mod p over 32-bit shingle hashes; a < 2**31 keeps a * x within uint64
+_PRIME = np.uint64((1 << 32) - 5)
+_rng = np.random.RandomState(20240501)
+_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid"}
+
+def canonical_url(url: str) -> Optional[str]:
+    """
+    Canonical form of an article URL: https, lower-case host without "www.",
+    no fragment, tracking parameters or trailing slash, and sorted query parameters.
+    Returns None for URLs that are not http(s) or too long to store.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    canonical = urlunsplit(("https", host, path, urlencode(query), ""))
+    return canonical if len(canonical) <= 255 else None
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    """32-bit hashes of the word shingles of a text."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+
+def minhash_signature(text: str) -> bytes:
+    """MinHash signature of a text as NUM_PERM little-endian uint32 values (empty for no words)."""
+    hashes = _shingle_hashes(text)
+    if not hashes.size:
+        return b""
+    signature = ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+    return signature.astype("<u4").tobytes()
+
+def article_signature(title: Optional[str], content: Optional[str]) -> bytes:
+    """Signature of an article's title and content."""
+    return minhash_signature(f"{title or ''} {content or ''}")
+
+def band_buckets(signature: bytes) -> List[int]:
+    """LSH bucket keys of a signature, one per band (the band number is hashed in)."""
+    width = LSH_ROWS * 4
+    return [
+        int.from_bytes(hashlib.blake2b(bytes([band]) + signature[band * width:(band + 1) * width], digest_size=8).digest(), "little", signed=True)
+        for band in range(LSH_BANDS)
+    ]
+
+def cluster_news_items(db: Session, items: Sequence[Tuple[int, bytes]]) -> int:
+    """
+    Assign newly stored articles (id, signature) to near-duplicate clusters and index their buckets.
+    Articles are processed in order, so within a batch the first of a story becomes the
+    representative. Duplicates get cluster_id set to their representative's id; representatives
+    keep NULL. Does not commit. Returns the number of duplicates found.
+    """
+    items = [(item_id, signature) for item_id, signature in items if signature]
+    if not items:
+        return 0
+    buckets = {item_id: band_buckets(signature) for item_id, signature in items}
+
+    # Candidates: every stored article sharing a bucket with any new article
+    index: Dict[int, List[int]] = {}
+    all_buckets = {bucket for item_buckets in buckets.values() for bucket in item_buckets}
+    for bucket, news_id in db.execute(
+        select(NewsLSHBucket.bucket, NewsLSHBucket.news_id).where(NewsLSHBucket.bucket.in_(all_buckets))
+    ):
+        index.setdefault(bucket, []).append(news_id)
+    known: Dict[int, Tuple[np.ndarray, int]] = {}
+    candidate_ids = {news_id for news_ids in index.values() for news_id in news_ids}
+    if candidate_ids:
+        for news_id, signature, cluster_id in db.execute(
+            select(NewsItem.id, NewsItem.minhash, NewsItem.cluster_id).where(NewsItem.id.in_(candidate_ids))
+        ):
+            if signature:
+                known[news_id] = (np.frombuffer(signature, dtype="<u4"), cluster_id or news_id)
+
+    duplicates = []
+    for item_id, signature in items:
+        values = np.frombuffer(signature, dtype="<u4")
+        candidates = [news_id for news_id in dict.fromkeys(
+            news_id for bucket in buckets[item_id] for news_id in index.get(bucket, ())
+        ) if news_id in known]
+        cluster_id = None
+        if candidates:
+            similarity = (np.stack([known[news_id][0] for news_id in candidates]) == values).mean(axis=1)
+            best = int(similarity.argmax())
+            if similarity[best] >= NEWS_DUPLICATE_THRESHOLD:
+                cluster_id = known[candidates[best]][1]
+                duplicates.append({"id": item_id, "cluster_id": cluster_id})
+        known[item_id] = (values, cluster_id or item_id)
+        for bucket in buckets[item_id]:
+            index.setdefault(bucket, []).append(item_id)
+
+    if duplicates:
+        db.execute(update(NewsItem), duplicates)
+    db.execute(insert(NewsLSHBucket.__table__), [
+        {"bucket": bucket, "news_id": item_id}
+        for item_id, item_buckets in buckets.items()
+        for bucket in set(item_buckets)
+    ])
+    return len(duplicates)
+
+def backfill_news_dedup(db: Session, batch_size: int = 500) -> int:
+    """
+    Canonicalize URLs, sign and cluster stored articles that predate deduplication, oldest first.
+    Later articles whose canonical URL is already taken join the earlier article's cluster.
+    Returns the number of articles processed.
+    """
+    processed = 0
+    while True:
+        rows = db.execute(
+            select(NewsItem.id, NewsItem.url, NewsItem.title, NewsItem.content)
+            .where(NewsItem.minhash.is_(None))
+            .order_by(NewsItem.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return processed
+
+        urls = {row.id: canonical_url(row.url or "") for row in rows}
+        owners = {
+            url: cluster_id or news_id
+            for url, news_id, cluster_id in db.execute(
+                select(NewsItem.canonical_url, NewsItem.id, NewsItem.cluster_id)
+                .where(NewsItem.canonical_url.in_({url for url in urls.values() if url}))
+            )
+        }
+        updates, signed = [], []
+        now = datetime.now(IST)
+        for row in rows:
+            signature = article_signature(row.title, row.content)
+            values = {"id": row.id, "minhash": signature, "updated_at": now}
+            url = urls[row.id]
+            if url and url in owners:
+                values["cluster_id"] = owners[url]
+            else:
+                if url:
+                    values["canonical_url"] = url
+                    owners[url] = row.id
+                signed.append((row.id, signature))
+            updates.append(values)
+
+        # Bulk updates by primary key need the same keys in every row
+        for keys in {tuple(sorted(values)) for values in updates}:
+            db.execute(update(NewsItem), [values for values in updates if tuple(sorted(values)) == keys])
+        cluster_news_items(db, signed)
+        db.commit()
+        processed += len(rows)
@@ -0,0 +1,38 @@
+"""
+News feeds: the newest stored articles, one per near-duplicate cluster.
+Feeds are keyset-paginated by (publish_date, id) and served from partial
+indexes over cluster representatives, so each page is an index range scan.
+Undated legacy rows have no place in that order (databases differ on where
+NULLs sort) and are left out of feeds.
+"""
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+
+from ..models.models import NewsItem
+from ..utils.pagination import before_cursor, encode_cursor
+
+def news_feed_query(db: Session, category: Optional[str] = None, cursor: Optional[str] = None):
+    """
+    Query for a page of a feed, newest first, optionally for one category.
+    Raises ValueError for a malformed cursor.
+    """
+    query = db.query(NewsItem).filter(NewsItem.cluster_id.is_(None), NewsItem.publish_date.is_not(None))
+    if category:
+        query = query.filter(NewsItem.category == category)
+    if cursor:
+        query = query.filter(before_cursor(NewsItem.publish_date, NewsItem.id, cursor))
+    return query.order_by(NewsItem.publish_date.desc(), NewsItem.id.desc())
+
+def news_feed_page(
+    db: Session,
+    limit: int,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[NewsItem], Optional[str]]:
+    """Return a page of a feed and the cursor for the next page (None on the last page)."""
+    # Fetch one extra row to know whether another page exists
+    items = news_feed_query(db, category, cursor).limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1].publish_date, items[-1].id)
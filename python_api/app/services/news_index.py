@@ -0,0 +1,388 @@
+"""
+Local ranked search over stored news articles.
+An in-process inverted index over news titles and content is scored with BM25
+and boosted by recency. Postings are kept in immutable NumPy segments: the
+index is built and then refreshed by a background thread, picking up articles
+stored or changed since (by any process), so searches never scan the table or
+wait on a refresh. Only cluster representatives are indexed, so a story is found once.
+"""
+import math
+import os
+import re
+import threading
+import time
+import numpy as np
+from collections import Counter
+from datetime import timedelta, timezone
+from sqlalchemy import func, select
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..database.database import read_session
+from ..models.models import NewsItem
+
+# Seconds between background refreshes that index newly stored or changed articles
+NEWS_INDEX_REFRESH_SECONDS = float(os.getenv("NEWS_INDEX_REFRESH_SECONDS", 30))
+# Recency boost: up to 1 + weight for an article published now, halving every half-life (days)
+NEWS_SEARCH_RECENCY_WEIGHT = float(os.getenv("NEWS_SEARCH_RECENCY_WEIGHT", 0.5))
+NEWS_SEARCH_RECENCY_HALF_LIFE = float(os.getenv("NEWS_SEARCH_RECENCY_HALF_LIFE", 7))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2  # A title term counts as this many content terms
+SEGMENT_SIZE = 100000
+MAX_SMALL_SEGMENTS = 8
+CHAMPION_SIZE = 256  # Highest-impact postings kept per long term
+RECENT_SIZE = 256  # Newest postings kept per long term, so fresh articles stay reachable
+# Multi-term queries also score every article containing the rarest term, when it has at most this many
+RAREST_TERM_POSTINGS = 10000
+# Refreshes re-read articles changed this long before the newest change seen, so
+# writes that commit after a later timestamp (or on a skewed clock) are not missed
+CHANGE_OVERLAP = timedelta(minutes=5)
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the to was were will with".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens, without stopwords and single characters."""
+    return [token for token in re.findall(r"\w+", text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+class _Segment:
+    """
+    Postings of a run of articles, grouped by term id (CSR layout) and sorted by
+    document within each term. Postings store their BM25 term weight (impact),
+    precomputed with the segment's average document length. Terms with long
+    postings also keep a candidate list of their CHAMPION_SIZE highest-impact and
+    RECENT_SIZE newest documents, which is all a search reads of them to find
+    candidates. Postings are immutable; documents of changed or deleted articles
+    are only marked dead.
+    """
+
+    def __init__(self, ids, timestamps, term_ids, docs, impacts):
+        order = np.lexsort((docs, term_ids))
+        term_ids = term_ids[order]
+        self.docs = docs[order]
+        self.impacts = impacts[order]
+        self.terms, starts = np.unique(term_ids, return_index=True)
+        self.offsets = np.append(starts, len(term_ids))
+        self.ids = ids
+        self.timestamps = timestamps
+        self.live = np.ones(len(ids), dtype=bool)
+        self._id_order = np.argsort(ids, kind="stable")
+        self.champions: Dict[int, np.ndarray] = {}
+        for position in np.flatnonzero(np.diff(self.offsets) > CHAMPION_SIZE):
+            start, end = self.offsets[position], self.offsets[position + 1]
+            term_docs, term_impacts = self.docs[start:end], self.impacts[start:end]
+            top = np.argpartition(-term_impacts, CHAMPION_SIZE)[:CHAMPION_SIZE]
+            recent = np.argpartition(-timestamps[term_docs], min(RECENT_SIZE, len(term_docs) - 1))[:RECENT_SIZE]
+            self.champions[int(position)] = np.union1d(term_docs[top], term_docs[recent])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position(self, term_id: int) -> Optional[int]:
+        """Position of a term in this segment, or None if no article here contains it."""
+        position = int(np.searchsorted(self.terms, term_id))
+        if position == len(self.terms) or self.terms[position] != term_id:
+            return None
+        return position
+
+    def frequency(self, position: int) -> int:
+        """Number of articles containing the term at position."""
+        return int(self.offsets[position + 1] - self.offsets[position])
+
+    def postings(self, position: int) -> np.ndarray:
+        """All documents containing the term at position."""
+        return self.docs[self.offsets[position]:self.offsets[position + 1]]
+
+    def candidates(self, position: int) -> np.ndarray:
+        """Documents worth scoring first for a term: all of them, or its candidate list."""
+        champions = self.champions.get(position)
+        return champions if champions is not None else self.postings(position)
+
+    def impacts_at(self, position: int, docs: np.ndarray) -> np.ndarray:
+        """Impacts of a term for sorted documents (0 where a document lacks the term)."""
+        start, end = self.offsets[position], self.offsets[position + 1]
+        term_docs = self.docs[start:end]
+        found = np.minimum(np.searchsorted(term_docs, docs), len(term_docs) - 1)
+        return np.where(term_docs[found] == docs, self.impacts[start:end][found], 0)
+
+    def kill(self, news_ids: np.ndarray) -> int:
+        """Mark the documents of the given article ids dead. Returns how many were live."""
+        if not len(self.ids):
+            return 0
+        sorted_ids = self.ids[self._id_order]
+        found = np.minimum(np.searchsorted(sorted_ids, news_ids), len(sorted_ids) - 1)
+        docs = self._id_order[found[sorted_ids[found] == news_ids]]
+        killed = int(self.live[docs].sum())
+        self.live[docs] = False
+        return killed
+
+    @classmethod
+    def merge(cls, segments: Sequence["_Segment"]) -> "_Segment":
+        """
+        Concatenate the live documents of segments into one
+        (impacts keep their original length normalization).
+        """
+        ids, timestamps, term_ids, docs, impacts = [], [], [], [], []
+        start = 0
+        for segment in segments:
+            renumbered = np.cumsum(segment.live) - 1 + start
+            segment_terms = np.repeat(segment.terms, np.diff(segment.offsets))
+            kept = segment.live[segment.docs]
+            ids.append(segment.ids[segment.live])
+            timestamps.append(segment.timestamps[segment.live])
+            term_ids.append(segment_terms[kept])
+            docs.append(renumbered[segment.docs[kept]])
+            impacts.append(segment.impacts[kept])
+            start += int(segment.live.sum())
+        return cls(
+            np.concatenate(ids),
+            np.concatenate(timestamps),
+            np.concatenate(term_ids),
+            np.concatenate(docs).astype(np.int32),
+            np.concatenate(impacts),
+        )
+
+def _boost(timestamps: np.ndarray, now: float) -> np.ndarray:
+    """Recency multiplier of articles published at timestamps."""
+    age_days = np.maximum(now - timestamps, 0) / 86400
+    return 1 + NEWS_SEARCH_RECENCY_WEIGHT * np.exp2(-age_days / NEWS_SEARCH_RECENCY_HALF_LIFE)
+
+class NewsSearchIndex:
+    """BM25 index over stored news, safe to search while it is being refreshed."""
+
+    def __init__(self):
+        self._vocabulary: Dict[str, int] = {}
+        self._segments: List[_Segment] = []
+        # Newest updated_at seen, and the versions of articles indexed within CHANGE_OVERLAP of it
+        self._watermark = None
+        self._versions: Dict[int, object] = {}
+        self._lock = threading.Lock()
+        self.ready = False
+        self.refreshed_at = 0.0
+        self.last_error: Optional[str] = None
+
+    def __len__(self) -> int:
+        return sum(int(segment.live.sum()) for segment in self._segments)
+
+    def _build_segment(self, rows) -> _Segment:
+        """Tokenize (id, title, content, publish_date) rows into a segment."""
+        vocabulary = self._vocabulary
+        ids, lengths, timestamps, term_ids, docs, tfs = [], [], [], [], [], []
+        for position, (news_id, title, content, publish_date) in enumerate(rows):
+            counts = Counter(tokenize(content or ""))
+            for token in tokenize(title or ""):
+                counts[token] += TITLE_WEIGHT
+            ids.append(news_id)
+            lengths.append(sum(counts.values()))
+            timestamps.append(publish_date.replace(tzinfo=timezone.utc).timestamp() if publish_date else 0.0)  # Stored as naive UTC
+            term_ids.extend(vocabulary.setdefault(term, len(vocabulary)) for term in counts)
+            docs.extend([position] * len(counts))
+            tfs.extend(counts.values())
+        docs = np.array(docs, dtype=np.int32)
+        lengths = np.array(lengths, dtype=np.float32)
+        tf = np.array(tfs, dtype=np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / (lengths.mean() or 1.0))
+        return _Segment(
+            np.array(ids, dtype=np.int64),
+            np.array(timestamps, dtype=np.float64),
+            np.array(term_ids, dtype=np.int32),
+            docs,
+            (tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float16),
+        )
+
+    def discard(self, news_ids: Iterable[int]) -> int:
+        """Drop articles from search results (e.g. ids found deleted). Returns how many were indexed."""
+        news_ids = np.array(sorted(news_ids), dtype=np.int64)
+        if not len(news_ids):
+            return 0
+        return sum(segment.kill(news_ids) for segment in self._segments)
+
+    def refresh(self, blocking: bool = True) -> int:
+        """
+        Index articles stored or changed since the last refresh (all of them on the first),
+        SEGMENT_SIZE at a time; earlier versions of changed articles are dropped.
+        Returns the number of articles added (0 if another refresh is running and blocking is False).
+        """
+        if not self._lock.acquire(blocking):
+            return 0
+        try:
+            segments = list(self._segments)
+            watermark, versions = self._watermark, dict(self._versions)
+            changes = select(NewsItem.id, NewsItem.title, NewsItem.content, NewsItem.publish_date, NewsItem.cluster_id, NewsItem.updated_at)
+            last_id, added = 0, 0
+            db = read_session()
+            try:
+                if watermark is None:
+                    # Build: every article, with anything changed during the scan picked up by the next refresh
+                    watermark = db.execute(select(func.max(NewsItem.updated_at))).scalar()
+                    since = None
+                else:
+                    since = watermark - CHANGE_OVERLAP
+                    changes = changes.where(NewsItem.updated_at >= since)
+                while True:
+                    rows = db.execute(changes.where(NewsItem.id > last_id).order_by(NewsItem.id).limit(SEGMENT_SIZE)).all()
+                    if not rows:
+                        break
+                    last_id = rows[-1].id
+                    if since is not None:
+                        # Skip articles already indexed at this version, and drop earlier versions of the rest
+                        rows = [row for row in rows if versions.get(row.id) != row.updated_at]
+                        changed = np.array([row.id for row in rows], dtype=np.int64)
+                        for segment in segments:
+                            segment.kill(changed)
+                    for row in rows:
+                        if row.updated_at is not None:
+                            watermark = row.updated_at if watermark is None else max(watermark, row.updated_at)
+                            versions[row.id] = row.updated_at
+                    representatives = [row[:4] for row in rows if row.cluster_id is None]
+                    if representatives:
+                        segments.append(self._build_segment(representatives))
+                        added += len(representatives)
+            finally:
+                db.close()
+
+            if watermark is not None:
+                versions = {news_id: version for news_id, version in versions.items() if version >= watermark - CHANGE_OVERLAP}
+            # Fold small segments from frequent refreshes together (dropping dead documents), so searches stay vectorized
+            small = [segment for segment in segments if len(segment) < SEGMENT_SIZE]
+            if len(small) > MAX_SMALL_SEGMENTS:
+                merged = _Segment.merge(small)
+                segments = [segment for segment in segments if len(segment) >= SEGMENT_SIZE] + ([merged] if len(merged) else [])
+            self._segments, self._watermark, self._versions = segments, watermark, versions
+            self.ready = True
+            self.refreshed_at = time.time()
+            return added
+        finally:
+            self._lock.release()
+
+    def _score(self, segment: _Segment, terms: List[Tuple[float, int]], docs: np.ndarray, now: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Live documents among sorted docs, and their exact boosted scores on all query terms."""
+        docs = docs[segment.live[docs]]
+        scores = np.zeros(len(docs), dtype=np.float32)
+        for weight, position in terms:
+            scores += weight * segment.impacts_at(position, docs)
+        return docs, scores * _boost(segment.timestamps[docs], now)
+
+    def search(self, query: str, limit: int, now: Optional[float] = None) -> List[Tuple[int, float]]:
+        """Return up to limit (news id, score) pairs, best first."""
+        term_ids = [self._vocabulary.get(token) for token in dict.fromkeys(tokenize(query))]
+        term_ids = [term_id for term_id in term_ids if term_id is not None]
+        segments = self._segments
+        if not term_ids or not segments or limit < 1:
+            return []
+
+        positions = [[segment.position(term_id) for term_id in term_ids] for segment in segments]
+        documents = sum(len(segment) for segment in segments)
+        idf = []
+        for index in range(len(term_ids)):
+            frequency = sum(
+                segment.frequency(segment_positions[index])
+                for segment, segment_positions in zip(segments, positions)
+                if segment_positions[index] is not None
+            )
+            idf.append(math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5)))
+
+        now = time.time() if now is None else now
+        found_ids, found_scores = [], []
+        for segment, segment_positions in zip(segments, positions):
+            terms = [(weight, position) for weight, position in zip(idf, segment_positions) if position is not None]
+            if not terms:
+                continue
+            lists = [segment.candidates(position) for _, position in terms]
+            if len(terms) > 1:
+                # Articles matching every term all contain the rarest one
+                rarest = min(segment.frequency(position) for _, position in terms)
+                if rarest <= RAREST_TERM_POSTINGS:
+                    lists.append(next(segment.postings(position) for _, position in terms if segment.frequency(position) == rarest))
+            candidates, boosted = self._score(segment, terms, np.unique(np.concatenate(lists)), now)
+            if len(candidates) < limit and any(position in segment.champions for _, position in terms):
+                # Too few live candidates (e.g. after changes): score the full postings
+                candidates, boosted = self._score(
+                    segment, terms, np.unique(np.concatenate([segment.postings(position) for _, position in terms])), now
+                )
+
+            if len(candidates) > limit:
+                top = np.argpartition(-boosted, limit)[:limit]
+                candidates, boosted = candidates[top], boosted[top]
+            found_ids.append(segment.ids[candidates])
+            found_scores.append(boosted)
+
+        if not found_ids:
+            return []
+        ids, scores = np.concatenate(found_ids), np.concatenate(found_scores)
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return list(zip(ids[order].tolist(), scores[order].tolist()))
+
+_index = NewsSearchIndex()
+_refresher: Optional[threading.Thread] = None
+_refresher_stop = threading.Event()
+_refresher_lock = threading.Lock()
+
+def get_news_index() -> NewsSearchIndex:
+    """The process-wide news index."""
+    return _index
+
+def _run_refresher(stop: threading.Event) -> None:
+    """Build the index, then refresh it every NEWS_INDEX_REFRESH_SECONDS until stopped."""
+    while True:
+        try:
+            _index.refresh()
+            _index.last_error = None
+        except Exception as e:
+            # Recorded, and retried on the next interval
+            _index.last_error = f"{type(e).__name__}: {e}"
+        if stop.wait(max(NEWS_INDEX_REFRESH_SECONDS, 1.0)):
+            return
+
+def start_news_index() -> None:
+    """Start building and refreshing the index in a background thread (once per process)."""
+    global _refresher, _refresher_stop
+    with _refresher_lock:
+        if _refresher is not None:
+            return
+        _refresher_stop = threading.Event()
+        _refresher = threading.Thread(target=_run_refresher, args=(_refresher_stop,), name="news-index-refresh", daemon=True)
+        _refresher.start()
+
+def stop_news_index() -> None:
+    """Stop the background refresh (on application shutdown)."""
+    global _refresher
+    with _refresher_lock:
+        _refresher_stop.set()
+        _refresher = None
+
+def search_stored_news(query: str, limit: int = 5) -> List[Dict]:
+    """
+    Search stored news, formatted like upstream results.
+    Returns no results until the first build finishes. Articles found deleted
+    when their rows are fetched are dropped from the index.
+    """
+    start_news_index()
+    if not _index.ready:
+        return []
+
+    hits = _index.search(query, limit)
+    if not hits:
+        return []
+    db = read_session()
+    try:
+        items = {item.id: item for item in db.query(NewsItem).filter(NewsItem.id.in_([news_id for news_id, _ in hits]))}
+    finally:
+        db.close()
+    missing = [news_id for news_id, _ in hits if news_id not in items]
+    if missing:
+        _index.discard(missing)
+    return [
+        {
+            "title": items[news_id].title,
+            "content": items[news_id].content,
+            "url": items[news_id].url,
+            "publish_date": items[news_id].publish_date.isoformat() if items[news_id].publish_date else None,
+            "source": items[news_id].source,
+            "score": round(score, 4),
+        }
+        for news_id, score in hits
+        if news_id in items
+    ]
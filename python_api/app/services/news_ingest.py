@@ -0,0 +1,195 @@
+"""
+Background ingestion of news into the news_items table.
+An in-process scheduler refreshes each configured category on a jittered
+interval, so category feeds are read from the local table instead of waiting
+on the upstream search. Lag and error counts are kept per category.
+"""
+import asyncio
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+from .news_personalization import refresh_all_news_feeds
+from .news_search import NewsSearchError, news_search_configured, search_news
+from .news_store import store_search_results
+
+NEWS_CATEGORIES = [
+    category.strip()
+    for category in os.getenv("NEWS_CATEGORIES", "markets,economy,banking,stocks,mutual funds,personal finance,tax").split(",")
+    if category.strip()
+]
+NEWS_INGEST_ENABLED = os.getenv("NEWS_INGEST_ENABLED", "true").lower() in ("1", "true", "yes")
+# Seconds between refreshes of each category, +/- NEWS_INGEST_JITTER as a fraction of it
+NEWS_INGEST_INTERVAL = float(os.getenv("NEWS_INGEST_INTERVAL", 900))
+NEWS_INGEST_JITTER = float(os.getenv("NEWS_INGEST_JITTER", 0.1))
+NEWS_INGEST_CONCURRENCY = int(os.getenv("NEWS_INGEST_CONCURRENCY", 2))
+NEWS_INGEST_RESULTS = int(os.getenv("NEWS_INGEST_RESULTS", 10))
+# Seconds between personalized feed rebuilds, when new articles were stored since the last one
+NEWS_FEED_REFRESH_SECONDS = float(os.getenv("NEWS_FEED_REFRESH_SECONDS", 300))
+
+def category_query(category: str) -> str:
+    """Upstream search query used to fill a category."""
+    return f"India {category} finance news"
+
+class NewsIngestor:
+    """
+    Refreshes news categories in the background of the running event loop.
+    Each category runs its own loop, so one slow or failing category does not
+    delay the others; a semaphore caps how many upstream searches run at once.
+    Personalized feeds are rebuilt in batches after new articles arrive.
+    """
+
+    def __init__(
+        self,
+        categories: List[str],
+        interval: float = NEWS_INGEST_INTERVAL,
+        jitter: float = NEWS_INGEST_JITTER,
+        concurrency: int = NEWS_INGEST_CONCURRENCY,
+        max_results: int = NEWS_INGEST_RESULTS,
+        feed_interval: float = NEWS_FEED_REFRESH_SECONDS,
+    ):
+        self.categories = list(dict.fromkeys(categories))
+        self.interval = interval
+        self.jitter = jitter
+        self.max_results = max_results
+        self.feed_interval = feed_interval
+        self.started_at: Optional[float] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._stats: Dict[str, Dict] = {
+            category: {"runs": 0, "errors": 0, "articles": 0, "new_articles": 0, "last_success": None, "last_error": None}
+            for category in self.categories
+        }
+        self._feeds_stale = False
+        self._feed_stats: Dict = {"runs": 0, "errors": 0, "users": 0, "last_success": None, "last_error": None}
+
+    def tracks(self, category: str) -> bool:
+        """Whether category is kept fresh by this ingestor."""
+        return category in self._stats
+
+    def _next_delay(self, interval: Optional[float] = None) -> float:
+        """Interval with random jitter, so categories and workers drift apart."""
+        interval = self.interval if interval is None else interval
+        return max(0.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def refresh(self, category: str) -> int:
+        """
+        Fetch a tracked category and upsert its articles; errors are recorded, not raised.
+        Returns the number of articles stored. Only new stories mark personalized feeds stale.
+        """
+        stats = self._stats[category]
+        stats["runs"] += 1
+        try:
+            async with self._semaphore:
+                result = await search_news(category_query(category), self.max_results)
+            counts = await asyncio.to_thread(store_search_results, result["results"], category)
+        except Exception as e:
+            # Database errors are recorded too, so the loop keeps running
+            message = str(e) if isinstance(e, NewsSearchError) else f"{type(e).__name__}: {e}"
+            stats["errors"] += 1
+            stats["last_error"] = {"at": time.time(), "message": message}
+            return 0
+        stats["articles"] += counts["stored"]
+        stats["new_articles"] += counts["new"]
+        stats["last_success"] = time.time()
+        if counts["new"]:
+            self._feeds_stale = True
+        return counts["stored"]
+
+    async def refresh_feeds(self) -> None:
+        """Rebuild personalized feeds in a worker thread; errors are recorded, not raised."""
+        self._feeds_stale = False
+        stats = self._feed_stats
+        stats["runs"] += 1
+        try:
+            result = await asyncio.to_thread(refresh_all_news_feeds)
+        except Exception as e:
+            self._feeds_stale = True
+            stats["errors"] += 1
+            stats["last_error"] = {"at": time.time(), "message": f"{type(e).__name__}: {e}"}
+            return
+        stats["users"] = result["users"]
+        stats["last_success"] = time.time()
+
+    async def _run_feeds(self) -> None:
+        """Rebuild feeds every feed_interval seconds if new articles were stored."""
+        while True:
+            await asyncio.sleep(self._next_delay(self.feed_interval))
+            if self._feeds_stale:
+                await self.refresh_feeds()
+
+    async def _run_category(self, category: str, initial_delay: float) -> None:
+        """Refresh a category forever, starting after initial_delay seconds."""
+        await asyncio.sleep(initial_delay)
+        while True:
+            await self.refresh(category)
+            await asyncio.sleep(self._next_delay())
+
+    def start(self) -> None:
+        """Start one refresh loop per category, spreading first runs over the jitter window."""
+        if self._tasks:
+            return
+        self.started_at = time.time()
+        spread = self.interval * self.jitter
+        self._tasks = [
+            asyncio.create_task(self._run_category(category, random.uniform(0, spread)))
+            for category in self.categories
+        ]
+        if self.feed_interval > 0:
+            self._tasks.append(asyncio.create_task(self._run_feeds()))
+
+    async def stop(self) -> None:
+        """Cancel the refresh loops and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def status(self) -> Dict:
+        """Per-category ingestion metrics; lag is seconds since the last successful refresh."""
+        now = time.time()
+        categories = {}
+        for category, stats in self._stats.items():
+            last_success = stats["last_success"]
+            categories[category] = {
+                "runs": stats["runs"],
+                "errors": stats["errors"],
+                "error_rate": round(stats["errors"] / stats["runs"], 4) if stats["runs"] else 0.0,
+                "articles": stats["articles"],
+                "new_articles": stats["new_articles"],
+                "lag_seconds": round(now - (last_success or self.started_at or now), 3),
+                "last_success": last_success,
+                "last_error": stats["last_error"],
+            }
+        return {
+            "running": bool(self._tasks),
+            "interval_seconds": self.interval,
+            "categories": categories,
+            "feeds": {**self._feed_stats, "stale": self._feeds_stale},
+        }
+
+_ingestor: Optional[NewsIngestor] = None
+
+def news_ingestion_enabled() -> bool:
+    """Whether the scheduler should run in this process."""
+    return NEWS_INGEST_ENABLED and NEWS_INGEST_INTERVAL > 0 and bool(NEWS_CATEGORIES) and news_search_configured()
+
+def get_news_ingestor() -> Optional[NewsIngestor]:
+    """The running ingestor, if any."""
+    return _ingestor
+
+def start_news_ingestion() -> Optional[NewsIngestor]:
+    """Start the scheduler (on application startup) when ingestion is enabled."""
+    global _ingestor
+    if _ingestor is None and news_ingestion_enabled():
+        _ingestor = NewsIngestor(NEWS_CATEGORIES)
+        _ingestor.start()
+    return _ingestor
+
+async def stop_news_ingestion() -> None:
+    """Stop the scheduler (on application shutdown)."""
+    global _ingestor
+    if _ingestor is not None:
+        await _ingestor.stop()
+    _ingestor = None
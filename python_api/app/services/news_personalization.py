@@ -0,0 +1,184 @@
+"""
+Personalized news feeds.
+Each user's profile (investment allocation by type, document categories and
+chat topics) and each recent article are embedded in a small space of finance
+topics. Feeds are ranked by cosine similarity weighted by recency, computed
+for batches of users with one matrix product, and stored per user so reading
+a feed is a single indexed lookup.
+"""
+import os
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Sequence
+
+from ..database.database import SessionLocal
+from ..models.models import IST, ChatMessage, Document, FinancialAggregate, NewsItem, User, UserNewsFeed
+from .news_index import tokenize
+
+NEWS_FEED_SIZE = int(os.getenv("NEWS_FEED_SIZE", 50))
+NEWS_FEED_WINDOW_DAYS = float(os.getenv("NEWS_FEED_WINDOW_DAYS", 14))
+NEWS_FEED_HALF_LIFE = float(os.getenv("NEWS_FEED_HALF_LIFE", 3))  # Days for an article's score to halve
+NEWS_FEED_MAX_ARTICLES = 20000
+USERS_PER_BATCH = 1000
+
+TOPIC_KEYWORDS = {
+    "equity": ["equity", "equities", "stock", "stocks", "shares", "sensex", "nifty", "ipo", "smallcap", "midcap", "largecap"],
+    "mutual_funds": ["mutual", "sip", "nav", "amc", "elss", "index"],
+    "debt": ["bond", "bonds", "debt", "yield", "yields", "gilt", "debenture", "fd", "deposit", "deposits"],
+    "gold": ["gold", "bullion", "sgb", "silver"],
+    "retirement": ["ppf", "epf", "nps", "pension", "retirement", "provident"],
+    "tax": ["tax", "taxes", "taxpayers", "gst", "itr", "tds", "80c", "cbdt", "deduction", "deductions"],
+    "insurance": ["insurance", "insurer", "insurers", "irdai", "premium", "lic", "policyholders"],
+    "banking": ["bank", "banks", "banking", "rbi", "repo", "loan", "loans", "emi", "credit", "lending"],
+    "real_estate": ["property", "housing", "realty", "rera", "home", "homes"],
+    "economy": ["gdp", "inflation", "economy", "fiscal", "cpi", "growth", "forecast", "outlook"],
+    "budget": ["budget", "savings", "spending", "expenses", "household"],
+}
+TOPICS = list(TOPIC_KEYWORDS)
+
+# Profile signals (investment types, document categories, chat topics) that do not name a topic or keyword
+SIGNAL_TOPICS = {
+    "investment": {"equity": 0.5, "mutual_funds": 0.5},
+    "risk": {"insurance": 0.5, "equity": 0.5},
+    "property": {"real_estate": 1.0},
+}
+
+# How much each profile source contributes (each source is normalized first)
+PROFILE_WEIGHTS = {"allocation": 1.0, "documents": 0.5, "chat": 0.5}
+TITLE_WEIGHT = 2
+
+_KEYWORD_TOPICS = {keyword: TOPICS.index(topic) for topic, keywords in TOPIC_KEYWORDS.items() for keyword in keywords}
+
+def signal_topics(signal: str) -> Dict[int, float]:
+    """Topic weights of a profile signal such as "equity", "nps" or "tax"."""
+    signal = (signal or "").strip().lower()
+    if signal in SIGNAL_TOPICS:
+        return {TOPICS.index(topic): weight for topic, weight in SIGNAL_TOPICS[signal].items()}
+    if signal in TOPIC_KEYWORDS:
+        return {TOPICS.index(signal): 1.0}
+    topics = {_KEYWORD_TOPICS[token] for token in tokenize(signal.replace("_", " ")) if token in _KEYWORD_TOPICS}
+    return {topic: 1.0 / len(topics) for topic in topics}
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def article_vectors(rows: Sequence) -> np.ndarray:
+    """Unit topic vectors of (title, content, category) rows."""
+    vectors = np.zeros((len(rows), len(TOPICS)), dtype=np.float32)
+    for position, (title, content, category) in enumerate(rows):
+        for token in tokenize(content or ""):
+            topic = _KEYWORD_TOPICS.get(token)
+            if topic is not None:
+                vectors[position, topic] += 1
+        for token in tokenize(title or ""):
+            topic = _KEYWORD_TOPICS.get(token)
+            if topic is not None:
+                vectors[position, topic] += TITLE_WEIGHT
+        for topic, weight in signal_topics(category or "").items():
+            vectors[position, topic] += TITLE_WEIGHT * weight
+    return _normalize_rows(vectors)
+
+def _profile_vectors(db: Session, user_ids: List[int]) -> np.ndarray:
+    """Unit topic vectors of users' profiles, one grouped query per profile source."""
+    positions = {user_id: position for position, user_id in enumerate(user_ids)}
+    sources = {
+        "allocation": select(FinancialAggregate.user_id, FinancialAggregate.type, FinancialAggregate.total_amount)
+        .where(FinancialAggregate.user_id.in_(user_ids), FinancialAggregate.category == "investment", FinancialAggregate.total_amount > 0),
+        "documents": select(Document.user_id, Document.category, func.count())
+        .where(Document.user_id.in_(user_ids))
+        .group_by(Document.user_id, Document.category),
+        "chat": select(ChatMessage.user_id, ChatMessage.related_to, func.count())
+        .where(ChatMessage.user_id.in_(user_ids), ChatMessage.related_to.isnot(None))
+        .group_by(ChatMessage.user_id, ChatMessage.related_to),
+    }
+    profiles = np.zeros((len(user_ids), len(TOPICS)), dtype=np.float32)
+    for source, query in sources.items():
+        vectors = np.zeros_like(profiles)
+        for user_id, signal, amount in db.execute(query):
+            for topic, weight in signal_topics(signal).items():
+                vectors[positions[user_id], topic] += weight * float(amount)
+        totals = vectors.sum(axis=1, keepdims=True)
+        profiles += PROFILE_WEIGHTS[source] * np.divide(vectors, totals, out=np.zeros_like(vectors), where=totals > 0)
+    return _normalize_rows(profiles)
+
+def _age_days(publish_dates: Sequence[datetime], now: datetime) -> np.ndarray:
+    """Ages in days at now (naive UTC) of articles published at the stored dates; future dates count as 0."""
+    return np.array([max((now - publish_date).total_seconds(), 0.0) / 86400 for publish_date in publish_dates], dtype=np.float32)
+
+def refresh_news_feeds(
+    db: Session,
+    user_ids: Optional[List[int]] = None,
+    users_per_batch: int = USERS_PER_BATCH,
+    feed_size: int = NEWS_FEED_SIZE,
+) -> Dict[str, int]:
+    """
+    Rank recent articles for every user (or the given users) and replace their stored feeds,
+    committing once per batch of users. Users without a profile get an empty feed.
+    Returns the number of users and feed entries written.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # publish_date is naive UTC
+    articles = db.execute(
+        select(NewsItem.id, NewsItem.title, NewsItem.content, NewsItem.category, NewsItem.publish_date)
+        .where(NewsItem.cluster_id.is_(None), NewsItem.publish_date >= now - timedelta(days=NEWS_FEED_WINDOW_DAYS))
+        .order_by(NewsItem.publish_date.desc(), NewsItem.id.desc())
+        .limit(NEWS_FEED_MAX_ARTICLES)
+    ).all()
+    news_ids = np.array([article.id for article in articles], dtype=np.int64)
+    age_days = _age_days([article.publish_date for article in articles], now)
+    # Recency is folded into the article vectors, so one product gives the final scores
+    weighted = article_vectors([(article.title, article.content, article.category) for article in articles])\
+        * np.exp2(-age_days / NEWS_FEED_HALF_LIFE)[:, None]
+
+    if user_ids is None:
+        user_ids = db.execute(select(User.id).order_by(User.id)).scalars().all()
+    computed_at = datetime.now(IST)
+    result = {"users": 0, "entries": 0}
+    for start in range(0, len(user_ids), users_per_batch):
+        batch = list(user_ids[start:start + users_per_batch])
+        entries = []
+        profiles = _profile_vectors(db, batch)
+        # Users without a profile match nothing, so only the others are ranked
+        ranked_users = np.flatnonzero(profiles.any(axis=1))
+        if len(articles) and len(ranked_users):
+            scores = profiles[ranked_users] @ weighted.T
+            size = min(feed_size, scores.shape[1])
+            top = np.argpartition(scores, -size, axis=1)[:, -size:]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = news_ids[np.take_along_axis(top, order, axis=1)]
+            top_scores = np.take_along_axis(top_scores, order, axis=1).round(6)
+            for position, user_position in enumerate(ranked_users):
+                matched = top_scores[position] > 0
+                entries.extend(
+                    {"user_id": batch[user_position], "rank": rank, "news_id": news_id, "score": score, "computed_at": computed_at}
+                    for rank, (news_id, score) in enumerate(zip(top[position][matched].tolist(), top_scores[position][matched].tolist()))
+                )
+
+        db.execute(delete(UserNewsFeed).where(UserNewsFeed.user_id.in_(batch)))
+        if entries:
+            db.execute(insert(UserNewsFeed.__table__), entries)
+        db.commit()
+        result["users"] += len(batch)
+        result["entries"] += len(entries)
+    return result
+
+def refresh_all_news_feeds() -> Dict[str, int]:
+    """Refresh every user's feed in a session of its own (for background jobs)."""
+    db = SessionLocal()
+    try:
+        return refresh_news_feeds(db)
+    finally:
+        db.close()
+
+def get_user_news_feed(db: Session, user_id: int, limit: int) -> List:
+    """A user's stored feed as (NewsItem, score) pairs, best first."""
+    return db.query(NewsItem, UserNewsFeed.score)\
+        .join(UserNewsFeed, UserNewsFeed.news_id == NewsItem.id)\
+        .filter(UserNewsFeed.user_id == user_id)\
+        .order_by(UserNewsFeed.rank)\
+        .limit(limit)\
+        .all()
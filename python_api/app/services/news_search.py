@@ -0,0 +1,159 @@
+"""
+External news search (Tavily) over a shared async HTTP client.
+One pooled httpx.AsyncClient keeps connections alive across requests, every
+call has connect/read timeouts, and a semaphore bounds how many upstream
+searches run at once so a slow upstream cannot exhaust the server.
+Results are cached per normalized query, and concurrent identical searches
+share a single upstream call.
+"""
+import asyncio
+import os
+import re
+import httpx
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+from dotenv import load_dotenv
+import pytz
+
+from ..utils.cache import LRUCache
+
+# Load environment variables
+load_dotenv()
+
+IST = pytz.timezone('Asia/Kolkata')
+
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+TAVILY_API_URL = os.getenv("TAVILY_API_URL", "https://api.tavily.com")
+NEWS_DOMAINS = ["economictimes.indiatimes.com", "financialexpress.com", "moneycontrol.com", "livemint.com", "businesstoday.in"]
+
+# Timeouts in seconds, pool size and the number of upstream searches allowed in flight
+NEWS_SEARCH_CONNECT_TIMEOUT = float(os.getenv("NEWS_SEARCH_CONNECT_TIMEOUT", 3))
+NEWS_SEARCH_READ_TIMEOUT = float(os.getenv("NEWS_SEARCH_READ_TIMEOUT", 10))
+NEWS_SEARCH_MAX_CONNECTIONS = int(os.getenv("NEWS_SEARCH_MAX_CONNECTIONS", 20))
+NEWS_SEARCH_CONCURRENCY = int(os.getenv("NEWS_SEARCH_CONCURRENCY", 10))
+NEWS_SEARCH_QUEUE_TIMEOUT = float(os.getenv("NEWS_SEARCH_QUEUE_TIMEOUT", 5))
+
+# Cached results per (normalized query, max_results)
+NEWS_SEARCH_CACHE_TTL = float(os.getenv("NEWS_SEARCH_CACHE_TTL", 300))
+NEWS_SEARCH_CACHE_SIZE = int(os.getenv("NEWS_SEARCH_CACHE_SIZE", 512))
+
+class NewsSearchError(Exception):
+    """Upstream news search failed; timeout is True when it did not answer in time."""
+
+    def __init__(self, message: str, timeout: bool = False):
+        super().__init__(message)
+        self.timeout = timeout
+
+# Client and semaphore are bound to the event loop they were created on
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_search_cache = LRUCache(NEWS_SEARCH_CACHE_SIZE, NEWS_SEARCH_CACHE_TTL)
+_inflight: Dict[Hashable, asyncio.Future] = {}
+
+def news_search_configured() -> bool:
+    """Whether an upstream API key is set."""
+    return bool(TAVILY_API_KEY)
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use in the running loop."""
+    global _client, _semaphore, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            base_url=TAVILY_API_URL,
+            timeout=httpx.Timeout(NEWS_SEARCH_READ_TIMEOUT, connect=NEWS_SEARCH_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=NEWS_SEARCH_MAX_CONNECTIONS,
+                max_keepalive_connections=NEWS_SEARCH_MAX_CONNECTIONS,
+            ),
+        )
+        _semaphore = asyncio.Semaphore(NEWS_SEARCH_CONCURRENCY)
+        _client_loop = loop
+    return _client
+
+async def close_news_client() -> None:
+    """Close the shared client (on application shutdown)."""
+    global _client, _semaphore, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client, _semaphore, _client_loop = None, None, None
+
+def _format_results(data: Dict) -> List[Dict]:
+    """Map Tavily results to the API's news result format."""
+    return [
+        {
+            "title": item.get("title", ""),
+            "content": item.get("content", ""),
+            "url": item.get("url", ""),
+            "publish_date": item.get("published_date", datetime.now(IST).isoformat()),
+            "source": item.get("source", ""),
+            "score": item.get("score", 0),
+        }
+        for item in data.get("results", [])
+    ]
+
+async def search_news(query: str, max_results: int = 5) -> Dict:
+    """
+    Search financial news upstream with India-specific context added to the query.
+    Raises NewsSearchError when the upstream fails, times out or is saturated.
+    """
+    client = _get_client()
+    semaphore = _semaphore
+    try:
+        await asyncio.wait_for(semaphore.acquire(), NEWS_SEARCH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise NewsSearchError("Too many news searches in progress", timeout=True)
+
+    try:
+        response = await client.post("/search", json={
+            "api_key": TAVILY_API_KEY,
+            "query": f"{query} India finance market NSE BSE",
+            "search_depth": "advanced",
+            "max_results": max_results,
+            "include_domains": NEWS_DOMAINS,
+        })
+    except httpx.TimeoutException:
+        raise NewsSearchError("Tavily API timed out", timeout=True)
+    except httpx.HTTPError as e:
+        raise NewsSearchError(f"Tavily API unreachable: {e}")
+    finally:
+        semaphore.release()
+
+    if response.status_code != 200:
+        raise NewsSearchError(f"Tavily API error: {response.text}")
+    try:
+        data = response.json()
+    except ValueError:
+        raise NewsSearchError("Tavily API returned invalid JSON")
+    return {"results": _format_results(data), "query": query}
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as the cache key."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+async def cached_search_news(query: str, max_results: int = 5) -> Tuple[Dict, bool]:
+    """
+    Search with the result cache in front of the upstream.
+    Returns (result, fetched) where fetched is True only for the caller whose
+    request actually went upstream, so fresh results are persisted once.
+    """
+    key = (normalize_query(query), max_results)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return {**cached, "query": query}, False
+
+    loop = asyncio.get_running_loop()
+    future = _inflight.get(key)
+    fetched = future is None or future.get_loop() is not loop
+    if fetched:
+        future = asyncio.ensure_future(search_news(query, max_results))
+        _inflight[key] = future
+        future.add_done_callback(lambda done: _inflight.pop(key, None) if _inflight.get(key) is done else None)
+
+    # Shield the shared search so one caller disconnecting does not cancel it for the others
+    result = await asyncio.shield(future)
+    if fetched:
+        _search_cache.set(key, result)
+    return {**result, "query": query}, fetched
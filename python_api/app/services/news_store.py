@@ -0,0 +1,113 @@
+"""
+Persistence of fetched news articles into the news_items table.
+Articles are upserted by canonical URL, so repeated fetches refresh existing
+rows instead of adding duplicates, and new articles are clustered with
+near-duplicate stories (see news_dedup).
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from ..database.database import SessionLocal
+from ..models.models import IST, NewsItem
+from .news_dedup import article_signature, canonical_url, cluster_news_items
+
+def _parse_publish_date(value) -> datetime:
+    """
+    Parse an upstream publish date into naive UTC, as publish_date is stored, falling back to now when missing or malformed.
+    Dates without an offset are taken to be UTC.
+    """
+    if not isinstance(value, datetime):
+        text = str(value or "").strip()
+        try:
+            value = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                value = parsedate_to_datetime(text)  # RFC 2822, as some feeds send
+            except (TypeError, ValueError):
+                value = datetime.now(timezone.utc)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _article_fields(article: Dict, canonical: str) -> Dict:
+    """
+    Map a search result to NewsItem columns, trimmed to the column sizes.
+    A URL too long to store (e.g. with tracking parameters) is replaced by its canonical form, which fits.
+    """
+    url = article["url"].strip()
+    if len(url) > NewsItem.url.type.length:
+        url = canonical
+    return {
+        "title": (article.get("title") or "")[:255],
+        "content": article.get("content") or "",
+        "source": (article.get("source") or urlparse(url).netloc)[:100],
+        "url": url,
+        "publish_date": _parse_publish_date(article.get("publish_date")),
+    }
+
+def _upsert(db: Session, by_url: Dict[str, Dict], category: Optional[str]) -> int:
+    """
+    Bulk-update articles whose canonical URL is stored, bulk-insert and cluster the rest.
+    Returns the number of inserted articles that are not near-duplicates of stored ones.
+    """
+    existing = {
+        url: (item_id, item_category)
+        for url, item_id, item_category in db.execute(
+            select(NewsItem.canonical_url, NewsItem.id, NewsItem.category).where(NewsItem.canonical_url.in_(by_url))
+        )
+    }
+    inserts, updates = [], []
+    now = datetime.now(IST)
+    for url, fields in by_url.items():
+        if url in existing:
+            item_id, item_category = existing[url]
+            updates.append({"id": item_id, "category": item_category or category, "updated_at": now, **fields})
+        else:
+            signature = article_signature(fields["title"], fields["content"])
+            inserts.append({"category": category, "canonical_url": url, "minhash": signature, "updated_at": now, **fields})
+    if updates:
+        db.execute(update(NewsItem), updates)
+    if not inserts:
+        return 0
+    ids = db.execute(
+        insert(NewsItem).returning(NewsItem.id, sort_by_parameter_order=True), inserts
+    ).scalars().all()
+    return len(inserts) - cluster_news_items(db, [(item_id, values["minhash"]) for item_id, values in zip(ids, inserts)])
+
+def upsert_news_items(db: Session, articles: List[Dict], category: Optional[str] = None) -> Dict[str, int]:
+    """
+    Insert new articles and refresh existing ones (matched by canonical URL) in bulk statements.
+    New articles are clustered with near-duplicates already stored. A category is only
+    filled in, never overwritten. Returns the number of articles stored, and how many of
+    them are new stories (inserted, and not near-duplicates of stored articles).
+    """
+    by_url = {}
+    for article in articles:
+        url = canonical_url(article.get("url") or "")
+        if url:
+            by_url[url] = _article_fields(article, url)
+    if not by_url:
+        return {"stored": 0, "new": 0}
+
+    try:
+        new = _upsert(db, by_url, category)
+        db.commit()
+    except IntegrityError:
+        # Another writer stored one of the URLs first; retry, which now updates it
+        db.rollback()
+        new = _upsert(db, by_url, category)
+        db.commit()
+    return {"stored": len(by_url), "new": new}
+
+def store_search_results(articles: List[Dict], category: Optional[str] = None) -> Dict[str, int]:
+    """Upsert search results in a session of their own (for background tasks)."""
+    db = SessionLocal()
+    try:
+        return upsert_news_items(db, articles, category)
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+"""
+Password hashing on a dedicated process pool.
+bcrypt is deliberately CPU-heavy, so hashing and verification run in a small,
+size-bounded pool of worker processes instead of the request threadpool, and
+callers wait on it asynchronously. A bounded number of jobs may wait for a
+worker; past that, callers fail fast instead of queueing without limit.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from passlib.context import CryptContext
+from typing import Optional, Tuple
+
+# bcrypt cost factor (log2 rounds); hashes with another cost are upgraded on login
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", 12))
+# Worker processes for hashing (0 hashes in the default thread executor) and jobs allowed to wait for one
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 64))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=PASSWORD_HASH_ROUNDS)
+
+class PasswordHashBusy(Exception):
+    """Too many password hashing jobs are waiting for a worker."""
+
+def _lower_priority() -> None:
+    """Run hashing workers below the API process, so requests keep their CPU share during bursts."""
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+def _get_pool() -> Optional[Executor]:
+    """Create the shared hashing process pool on first use."""
+    global _pool
+    if PASSWORD_HASH_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, initializer=_lower_priority)
+        return _pool
+
+def shutdown_password_pool() -> None:
+    """Stop the hashing workers (on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def hash_password_sync(password: str) -> str:
+    """Hash a password with the configured cost, in the calling process."""
+    return pwd_context.hash(password)
+
+def verify_password_sync(password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password, in the calling process. Returns (valid, new_hash), where new_hash is
+    set when the stored hash uses outdated parameters. A missing hash still costs a full
+    verification, so unknown accounts cannot be told apart by timing.
+    """
+    if not hashed_password:
+        pwd_context.dummy_verify()
+        return False, None
+    try:
+        return pwd_context.verify_and_update(password, hashed_password)
+    except ValueError:
+        # Not a hash this context recognizes
+        return False, None
+
+async def _run(func, *args):
+    """Run func on the hashing pool without blocking the event loop."""
+    if not _slots.acquire(blocking=False):
+        raise PasswordHashBusy("Too many password operations in progress")
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), func, *args)
+    finally:
+        _slots.release()
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the hashing pool. Raises PasswordHashBusy when it is saturated."""
+    return await _run(hash_password_sync, password)
+
+async def verify_password(password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the hashing pool; see verify_password_sync."""
+    return await _run(verify_password_sync, password, hashed_password)
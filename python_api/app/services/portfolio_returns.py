@@ -0,0 +1,200 @@
+"""
+Returns analytics for investment cash flows: XIRR, CAGR and absolute returns.
+Each investment type's dated flows become one row of a padded matrix, and a
+vectorized Newton solver (with a bisection fallback) finds every XIRR at once.
+Positive investment amounts are purchases (SIP instalments, lump sums) and
+negative amounts are redemptions. All values are in INR.
+"""
+import numpy as np
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from ..models.models import FinancialData
+
+DAYS_PER_YEAR = 365.0
+_MIN_RATE = -0.9999
+_MAX_RATE = 100.0
+
+def _npv(rates: np.ndarray, flows: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Net present value of each row of flows at that row's rate."""
+    return np.sum(flows * (1.0 + rates[:, None]) ** -years, axis=1)
+
+def xirr_batch(flows: np.ndarray, years: np.ndarray, iterations: int = 50, tolerance: float = 1e-9) -> np.ndarray:
+    """
+    Solve XIRR for each row of a padded (instruments x flows) matrix.
+    years holds each flow's time in years since that row's first flow; padding
+    entries must have zero flow. Rows without a solution return NaN.
+    """
+    count = flows.shape[0]
+    rates = np.full(count, 0.1)
+    active = np.ones(count, dtype=bool)
+
+    # Newton iterations on all unconverged rows together
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        for _ in range(iterations):
+            if not active.any():
+                break
+            r = rates[active, None]
+            f, t = flows[active], years[active]
+            discount = (1.0 + r) ** -t
+            value = np.sum(f * discount, axis=1)
+            derivative = np.sum(-t * f * discount / (1.0 + r), axis=1)
+            step = np.where(derivative != 0, value / derivative, np.nan)
+            updated = np.clip(rates[active] - step, _MIN_RATE, _MAX_RATE)
+            done = np.abs(step) < tolerance
+            rates[active] = np.where(np.isfinite(updated), updated, np.nan)
+            active_indices = np.flatnonzero(active)
+            active[active_indices[done | ~np.isfinite(updated)]] = False
+
+    # Check residuals; fall back to bisection for rows Newton did not solve
+    scale = np.maximum(np.sum(np.abs(flows), axis=1), 1.0)
+    with np.errstate(over="ignore", invalid="ignore"):
+        residual = np.abs(_npv(np.nan_to_num(rates), flows, years)) / scale
+    unsolved = ~np.isfinite(rates) | (residual > 1e-6)
+    if unsolved.any():
+        rates[unsolved] = _bisect(flows[unsolved], years[unsolved])
+    return rates
+
+def _bisect(flows: np.ndarray, years: np.ndarray, iterations: int = 200) -> np.ndarray:
+    """Vectorized bisection over [_MIN_RATE, _MAX_RATE]; NaN where the NPV has no sign change."""
+    low = np.full(flows.shape[0], _MIN_RATE)
+    high = np.full(flows.shape[0], _MAX_RATE)
+    with np.errstate(over="ignore", invalid="ignore"):
+        low_value = _npv(low, flows, years)
+        high_value = _npv(high, flows, years)
+        bracketed = np.sign(low_value) != np.sign(high_value)
+        for _ in range(iterations):
+            middle = (low + high) / 2
+            middle_value = _npv(middle, flows, years)
+            same_side = np.sign(middle_value) == np.sign(low_value)
+            low = np.where(same_side, middle, low)
+            low_value = np.where(same_side, middle_value, low_value)
+            high = np.where(same_side, high, middle)
+    return np.where(bracketed, (low + high) / 2, np.nan)
+
+def pad_flows(codes: np.ndarray, days: np.ndarray, amounts: np.ndarray, groups: int):
+    """
+    Scatter flat (code, day, amount) flows into padded (groups x max flows) matrices.
+    Returns (amount matrix, day matrix, first day per group).
+    """
+    order = np.lexsort((days, codes))
+    codes, days, amounts = codes[order], days[order], amounts[order]
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    columns = np.arange(len(codes)) - starts[codes]
+
+    width = int(counts.max()) if len(codes) else 0
+    amount_matrix = np.zeros((groups, width))
+    day_matrix = np.zeros((groups, width))
+    amount_matrix[codes, columns] = amounts
+    day_matrix[codes, columns] = days
+    first_day = day_matrix[:, 0].copy()
+    day_matrix = np.where(np.arange(width)[None, :] < counts[:, None], day_matrix, first_day[:, None])
+    return amount_matrix, day_matrix, first_day
+
+def compute_returns(
+    types: List[str],
+    codes: np.ndarray,
+    days: np.ndarray,
+    amounts: np.ndarray,
+    current_values: np.ndarray,
+    valuation_day: float,
+) -> List[Dict]:
+    """
+    Compute returns for each group of investment flows.
+    codes index into types; days are ordinal days; current_values is per group.
+    """
+    groups = len(types)
+    amount_matrix, day_matrix, first_day = pad_flows(codes, days, amounts, groups)
+
+    # Investor's view: purchases are outflows, redemptions and current value are inflows
+    flows = np.concatenate([-amount_matrix, current_values[:, None]], axis=1)
+    years = (np.concatenate([day_matrix, np.full((groups, 1), valuation_day)], axis=1) - first_day[:, None]) / DAYS_PER_YEAR
+    rates = xirr_batch(flows, years)
+
+    invested = np.sum(np.where(amount_matrix > 0, amount_matrix, 0.0), axis=1)
+    redeemed = np.sum(np.where(amount_matrix < 0, -amount_matrix, 0.0), axis=1)
+    holding_years = (valuation_day - first_day) / DAYS_PER_YEAR
+    with np.errstate(divide="ignore", invalid="ignore"):
+        absolute = (current_values + redeemed - invested) / invested
+        # Undefined (None) when valued on, or before, the first investment day
+        cagr = np.where(
+            holding_years > 0,
+            ((current_values + redeemed) / invested) ** (1.0 / np.where(holding_years > 0, holding_years, 1.0)) - 1.0,
+            np.nan,
+        )
+
+    def clean(value: float) -> Optional[float]:
+        return round(float(value), 6) if np.isfinite(value) else None
+
+    return [
+        {
+            "type": types[index],
+            "invested": round(float(invested[index]), 2),
+            "redeemed": round(float(redeemed[index]), 2),
+            "current_value": round(float(current_values[index]), 2),
+            "absolute_return": clean(absolute[index]),
+            "cagr": clean(cagr[index]),
+            "xirr": clean(rates[index]),
+            "first_investment_date": datetime.fromordinal(int(first_day[index])),
+        }
+        for index in range(groups)
+    ]
+
+def compute_portfolio_returns(
+    db: Session,
+    user_id: int,
+    current_values: Dict[str, float],
+    valuation_date: Optional[datetime] = None,
+) -> Dict:
+    """
+    Compute XIRR, CAGR and absolute returns per investment type and for the
+    whole portfolio. Types without a current value are reported as unvalued.
+    """
+    valuation_date = valuation_date or datetime.now()
+    rows = db.execute(select(
+        FinancialData.type,
+        FinancialData.date,
+        FinancialData.amount,
+    ).where(
+        FinancialData.user_id == user_id,
+        FinancialData.category == "investment",
+        FinancialData.date.isnot(None),
+        FinancialData.amount.isnot(None),
+        FinancialData.date <= valuation_date,
+    )).all()
+
+    all_types = sorted({type_ for type_, _, _ in rows})
+    types = [type_ for type_ in all_types if type_ in current_values]
+    result = {
+        "valuation_date": valuation_date,
+        "instruments": [],
+        "portfolio": None,
+        "unvalued_types": [type_ for type_ in all_types if type_ not in current_values],
+    }
+    if not types:
+        return result
+
+    codes_by_type = {type_: index for index, type_ in enumerate(types)}
+    valued = [(codes_by_type[type_], date.toordinal(), amount) for type_, date, amount in rows if type_ in codes_by_type]
+    codes = np.array([code for code, _, _ in valued], dtype=np.int64)
+    days = np.array([day for _, day, _ in valued], dtype=np.float64)
+    amounts = np.array([amount for _, _, amount in valued], dtype=np.float64)
+    values = np.array([current_values[type_] for type_ in types], dtype=np.float64)
+    valuation_day = float(valuation_date.toordinal())
+
+    # Solve every instrument plus the combined portfolio (as one extra group) in one batch
+    portfolio_code = len(types)
+    results = compute_returns(
+        types + ["portfolio"],
+        np.concatenate([codes, np.full(len(codes), portfolio_code)]),
+        np.concatenate([days, days]),
+        np.concatenate([amounts, amounts]),
+        np.append(values, values.sum()),
+        valuation_day,
+    )
+    result["instruments"] = results[:-1]
+    result["portfolio"] = results[-1]
+    return result
@@ -0,0 +1,188 @@
+"""
+Table-driven Indian income tax engine for individuals (below 60 years).
+Slabs, standard deduction, section 87A rebate, surcharge and cess are versioned
+per financial year and regime, and every calculation is vectorized so arrays
+of incomes and deduction scenarios are evaluated in one call. All values are in INR.
+"""
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+ArrayLike = Union[float, List[float], np.ndarray]
+
+# Surcharge bands: (income above, rate); the new regime caps surcharge at 25%
+_OLD_SURCHARGE = [(5000000, 0.10), (10000000, 0.15), (20000000, 0.25), (50000000, 0.37)]
+_NEW_SURCHARGE = [(5000000, 0.10), (10000000, 0.15), (20000000, 0.25)]
+_OLD_SLABS = [(0, 0.0), (250000, 0.05), (500000, 0.20), (1000000, 0.30)]
+
+# (financial year, regime) -> rules; slabs are (lower bound, rate) in ascending order
+TAX_TABLES: Dict[str, Dict[str, Dict]] = {
+    "2023-24": {
+        "old": {
+            "slabs": _OLD_SLABS,
+            "standard_deduction": 50000,
+            "rebate_limit": 500000,
+            "max_rebate": 12500,
+            "rebate_marginal_relief": False,
+            "allows_deductions": True,
+            "surcharge": _OLD_SURCHARGE,
+            "cess": 0.04,
+        },
+        "new": {
+            "slabs": [(0, 0.0), (300000, 0.05), (600000, 0.10), (900000, 0.15), (1200000, 0.20), (1500000, 0.30)],
+            "standard_deduction": 50000,
+            "rebate_limit": 700000,
+            "max_rebate": 25000,
+            "rebate_marginal_relief": True,
+            "allows_deductions": False,
+            "surcharge": _NEW_SURCHARGE,
+            "cess": 0.04,
+        },
+    },
+    "2024-25": {
+        "old": {
+            "slabs": _OLD_SLABS,
+            "standard_deduction": 50000,
+            "rebate_limit": 500000,
+            "max_rebate": 12500,
+            "rebate_marginal_relief": False,
+            "allows_deductions": True,
+            "surcharge": _OLD_SURCHARGE,
+            "cess": 0.04,
+        },
+        "new": {
+            "slabs": [(0, 0.0), (300000, 0.05), (700000, 0.10), (1000000, 0.15), (1200000, 0.20), (1500000, 0.30)],
+            "standard_deduction": 75000,
+            "rebate_limit": 700000,
+            "max_rebate": 25000,
+            "rebate_marginal_relief": True,
+            "allows_deductions": False,
+            "surcharge": _NEW_SURCHARGE,
+            "cess": 0.04,
+        },
+    },
+    "2025-26": {
+        "old": {
+            "slabs": _OLD_SLABS,
+            "standard_deduction": 50000,
+            "rebate_limit": 500000,
+            "max_rebate": 12500,
+            "rebate_marginal_relief": False,
+            "allows_deductions": True,
+            "surcharge": _OLD_SURCHARGE,
+            "cess": 0.04,
+        },
+        "new": {
+            "slabs": [
+                (0, 0.0), (400000, 0.05), (800000, 0.10), (1200000, 0.15),
+                (1600000, 0.20), (2000000, 0.25), (2400000, 0.30),
+            ],
+            "standard_deduction": 75000,
+            "rebate_limit": 1200000,
+            "max_rebate": 60000,
+            "rebate_marginal_relief": True,
+            "allows_deductions": False,
+            "surcharge": _NEW_SURCHARGE,
+            "cess": 0.04,
+        },
+    },
+}
+REGIMES = ("old", "new")
+DEFAULT_REGIME = "new"
+
+def current_financial_year(today: Optional[datetime] = None) -> str:
+    """Return the Indian financial year (April-March) for a date, e.g. "2025-26"."""
+    today = today or datetime.now()
+    start = today.year if today.month >= 4 else today.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+def default_financial_year() -> str:
+    """The current financial year if a table exists for it, else the latest table."""
+    financial_year = current_financial_year()
+    return financial_year if financial_year in TAX_TABLES else max(TAX_TABLES)
+
+def get_tax_table(financial_year: str, regime: str) -> Dict:
+    """Look up the rules for a financial year and regime."""
+    try:
+        return TAX_TABLES[financial_year][regime]
+    except KeyError:
+        raise ValueError(f"No tax table for financial year {financial_year} under the {regime} regime")
+
+def slab_tax(taxable_income: np.ndarray, slabs: List) -> np.ndarray:
+    """Progressive slab tax for an array of taxable incomes."""
+    lowers = np.array([lower for lower, _ in slabs], dtype=np.float64)
+    rates = np.array([rate for _, rate in slabs], dtype=np.float64)
+    widths = np.append(np.diff(lowers), np.inf)
+    portions = np.clip(taxable_income[..., None] - lowers, 0, widths)
+    return portions @ rates
+
+def compute_tax(
+    gross_income: ArrayLike,
+    deductions: ArrayLike = 0.0,
+    financial_year: Optional[str] = None,
+    regime: str = DEFAULT_REGIME,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute income tax for arrays of gross incomes and deduction scenarios.
+    Inputs broadcast against each other (e.g. incomes[:, None] with deductions[None, :]).
+    Deductions (80C, 80D, ...) only apply under regimes that allow them.
+    """
+    table = get_tax_table(financial_year or default_financial_year(), regime)
+    gross_income = np.asarray(gross_income, dtype=np.float64)
+    deductions = np.asarray(deductions, dtype=np.float64)
+    if not table["allows_deductions"]:
+        deductions = np.zeros_like(deductions)
+
+    taxable_income = np.maximum(gross_income - table["standard_deduction"] - deductions, 0.0)
+    base_tax = slab_tax(taxable_income, table["slabs"])
+
+    # Section 87A rebate; in the new regime, tax just above the limit may not exceed the excess income
+    eligible = taxable_income <= table["rebate_limit"]
+    rebate = np.where(eligible, np.minimum(base_tax, table["max_rebate"]), 0.0)
+    if table["rebate_marginal_relief"]:
+        excess = taxable_income - table["rebate_limit"]
+        relief = np.where(~eligible, np.maximum(base_tax - excess, 0.0), 0.0)
+        rebate = rebate + relief
+    tax_after_rebate = base_tax - rebate
+
+    # Surcharge with marginal relief: tax + surcharge above a threshold may not exceed
+    # the tax + surcharge at that threshold plus the income above it
+    surcharge = np.zeros_like(tax_after_rebate)
+    bands = table["surcharge"]
+    for index, (threshold, rate) in enumerate(bands):
+        upper = bands[index + 1][0] if index + 1 < len(bands) else np.inf
+        in_band = (taxable_income > threshold) & (taxable_income <= upper)
+        if not np.any(in_band):
+            continue
+        previous_rate = bands[index - 1][1] if index > 0 else 0.0
+        tax_at_threshold = slab_tax(np.asarray(float(threshold)), table["slabs"]) * (1 + previous_rate)
+        full = tax_after_rebate * rate
+        capped = np.maximum(tax_at_threshold + (taxable_income - threshold) - tax_after_rebate, 0.0)
+        surcharge = np.where(in_band, np.minimum(full, capped), surcharge)
+
+    cess = (tax_after_rebate + surcharge) * table["cess"]
+    total_tax = tax_after_rebate + surcharge + cess
+    return {
+        "taxable_income": taxable_income,
+        "slab_tax": base_tax,
+        "rebate": rebate,
+        "surcharge": surcharge,
+        "cess": cess,
+        "total_tax": total_tax,
+    }
+
+def compare_regimes(
+    gross_income: ArrayLike,
+    deductions: ArrayLike = 0.0,
+    financial_year: Optional[str] = None,
+    regimes=REGIMES,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Evaluate the same income/deduction scenarios under several regimes."""
+    return {
+        regime: compute_tax(gross_income, deductions, financial_year, regime)
+        for regime in regimes
+    }
+
+def estimate_tax(gross_income: float, financial_year: Optional[str] = None, regime: str = DEFAULT_REGIME) -> float:
+    """Total tax for a single gross income with no deductions."""
+    return float(compute_tax(gross_income, 0.0, financial_year, regime)["total_tax"])
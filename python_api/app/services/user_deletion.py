@@ -0,0 +1,45 @@
+"""
+Deletion of users and everything they own.
+Child rows are removed by the database through ON DELETE CASCADE foreign keys,
+so deleting a user is a single statement that loads none of their documents,
+messages or financial data, however much they have. Uploaded files are
+removed from disk afterwards, outside the request.
+"""
+import os
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional
+
+from ..database.database import track_user_write
+from ..models.models import Document, User
+
+def purge_user(db: Session, user_id: int) -> Optional[List[str]]:
+    """
+    Delete a user and, by cascade, all of their rows, then commit.
+    Returns the paths of the user's uploaded files, to remove once committed,
+    or None if the user does not exist.
+    """
+    # Lock the user first, so no document can be added between reading the paths and the delete
+    if db.execute(select(User.id).where(User.id == user_id).with_for_update()).first() is None:
+        db.rollback()
+        return None
+    file_paths = db.execute(
+        select(Document.file_path).where(Document.user_id == user_id, Document.file_path.isnot(None))
+    ).scalars().all()
+    db.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False))
+    # Notifies user write listeners on commit, so caches keyed by the user id are dropped
+    track_user_write(db, user_id)
+    db.commit()
+    return file_paths
+
+def remove_user_files(file_paths: Iterable[str]) -> int:
+    """Remove uploaded files of a deleted user, skipping missing ones. Returns the number removed."""
+    removed = 0
+    for file_path in file_paths:
+        try:
+            os.remove(file_path)
+            removed += 1
+        except OSError:
+            # Already gone or not removable; the database rows are deleted either way
+            pass
+    return removed
@@ -0,0 +1,45 @@
+"""
+ETag helpers for conditional GETs on per-user resources.
+ETags are derived from the user's data version, which is bumped in the same
+transaction as every write to that user's data, so a matching If-None-Match
+can be answered with 304 before any data is queried.
+"""
+import hashlib
+from datetime import date
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+def user_etag(request: Request, user_id: int, data_version: int, valid_on: Optional[date] = None) -> str:
+    """
+    Weak ETag for a per-user resource at a data version.
+    The path and query string are hashed in, so each variant gets its own tag;
+    valid_on expires tags for responses that also depend on the current date.
+    """
+    variant = f"{request.url.path}?{request.url.query}|{valid_on or ''}"
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:12]
+    return f'W/"{user_id}-{data_version}-{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set the ETag on the response, and return a 304 response if the client
+    already has this version; otherwise return None.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
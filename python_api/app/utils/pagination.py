@@ -0,0 +1,31 @@
+"""
+Keyset (cursor) pagination helpers.
+Pages are ordered newest first by (timestamp, id) and the cursor is an opaque
+token holding the last row's sort key, so each page is an index range scan
+instead of an ever-growing OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import tuple_
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Encode the sort key of the last row on a page."""
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def before_cursor(timestamp_column, id_column, cursor: str):
+    """Filter clause for rows after the cursor in (timestamp desc, id desc) order."""
+    timestamp, row_id = decode_cursor(cursor)
+    return tuple_(timestamp_column, id_column) < (timestamp, row_id)
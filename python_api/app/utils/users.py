@@ -0,0 +1,53 @@
+"""
+User id checks shared by the per-user routes.
+Most routes only need to know that a user exists before touching their data,
+so known ids are kept in a small in-process cache: a repeat check costs no
+database round trip, and a miss selects the id alone rather than the whole
+users row. Ids are remembered when users are created and forgotten when they
+are deleted; the TTL bounds staleness after deletes made by other processes.
+"""
+import os
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.models import User
+from .cache import LRUCache
+
+USER_ID_CACHE_SIZE = int(os.getenv("USER_ID_CACHE_SIZE", 100000))
+USER_ID_CACHE_TTL = float(os.getenv("USER_ID_CACHE_TTL", 60))
+
+_known_user_ids = LRUCache(USER_ID_CACHE_SIZE, USER_ID_CACHE_TTL)
+
+def remember_user(user_id: int) -> None:
+    """Record that a user exists (e.g. right after creating it)."""
+    _known_user_ids.set(user_id, True)
+
+def forget_user(user_id: int) -> None:
+    """Drop a deleted user from the cache."""
+    _known_user_ids.pop(user_id)
+
+def _user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="User not found"
+    )
+
+def ensure_user_exists(db: Session, user_id: int) -> None:
+    """Raise 404 unless the user exists, querying only when the id is not cached."""
+    if _known_user_ids.get(user_id):
+        return
+    if db.execute(select(User.id).where(User.id == user_id)).first() is None:
+        raise _user_not_found()
+    remember_user(user_id)
+
+def user_data_version(db: Session, user_id: int) -> int:
+    """
+    The user's current data version, for ETags and sync cursors; raises 404 if the user
+    does not exist. Always read from the database, in the same query as the existence check.
+    """
+    version = db.execute(select(User.data_version).where(User.id == user_id)).scalar()
+    if version is None:
+        raise _user_not_found()
+    remember_user(user_id)
+    return version
@@ -0,0 +1,749 @@
+"""
+Benchmark script for performance-sensitive parts of the Financial Advisor API.
+Runs against a throwaway SQLite database unless BENCHMARK_DATABASE_URL is set.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Point the app at the benchmark database before importing app modules
+BENCHMARK_DB_FILE = "benchmark.db"
+os.environ["DATABASE_URL"] = os.environ.get("BENCHMARK_DATABASE_URL", f"sqlite:///./{BENCHMARK_DB_FILE}")
+
+# Add the parent directory to sys.path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+from sqlalchemy import insert
+
+from app.database.database import engine, Base, SessionLocal
+from app.models.models import User, FinancialData
+
+CATEGORY_TYPES = {
+    "income": ["salary", "dividend", "interest", "rental"],
+    "expense": ["rent", "groceries", "utilities", "travel", "dining", "emi"],
+    "investment": ["equity", "debt", "gold", "ppf", "epf", "nps"],
+    "asset": ["cash", "property", "vehicle"],
+    "liability": ["home_loan", "car_loan", "credit_card"],
+}
+
+def timed(func, *args, repeat=5, **kwargs):
+    """Run func repeat times and return (best seconds, peak MiB of the last run, result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / (1024 * 1024), result
+
+def report(label, seconds, peak_mib=None):
+    """Print a single benchmark line."""
+    line = f"  {label:<40} {seconds * 1000:10.2f} ms"
+    if peak_mib is not None:
+        line += f"  peak {peak_mib:8.2f} MiB"
+    print(line)
+
+def create_user(db, username):
+    """Create a benchmark user and return its id."""
+    user = User(username=username, email=f"{username}@example.com", full_name=username, password_hash="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+def generate_rows(user_id, count, years=3, seed=42):
+    """Generate random financial data rows spread over the last few years."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    categories = list(CATEGORY_TYPES)
+    rows = []
+    for _ in range(count):
+        category = rng.choice(categories)
+        rows.append({
+            "user_id": user_id,
+            "category": category,
+            "type": rng.choice(CATEGORY_TYPES[category]),
+            "amount": round(rng.uniform(100, 100000), 2),
+            "date": now - timedelta(days=rng.uniform(0, 365 * years)),
+            "recurring": False,
+        })
+    return rows
+
+def seed_user(db, username, count):
+    """Create a user with count financial data rows and return the user id."""
+    user_id = create_user(db, username)
+    rows = generate_rows(user_id, count)
+    for start in range(0, len(rows), 10000):
+        db.execute(insert(FinancialData), rows[start:start + 10000])
+    db.commit()
+    return user_id
+
+def python_loop_totals(db, user_id):
+    """Reference implementation: load ORM rows and sum them in Python."""
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    totals = {}
+    breakdown = {}
+    recent = {}
+    for data in db.query(FinancialData).filter(FinancialData.user_id == user_id).all():
+        totals[data.category] = totals.get(data.category, 0.0) + data.amount
+        key = (data.category, data.type)
+        breakdown[key] = breakdown.get(key, 0.0) + data.amount
+        if data.date >= thirty_days_ago:
+            recent[data.category] = recent.get(data.category, 0.0) + data.amount
+    return totals, breakdown, recent
+
+def bench_summary(db, rows):
+    """Financial summary: Python loop vs grouped SQL vs maintained aggregates."""
+    from app.services.financial_aggregates import scan_type_totals, rebuild_user_aggregates
+    from app.services.financial_summary import compute_financial_summary, query_recent_totals
+
+    user_id = seed_user(db, "bench_summary", rows)
+    rebuild_user_aggregates(db, user_id)
+    db.commit()
+    print(f"Financial summary over {rows} rows for one user")
+
+    seconds, peak, _ = timed(lambda: (python_loop_totals(db, user_id), db.expunge_all()))
+    report("python loop over ORM rows", seconds, peak)
+    seconds, peak, _ = timed(lambda: (scan_type_totals(db, user_id), query_recent_totals(db, user_id)))
+    report("grouped SQL aggregation", seconds, peak)
+    seconds, peak, _ = timed(compute_financial_summary, db, user_id)
+    report("maintained aggregates", seconds, peak)
+
+def bench_import(db, rows):
+    """Bulk CSV import throughput through the chunked import service."""
+    import io
+    import csv
+    from app.services.financial_import import import_financial_records, iter_csv_records
+
+    user_id = create_user(db, "bench_import")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["category", "type", "amount", "date", "description", "recurring", "frequency"])
+    for row in generate_rows(user_id, rows):
+        writer.writerow([row["category"], row["type"], row["amount"], row["date"].strftime("%d/%m/%Y"), "statement line", "no", ""])
+    buffer.seek(0)
+    print(f"Bulk CSV import of {rows} rows")
+
+    start = time.perf_counter()
+    result = import_financial_records(db, user_id, iter_csv_records(buffer))
+    seconds = time.perf_counter() - start
+    report("chunked multi-row insert", seconds)
+    print(f"  {result['imported'] / seconds:,.0f} rows/sec ({result['failed']} failed)")
+
+def python_loop_rollup(columns, period):
+    """Reference implementation: bucket and sum rollups one row at a time."""
+    from app.services.financial_rollups import bucket_label
+
+    sums = {}
+    categories = columns["categories"]
+    types = columns["types"]
+    for month_number, amount, category, type_ in zip(
+        columns["month"].tolist(), columns["amount"].tolist(), columns["category"].tolist(), columns["type"].tolist()
+    ):
+        year, month = divmod(month_number, 12)
+        fy_start = year + 1970 - (month < 3)
+        if period == "month":
+            bucket = month_number
+        elif period == "quarter":
+            bucket = fy_start * 4 + ((month - 3) % 12) // 3
+        else:
+            bucket = fy_start
+        key = (categories[category], types[type_], bucket)
+        sums[key] = sums.get(key, 0.0) + amount
+    return {(category, type_, bucket_label(bucket, period)): total for (category, type_, bucket), total in sums.items()}
+
+def bench_rollup(db, rows):
+    """Trend rollups: per-row Python loop vs vectorized NumPy bucketing."""
+    from app.services.financial_rollups import load_columns, rollup_columns, get_rollup
+
+    user_id = seed_user(db, "bench_rollup", rows)
+    print(f"Rollups over {rows} rows for one user")
+
+    seconds, _, columns = timed(load_columns, db, user_id)
+    report("load columns into NumPy", seconds)
+    for period in ("month", "quarter", "fy"):
+        seconds, _, _ = timed(python_loop_rollup, columns, period)
+        report(f"python loop ({period})", seconds)
+        seconds, _, _ = timed(rollup_columns, columns, period)
+        report(f"numpy bucketing ({period})", seconds)
+    get_rollup(db, user_id, "month")
+    seconds, _, _ = timed(get_rollup, db, user_id, "month")
+    report("cached rollup", seconds)
+
+def bench_projection(db, rows):
+    """Recurring cash-flow projection: hundreds of recurring items over 30 years."""
+    import numpy as np
+    from app.services.cash_flow_projection import project_cash_flows
+
+    rng = np.random.default_rng(42)
+    item_count = 500
+    items = {
+        "amount": rng.uniform(500, 100000, item_count),
+        "category": rng.integers(0, 3, item_count),
+        "interval": rng.choice([1, 3, 6, 12], item_count),
+        "anchor": rng.integers(2020 * 12, 2026 * 12, item_count),
+    }
+    print(f"Cash-flow projection of {item_count} recurring items over 30 years")
+
+    seconds, peak, _ = timed(project_cash_flows, items, 2026 * 12, 360, 0.06, 0.08, 0.10, 0.0)
+    report("vectorized projection", seconds, peak)
+
+def bench_simulation(db, rows):
+    """Monte Carlo goal simulation throughput in paths/sec."""
+    from app.services import monte_carlo
+
+    allocation = {"equity": 600000, "debt": 200000, "gold": 50000, "ppf": 100000, "epf": 300000, "nps": 100000}
+    paths = 100000
+    print(f"Monte Carlo simulation of {paths} paths over 30 years")
+
+    def simulate():
+        return monte_carlo.run_simulation(allocation, 50000000, 30, 1350000, 25000, 0.05, paths=paths, seed=1)
+
+    for workers in (0, os.cpu_count() or 1):
+        monte_carlo.SIMULATION_WORKERS = workers
+        seconds, _, _ = timed(simulate, repeat=3)
+        report(f"{max(workers, 1)} worker(s)", seconds)
+        print(f"  {paths / seconds:,.0f} paths/sec")
+
+def bench_returns(db, rows):
+    """XIRR/CAGR for 30 funds with 10 years of monthly SIP instalments each."""
+    import numpy as np
+    from app.services.portfolio_returns import compute_returns
+
+    rng = np.random.default_rng(42)
+    funds, instalments = 30, 120
+    start_day = datetime(2015, 1, 5).toordinal()
+    codes = np.repeat(np.arange(funds), instalments)
+    days = np.tile(start_day + np.arange(instalments) * 30.4, funds)
+    amounts = rng.choice([1000.0, 2500.0, 5000.0, 10000.0], funds).repeat(instalments)
+    current_values = amounts[::instalments] * instalments * rng.uniform(1.2, 2.5, funds)
+    valuation_day = float(start_day + instalments * 30.4)
+    types = [f"fund_{index}" for index in range(funds)] + ["portfolio"]
+    print(f"Returns for {funds} funds x {instalments} SIP instalments plus the portfolio")
+
+    def solve():
+        return compute_returns(
+            types,
+            np.concatenate([codes, np.full(len(codes), funds)]),
+            np.concatenate([days, days]),
+            np.concatenate([amounts, amounts]),
+            np.append(current_values, current_values.sum()),
+            valuation_day,
+        )
+
+    seconds, _, _ = timed(solve)
+    report("vectorized XIRR/CAGR", seconds)
+
+def bench_anomalies(db, rows):
+    """Batch expense anomaly detection across many users."""
+    from app.services.anomaly_detection import run_anomaly_detection
+
+    users = 1000
+    per_user = max(rows // users, 10)
+    user_ids = [create_user(db, f"bench_anomalies_{index}") for index in range(users)]
+    data = []
+    for index, user_id in enumerate(user_ids):
+        data.extend(generate_rows(user_id, per_user, seed=index))
+    for start in range(0, len(data), 10000):
+        db.execute(insert(FinancialData), data[start:start + 10000])
+    db.commit()
+    print(f"Anomaly detection over {users} users x {per_user} rows")
+
+    seconds, peak, result = timed(run_anomaly_detection, db, user_ids, repeat=3)
+    report("batched NumPy detection", seconds, peak)
+    print(f"  {result['anomalies']} anomalies, {users * per_user / seconds:,.0f} rows/sec")
+
+def explain(db, query):
+    """Return the database's query plan for an ORM query as text."""
+    from sqlalchemy import text
+
+    statement = query.statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN" if db.bind.dialect.name == "sqlite" else "EXPLAIN"
+    return "\n".join(" ".join(str(value) for value in row) for row in db.execute(text(f"{prefix} {statement}")))
+
+def bench_listing(db, rows):
+    """Paginated financial data listing: first page, deep keyset page and filtered pages."""
+    from app.utils.pagination import encode_cursor, before_cursor
+
+    user_id = seed_user(db, "bench_listing", rows)
+    for other in range(3):
+        seed_user(db, f"bench_listing_other_{other}", rows // 10)
+    print(f"Financial data listing over {rows} rows for one user (plus {rows * 3 // 10} for other users)")
+
+    order = (FinancialData.date.desc(), FinancialData.id.desc())
+    base = db.query(FinancialData).filter(FinancialData.user_id == user_id)
+    middle = base.order_by(*order).offset(rows // 2).first()
+    cursor = encode_cursor(middle.date, middle.id)
+    start_date = datetime.now() - timedelta(days=90)
+    queries = {
+        "first page": base.order_by(*order).limit(101),
+        "keyset page (middle)": base.filter(before_cursor(FinancialData.date, FinancialData.id, cursor)).order_by(*order).limit(101),
+        "offset page (middle)": base.order_by(*order).offset(rows // 2).limit(101),
+        "category + last 90 days": base.filter(
+            FinancialData.category == "expense", FinancialData.date >= start_date
+        ).order_by(*order).limit(101),
+    }
+    for label, query in queries.items():
+        seconds, _, _ = timed(lambda: (query.all(), db.expunge_all()))
+        report(label, seconds)
+    for label in ("keyset page (middle)", "category + last 90 days"):
+        print(f"  plan for {label}:")
+        for line in explain(db, queries[label]).splitlines():
+            print(f"    {line}")
+
+def bench_export(db, rows):
+    """Streaming CSV export vs building the whole listing in memory."""
+    import json
+    from app.services.exports import FINANCIAL_DATA_COLUMNS, financial_data_export_query, stream_export
+
+    user_id = seed_user(db, "bench_export", rows)
+    print(f"Export of {rows} rows for one user")
+
+    def in_memory():
+        data = db.query(FinancialData).filter(FinancialData.user_id == user_id).all()
+        body = json.dumps([{column: getattr(item, column) for column in FINANCIAL_DATA_COLUMNS} for item in data], default=str)
+        db.expunge_all()
+        return len(body)
+
+    def streamed(compress):
+        query = financial_data_export_query(user_id)
+        return sum(len(chunk) for chunk in stream_export(query, FINANCIAL_DATA_COLUMNS, "csv", user_id, compress))
+
+    seconds, peak, _ = timed(in_memory, repeat=1)
+    report("ORM list serialised in memory", seconds, peak)
+    seconds, peak, size = timed(streamed, False, repeat=1)
+    report("streamed CSV", seconds, peak)
+    print(f"  {rows / seconds:,.0f} rows/sec, {size / (1024 * 1024):.1f} MiB")
+    seconds, peak, size = timed(streamed, True, repeat=1)
+    report("streamed CSV, gzip", seconds, peak)
+    print(f"  {rows / seconds:,.0f} rows/sec, {size / (1024 * 1024):.1f} MiB")
+
+def bench_batch_summary(db, rows):
+    """Financial summaries for 10,000 users: one call per user vs the batched stream."""
+    from sqlalchemy import func, select
+    from app.models.models import FinancialAggregate
+    from app.services.financial_summary import compute_financial_summary, stream_financial_summaries
+
+    users = 10000
+    per_user = max(rows // users, 5)
+    user_ids = []
+    for start in range(0, users, 1000):
+        batch = [
+            {"username": f"bench_batch_{index}", "email": f"bench_batch_{index}@example.com", "full_name": "", "password_hash": "x"}
+            for index in range(start, start + 1000)
+        ]
+        user_ids.extend(db.execute(insert(User).returning(User.id), batch).scalars())
+    data = []
+    for index, user_id in enumerate(user_ids):
+        data.extend(generate_rows(user_id, per_user, years=1, seed=index))
+        if len(data) >= 10000:
+            db.execute(insert(FinancialData), data)
+            data = []
+    if data:
+        db.execute(insert(FinancialData), data)
+    db.execute(insert(FinancialAggregate).from_select(
+        ["user_id", "category", "type", "total_amount", "row_count"],
+        select(FinancialData.user_id, FinancialData.category, FinancialData.type, func.sum(FinancialData.amount), func.count())
+        .where(FinancialData.user_id >= min(user_ids))  # Only the users seeded here; earlier benchmarks have aggregates of their own
+        .group_by(FinancialData.user_id, FinancialData.category, FinancialData.type),
+    ))
+    db.commit()
+    print(f"Financial summaries for {users} users x {per_user} rows")
+
+    sample = user_ids[:1000]
+    seconds, _, _ = timed(lambda: [compute_financial_summary(db, user_id) for user_id in sample], repeat=1)
+    report("per-user calls (1,000 users)", seconds)
+    print(f"  ~{seconds * users / len(sample):.1f} s extrapolated to {users} users")
+    seconds, peak, size = timed(lambda: sum(len(chunk) for chunk in stream_financial_summaries(user_ids)), repeat=1)
+    report(f"batched NDJSON stream ({users} users)", seconds, peak)
+    seconds, _, _ = timed(lambda: sum(len(chunk) for chunk in stream_financial_summaries()), repeat=1)
+    report("batched NDJSON stream (all users)", seconds)
+
+def bench_sync(db, rows):
+    """Delta sync of 10 changes vs a full sync of a user's financial data."""
+    from app.services.sync import sync_changes
+
+    user_id = seed_user(db, "bench_sync", rows)
+    db.add(FinancialData(user_id=user_id, category="expense", type="rent", amount=1.0))
+    db.commit()  # Stamps the seeded rows with the first data version
+    since = db.get(User, user_id).data_version
+    for index, item in enumerate(db.query(FinancialData).filter(FinancialData.user_id == user_id).limit(10)):
+        if index % 2:
+            db.delete(item)
+        else:
+            item.amount += 1
+        db.commit()
+    version = db.get(User, user_id).data_version
+    print(f"Sync of {rows} rows for one user, 10 changes since the client's cursor")
+
+    seconds, peak, result = timed(lambda: sync_changes(db, FinancialData, user_id, version, since), repeat=5)
+    report("delta sync", seconds, peak)
+    print(f"  {len(result['items'])} items, {len(result['deleted'])} deleted")
+    seconds, peak, _ = timed(lambda: (sync_changes(db, FinancialData, user_id, version), db.expunge_all()), repeat=1)
+    report("full sync", seconds, peak)
+
+def generate_articles(count, duplicate_share=0.2, seed=42):
+    """Generate news articles where duplicate_share are lightly edited copies of earlier ones."""
+    rng = random.Random(seed)
+    vocabulary = [f"word{index}" for index in range(20000)]
+    articles, originals = [], []
+    for index in range(count):
+        if originals and rng.random() < duplicate_share:
+            words = rng.choice(originals).split()
+            for _ in range(rng.randint(1, 4)):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            content, duplicate = " ".join(words), True
+        else:
+            content, duplicate = " ".join(rng.choices(vocabulary, k=60)), False
+            originals.append(content)
+        articles.append(({
+            "title": f"Story {index}",
+            "content": content,
+            "url": f"https://news{index % 50}.example.com/{index}?utm_source=feed",
+            "publish_date": datetime.now().isoformat(),
+        }, duplicate))
+    return articles
+
+def bench_news_dedup(db, rows):
+    """News ingest with canonical-URL and near-duplicate (MinHash LSH) deduplication."""
+    import numpy as np
+    from app.models.models import NewsItem
+    from app.services.news_dedup import article_signature
+    from app.services.news_store import upsert_news_items
+
+    articles = generate_articles(rows)
+    print(f"Ingest of {rows} articles, {sum(duplicate for _, duplicate in articles)} near-duplicates")
+    start = time.perf_counter()
+    for offset in range(0, rows, 500):
+        upsert_news_items(db, [article for article, _ in articles[offset:offset + 500]], "markets")
+    report("ingest (500 per batch)", time.perf_counter() - start)
+    print(f"  {rows / (time.perf_counter() - start):,.0f} articles/sec")
+
+    found = db.query(NewsItem).filter(NewsItem.cluster_id.isnot(None)).count()
+    print(f"  {found} articles clustered as duplicates")
+
+    # One more ingest batch of 10 against the full table vs comparing with every stored signature
+    batch = [article for article, _ in generate_articles(10, duplicate_share=0.0, seed=7)]
+    for article in batch:
+        article["url"] = article["url"].replace("example.com", "example.org")
+    signatures = np.stack([np.frombuffer(value, dtype="<u4") for (value,) in db.query(NewsItem.minhash)])
+    seconds, _, _ = timed(upsert_news_items, db, batch, "markets", repeat=1)
+    report("10-article batch with LSH", seconds)
+    new = [np.frombuffer(article_signature(article["title"], article["content"]), dtype="<u4") for article in batch]
+    seconds, _, _ = timed(lambda: [(signatures == values).mean(axis=1).max() for values in new], repeat=3)
+    report("10 articles vs all signatures", seconds)
+
+def bench_news_search(db, rows):
+    """Local BM25 news search over stored articles vs a LIKE scan."""
+    import numpy as np
+    from app.models.models import NewsItem
+    from app.services.news_index import NewsSearchIndex, search_stored_news, get_news_index, stop_news_index
+
+    # Zipf-distributed vocabulary, so common terms have long postings lists
+    rng = np.random.RandomState(42)
+    vocabulary = np.array([f"term{index}" for index in range(50000)])
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    words = vocabulary[rng.choice(len(vocabulary), size=(rows, 48), p=weights / weights.sum())]
+    now = datetime.now()
+    for offset in range(0, rows, 50000):
+        db.execute(insert(NewsItem), [
+            {
+                "title": " ".join(words[index, :8]),
+                "content": " ".join(words[index, 8:]),
+                "url": f"https://example.com/search/{index}",
+                "canonical_url": f"https://example.com/search/{index}",
+                "publish_date": now - timedelta(minutes=index % 525600),
+            }
+            for index in range(offset, min(offset + 50000, rows))
+        ])
+        db.commit()
+    print(f"Search over {rows} stored articles")
+
+    index = NewsSearchIndex()
+    seconds, _, _ = timed(index.refresh, repeat=1)
+    report("index build", seconds)
+    arrays = [array for segment in index._segments for array in (segment.ids, segment.timestamps, segment.docs, segment.impacts)]
+    print(f"  {sum(array.nbytes for array in arrays) / 2 ** 20:,.0f} MiB of postings")
+
+    queries = {
+        "rare term": "term40000",
+        "common term": "term3",
+        "three terms": "term10 term200 term3000",
+        "five common terms": "term1 term2 term4 term5 term6",
+    }
+    for label, query in queries.items():
+        seconds, _, hits = timed(index.search, query, 10, repeat=20)
+        report(f"BM25 {label}", seconds)
+    get_news_index().__dict__.update(index.__dict__)
+    seconds, _, _ = timed(search_stored_news, "term10 term200 term3000", 10, repeat=20)
+    report("search with row fetch", seconds)
+    stop_news_index()
+    seconds, _, _ = timed(lambda: db.query(NewsItem.id).filter(NewsItem.content.like("%term40000 %")).limit(10).all(), repeat=1)
+    report("LIKE scan for a rare term (unranked)", seconds)
+
+def bench_news_feed(db, rows):
+    """News feeds: first page, deep keyset page and category pages, with query plans."""
+    from app.models.models import NewsItem
+    from app.services.news_feed import news_feed_query
+    from app.utils.pagination import encode_cursor
+
+    categories = ["markets", "economy", "banking", "stocks", "mutual funds", "personal finance", "tax"]
+    now = datetime.now()
+    for offset in range(0, rows, 50000):
+        db.execute(insert(NewsItem), [
+            {
+                "title": f"Story {index}",
+                "content": "",
+                "url": f"https://example.com/feed/{index}",
+                "canonical_url": f"https://example.com/feed/{index}",
+                "category": categories[index % len(categories)],
+                "publish_date": now - timedelta(seconds=index * 30),
+                "cluster_id": 1 if index % 10 == 9 else None,  # 10% near-duplicates
+            }
+            for index in range(offset, min(offset + 50000, rows))
+        ])
+        db.commit()
+    print(f"News feeds over {rows} articles")
+
+    middle = news_feed_query(db).offset(rows // 3).first()
+    cursor = encode_cursor(middle.publish_date, middle.id)
+    queries = {
+        "first page": news_feed_query(db).limit(11),
+        "keyset page (middle)": news_feed_query(db, cursor=cursor).limit(11),
+        "offset page (middle)": news_feed_query(db).offset(rows // 3).limit(11),
+        "category first page": news_feed_query(db, "tax").limit(11),
+        "category keyset page (middle)": news_feed_query(db, "tax", cursor).limit(11),
+    }
+    for label, query in queries.items():
+        seconds, _, _ = timed(lambda: (query.all(), db.expunge_all()))
+        report(label, seconds)
+    for label in ("keyset page (middle)", "category keyset page (middle)"):
+        print(f"  plan for {label}:")
+        for line in explain(db, queries[label]).splitlines():
+            print(f"    {line}")
+
+def bench_news_feeds(db, rows):
+    """Personalized news feeds for 10,000 users: batched precompute, then stored reads vs ranking on request."""
+    from app.models.models import FinancialAggregate, NewsItem
+    from app.services.news_personalization import get_user_news_feed, refresh_news_feeds
+
+    users, articles = 10000, min(rows, 20000)
+    rng = random.Random(47)
+    now = datetime.now()
+    topics = ["stocks rally on sensex", "gold and bullion prices", "rbi repo rate and bank loans", "new tax regime deductions",
+              "nps and ppf retirement returns", "housing and property prices", "mutual fund sip inflows", "inflation and gdp outlook"]
+    db.execute(insert(NewsItem), [
+        {
+            "title": f"{topics[index % len(topics)]} {index}",
+            "content": " ".join(rng.choices(topics, k=3)),
+            "url": f"https://example.com/feeds/{index}",
+            "canonical_url": f"https://example.com/feeds/{index}",
+            "publish_date": now - timedelta(seconds=index * 50),
+        }
+        for index in range(articles)
+    ])
+    user_ids = []
+    for start in range(0, users, 1000):
+        batch = [
+            {"username": f"bench_feeds_{index}", "email": f"bench_feeds_{index}@example.com", "full_name": "", "password_hash": "x"}
+            for index in range(start, start + 1000)
+        ]
+        user_ids.extend(db.execute(insert(User).returning(User.id), batch).scalars())
+    types = ["equity", "gold", "ppf", "nps", "mutual_funds", "fd", "property"]
+    db.execute(insert(FinancialAggregate), [
+        {"user_id": user_id, "category": "investment", "type": investment, "total_amount": float(rng.randint(1000, 100000)), "row_count": 1}
+        for user_id in user_ids
+        for investment in rng.sample(types, 2)
+    ])
+    db.commit()
+    print(f"Personalized feeds for {users} users over {articles} recent articles")
+
+    seconds, peak, result = timed(refresh_news_feeds, db, repeat=1)
+    report("batched precompute (all users)", seconds, peak)
+    print(f"  {result['entries']} feed entries, {users / seconds:,.0f} users/sec")
+    seconds, _, _ = timed(lambda: refresh_news_feeds(db, user_ids[:1]))
+    report("ranking one user on request", seconds)
+    seconds, _, _ = timed(lambda: (get_user_news_feed(db, user_ids[users // 2], 20), db.expunge_all()))
+    report("stored feed read (20 items)", seconds)
+
+def bench_signups(db, rows):
+    """Sign-ups/sec through the API with bcrypt on the worker pool vs in request threads, and a read's latency meanwhile."""
+    import asyncio
+    import httpx
+    from app import create_app
+    from app.services import passwords
+
+    signups, concurrency = 48, 16
+    user_id = create_user(db, "bench_signups_reader")
+    print(f"{signups} sign-ups, {concurrency} at a time, bcrypt cost {passwords.PASSWORD_HASH_ROUNDS}")
+
+    async def burst(label, prefix):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app()), base_url="http://bench") as client:
+            semaphore = asyncio.Semaphore(concurrency)
+            latencies = []
+
+            async def signup(index):
+                async with semaphore:
+                    response = await client.post("/api/users/", json={
+                        "username": f"{prefix}_{index}", "email": f"{prefix}_{index}@example.com", "password": "correct horse battery"
+                    })
+                    response.raise_for_status()
+
+            async def read_user():
+                while True:
+                    start = time.perf_counter()
+                    await client.get(f"/api/users/{user_id}")
+                    latencies.append(time.perf_counter() - start)
+                    await asyncio.sleep(0.01)
+
+            reader = asyncio.create_task(read_user())
+            start = time.perf_counter()
+            await asyncio.gather(*(signup(index) for index in range(signups)))
+            seconds = time.perf_counter() - start
+            reader.cancel()
+            latencies.sort()
+            report(f"{label}: {signups / seconds:,.1f} sign-ups/sec", seconds)
+            print(f"  concurrent GET /api/users/{{id}}: p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+                  f"max {latencies[-1] * 1000:.1f} ms over {len(latencies)} reads")
+
+    workers = passwords.PASSWORD_HASH_WORKERS
+    try:
+        passwords.PASSWORD_HASH_WORKERS = 0
+        asyncio.run(burst("request threads", "bench_threads"))
+        passwords.PASSWORD_HASH_WORKERS = workers or 2
+        asyncio.run(burst(f"worker pool ({passwords.PASSWORD_HASH_WORKERS} processes)", "bench_pool"))
+    finally:
+        passwords.shutdown_password_pool()
+        passwords.PASSWORD_HASH_WORKERS = workers
+
+def bench_user_check(db, rows):
+    """User existence checks: loading the users row vs the cached id check, and statements per request."""
+    from sqlalchemy import event
+    from fastapi.testclient import TestClient
+    from app import create_app
+    from app.utils.users import ensure_user_exists, forget_user
+
+    user_id = create_user(db, "bench_user_check")
+    print("User existence check before per-user routes")
+
+    def load_row():
+        db.query(User).filter(User.id == user_id).first()
+        db.expunge_all()
+
+    def uncached():
+        forget_user(user_id)
+        ensure_user_exists(db, user_id)
+
+    for label, check in (("users row query", load_row), ("id-only query", uncached), ("cached id", lambda: ensure_user_exists(db, user_id))):
+        seconds, _, _ = timed(lambda: [check() for _ in range(1000)])
+        report(f"{label} (x1000)", seconds)
+
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with TestClient(create_app()) as client:
+            forget_user(user_id)
+            for attempt in ("first", "repeat"):
+                statements.clear()
+                client.get(f"/api/financial-data/anomalies/{user_id}").raise_for_status()
+                print(f"  GET /api/financial-data/anomalies/{{id}} ({attempt}): {len(statements)} statements")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+def bench_user_delete(db, rows):
+    """Deleting a heavy user: ORM cascades loading every child row vs database-side ON DELETE CASCADE."""
+    from app.models.models import ChatMessage, Document
+    from app.services.user_deletion import purge_user
+
+    documents, messages, blob = 500, 20000, "A" * 50000
+
+    def seed_heavy_user(username):
+        user_id = seed_user(db, username, rows)
+        db.execute(insert(Document), [
+            {"user_id": user_id, "title": f"Statement {index}", "category": "investment", "file_type": "pdf", "content_base64": blob}
+            for index in range(documents)
+        ])
+        for start in range(0, messages, 10000):
+            db.execute(insert(ChatMessage), [
+                {"user_id": user_id, "message": f"Message {index}", "is_user": index % 2 == 0}
+                for index in range(start, min(start + 10000, messages))
+            ])
+        db.commit()
+        return user_id
+
+    def orm_delete(db, user_id):
+        # What cascade="all, delete-orphan" did without passive_deletes: load and delete each child
+        user = db.get(User, user_id)
+        for relation in ("documents", "chat_messages", "financial_data", "financial_aggregates", "expense_anomalies", "sync_tombstones", "news_feed"):
+            for child in getattr(user, relation):
+                db.delete(child)
+        db.delete(user)
+        db.commit()
+
+    print(f"Deleting a user with {rows} financial rows, {documents} documents ({len(blob) // 1000} KB each) and {messages} messages")
+    for label, delete_user in (("ORM cascade", orm_delete), ("ON DELETE CASCADE", purge_user)):
+        # Deletion cannot be repeated, so the timed and the traced run each get a user of their own
+        user_ids = [seed_heavy_user(f"bench_delete_{label.split()[0].lower()}_{run}") for run in range(2)]
+        start = time.perf_counter()
+        delete_user(db, user_ids[0])
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        delete_user(db, user_ids[1])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report(label, seconds, peak / (1024 * 1024))
+
+BENCHMARKS = {
+    "summary": bench_summary,
+    "import": bench_import,
+    "rollup": bench_rollup,
+    "projection": bench_projection,
+    "simulation": bench_simulation,
+    "returns": bench_returns,
+    "anomalies": bench_anomalies,
+    "listing": bench_listing,
+    "export": bench_export,
+    "batch_summary": bench_batch_summary,
+    "sync": bench_sync,
+    "news_dedup": bench_news_dedup,
+    "news_search": bench_news_search,
+    "news_feed": bench_news_feed,
+    "news_feeds": bench_news_feeds,
+    "signups": bench_signups,
+    "user_check": bench_user_check,
+    "user_delete": bench_user_delete,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Financial Advisor API")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--rows", type=int, default=100000, help="Financial data rows per user")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for name in args.benchmarks or BENCHMARKS:
+            BENCHMARKS[name](db, args.rows)
+            print()
+    finally:
+        db.close()
+        if "BENCHMARK_DATABASE_URL" not in os.environ and os.path.exists(BENCHMARK_DB_FILE):
+            os.remove(BENCHMARK_DB_FILE)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Script to run expense anomaly detection for all users (e.g. nightly from cron).
+Stores spikes and duplicate charges in the expense_anomalies table.
+"""
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+# Load environment variables
+load_dotenv()
+
+# Import needed modules
+from app.database.database import SessionLocal
+from app.services.anomaly_detection import run_anomaly_detection, USERS_PER_BATCH
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detect expense anomalies for all users")
+    parser.add_argument("--user-id", type=int, action="append", help="Only process this user (repeatable)")
+    parser.add_argument("--users-per-batch", type=int, default=USERS_PER_BATCH, help="Users analysed per transaction")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = run_anomaly_detection(db, args.user_id, args.users_per_batch)
+        elapsed = time.perf_counter() - start
+        print(f"Processed {result['users']} user(s), found {result['anomalies']} anomalies in {elapsed:.2f}s")
+    finally:
+        db.close()
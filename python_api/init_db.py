@@ -5,24 +5,97 @@ Creates all tables and adds initial data if needed.
 import os
 import sys
 from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import AddConstraint, CreateTable
 
 # Add the parent directory to sys.path to import app modules
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__)))
 sys.path.append(parent_dir)
 
 # Import needed modules
-from app.database.database import engine, Base
-from app.models.models import User, Document, ChatMessage, FinancialData, NewsItem
+from app.database.database import engine, Base, SessionLocal
+from app.models.models import User, Document, ChatMessage, FinancialData, FinancialAggregate, ExpenseAnomaly, SyncTombstone, NewsItem, NewsLSHBucket, UserNewsFeed
+from app.services.news_dedup import backfill_news_dedup
 
 # Load environment variables
 load_dotenv()
 
+def update_foreign_keys(inspector):
+    """
+    Recreate foreign keys whose ON DELETE action changed since their table was created
+    (e.g. the cascades from users). PostgreSQL constraints are replaced in place;
+    SQLite cannot alter constraints, so those tables are rebuilt and their rows copied over.
+    """
+    for table in Base.metadata.sorted_tables:
+        existing = {
+            (tuple(fk["constrained_columns"]), fk["referred_table"]): fk
+            for fk in inspector.get_foreign_keys(table.name)
+        }
+        stale = []
+        for constraint in table.foreign_key_constraints:
+            current = existing.get((tuple(constraint.column_keys), constraint.referred_table.name))
+            if current is not None and (current["options"].get("ondelete") or "").upper() != (constraint.ondelete or "").upper():
+                stale.append((constraint, current["name"]))
+        if not stale:
+            continue
+
+        if engine.dialect.name == "sqlite":
+            columns = ", ".join(f'"{column.name}"' for column in table.columns)
+            ddl = str(CreateTable(table).compile(dialect=engine.dialect)).strip()
+            with engine.connect() as connection:
+                # Foreign keys must be off while the referenced table is dropped and replaced
+                connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+                connection.commit()
+                with connection.begin():
+                    connection.exec_driver_sql(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {table.name}_rebuild ", 1))
+                    connection.exec_driver_sql(f"INSERT INTO {table.name}_rebuild ({columns}) SELECT {columns} FROM {table.name}")
+                    connection.exec_driver_sql(f"DROP TABLE {table.name}")
+                    connection.exec_driver_sql(f"ALTER TABLE {table.name}_rebuild RENAME TO {table.name}")
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+                connection.commit()
+        else:
+            with engine.begin() as connection:
+                for constraint, name in stale:
+                    connection.execute(text(f"ALTER TABLE {table.name} DROP CONSTRAINT {name}"))
+                    connection.execute(AddConstraint(constraint))
+        print(f"Updated foreign keys of {table.name}")
+
 def init_db():
     """Initialize the database by creating all tables."""
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
     print("Database tables created successfully!")
 
+    # create_all skips existing tables, so add columns and indexes introduced since they were created
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+                not_null = " NOT NULL" if not column.nullable and default else ""
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{default}{not_null}"))
+                print(f"Added column {table.name}.{column.name}")
+
+    update_foreign_keys(inspector)
+
+    # Canonical URLs must be filled in (and duplicates clustered) before their unique index is created
+    db = SessionLocal()
+    try:
+        processed = backfill_news_dedup(db)
+    finally:
+        db.close()
+    if processed:
+        print(f"Deduplicated {processed} existing news items")
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    print("Database columns and indexes up to date!")
+
 if __name__ == "__main__":
     print("Initializing database for Financial Advisor API...")
     init_db()
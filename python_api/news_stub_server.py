@@ -0,0 +1,66 @@
+"""
+Local stub of the Tavily search API for testing news search without network access.
+Point the API at it with TAVILY_API_URL=http://127.0.0.1:8765 and any TAVILY_API_KEY.
+"""
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def create_stub_app(delay: float = 0.0, fail_every: int = 0) -> FastAPI:
+    """
+    Create a stub app that answers /search after delay seconds, failing every Nth call.
+    Call counts, the peak number of concurrent calls and the client connections seen
+    are kept in app.state.stats, for tests.
+    """
+    app = FastAPI(title="Tavily stub")
+    stats = app.state.stats = {"calls": 0, "in_flight": 0, "max_in_flight": 0, "connections": set()}
+
+    @app.post("/search")
+    async def search(request: Request):
+        body = await request.json()
+        stats["calls"] += 1
+        call = stats["calls"]
+        # Keep-alive requests share a connection, and with it the client address
+        stats["connections"].add((request.client.host, request.client.port))
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            stats["in_flight"] -= 1
+        if fail_every and call % fail_every == 0:
+            return JSONResponse({"error": "stub failure"}, status_code=502)
+
+        query = body.get("query", "")
+        now = datetime.now()
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"Stub result {index + 1} for {query}",
+                    "content": f"Stub article {index + 1} about {query}.",
+                    "url": f"https://example.com/news/{abs(hash(query)) % 100000}/{index + 1}",
+                    "published_date": (now - timedelta(hours=index)).isoformat(),
+                    "source": "example.com",
+                    "score": round(1.0 - index * 0.1, 2),
+                }
+                for index in range(int(body.get("max_results", 5)))
+            ],
+        }
+
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local Tavily search stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every Nth call with HTTP 502")
+
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.delay, args.fail_every), host=args.host, port=args.port, log_level="error")
@@ -0,0 +1,67 @@
+"""
+Script to verify and repair the per-user financial aggregates.
+Recomputes each user's totals from financial_data and reports or fixes any drift.
+"""
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+# Load environment variables
+load_dotenv()
+
+# Import needed modules
+from app.database.database import SessionLocal
+from app.models.models import User
+from app.services.financial_aggregates import find_drift, rebuild_user_aggregates
+
+def rebuild_aggregates(user_ids=None, verify_only=False):
+    """
+    Check the aggregates of the given users (default: all users).
+    Drifted users are rebuilt unless verify_only is set.
+    Returns the number of users with drift.
+    """
+    db = SessionLocal()
+    try:
+        if not user_ids:
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+
+        drifted = 0
+        for user_id in user_ids:
+            drift = find_drift(db, user_id)
+            if not drift:
+                continue
+            drifted += 1
+            print(f"User {user_id}: {len(drift)} drifted aggregate(s)")
+            for entry in drift:
+                print(
+                    f"  {entry['category']}/{entry['type']}: "
+                    f"stored {entry['stored_total']:.2f} ({entry['stored_count']} rows), "
+                    f"actual {entry['actual_total']:.2f} ({entry['actual_count']} rows)"
+                )
+            if not verify_only:
+                rebuild_user_aggregates(db, user_id)
+                db.commit()
+                print(f"  Rebuilt aggregates for user {user_id}")
+
+        print(f"Checked {len(user_ids)} user(s), {drifted} with drift")
+        return drifted
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify and rebuild per-user financial aggregates")
+    parser.add_argument("--user-id", type=int, action="append", help="Only check this user (repeatable)")
+    parser.add_argument("--verify", action="store_true", help="Report drift without repairing it")
+
+    args = parser.parse_args()
+
+    drifted = rebuild_aggregates(args.user_id, verify_only=args.verify)
+
+    # Non-zero exit status lets schedulers alert on drift in verify mode
+    if args.verify and drifted:
+        sys.exit(1)
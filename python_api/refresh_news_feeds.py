@@ -0,0 +1,37 @@
+"""
+Script to rebuild personalized news feeds (e.g. from cron when background ingestion is disabled).
+Stores each user's ranked articles in the user_news_feeds table.
+"""
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+# Load environment variables
+load_dotenv()
+
+# Import needed modules
+from app.database.database import SessionLocal
+from app.services.news_personalization import refresh_news_feeds, USERS_PER_BATCH, NEWS_FEED_SIZE
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild personalized news feeds for all users")
+    parser.add_argument("--user-id", type=int, action="append", help="Only process this user (repeatable)")
+    parser.add_argument("--users-per-batch", type=int, default=USERS_PER_BATCH, help="Users ranked per transaction")
+    parser.add_argument("--feed-size", type=int, default=NEWS_FEED_SIZE, help="Articles stored per user")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = refresh_news_feeds(db, args.user_id, args.users_per_batch, args.feed_size)
+        elapsed = time.perf_counter() - start
+        print(f"Ranked news for {result['users']} user(s), stored {result['entries']} feed entries in {elapsed:.2f}s")
+    finally:
+        db.close()
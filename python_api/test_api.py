@@ -91,6 +91,15 @@ def test_api(base_url="http://localhost:8000"):
             news = response.json()
             print(f"Found {len(news)} news items")
         
+        # Test news search (run news_stub_server.py and set TAVILY_API_URL to avoid calling Tavily)
+        print("\nTesting news search...")
+        response = requests.post(f"{base_url}/api/news/search", json={"query": "Nifty 50", "max_results": 3}, timeout=30)
+        print(f"Status: {response.status_code}")
+        if response.status_code == 200:
+            print(f"Found {len(response.json()['results'])} search results")
+        else:
+            print(f"Response: {response.text}")
+        
         print("\nAPI tests completed")
         
     except requests.exceptions.ConnectionError:
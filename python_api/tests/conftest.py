@@ -0,0 +1,88 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database, and the local Tavily
+stub (news_stub_server.py) served on a free port in a background thread.
+"""
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Configure the app before it is imported: a scratch database and no background ingestion
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ["NEWS_INGEST_ENABLED"] = "false"
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from news_stub_server import create_stub_app
+
+class StubServer:
+    """A running stub: its base URL and the stub app's call statistics."""
+
+    def __init__(self, delay: float = 0.0, fail_every: int = 0):
+        self.app = create_stub_app(delay, fail_every)
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._socket.getsockname()[1]}"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, log_level="error"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True)
+
+    @property
+    def stats(self):
+        return self.app.state.stats
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Stub server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(10)
+        self._socket.close()
+
+@pytest.fixture
+def stub_server():
+    """Start stubs with stub_server(delay=..., fail_every=...); they are stopped after the test."""
+    servers = []
+
+    def start(delay: float = 0.0, fail_every: int = 0) -> StubServer:
+        servers.append(StubServer(delay, fail_every).start())
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+@pytest.fixture
+def client():
+    """A test client of the app, with the database tables created."""
+    from app import create_app
+    from app.database.database import Base, engine
+    import app.models.models
+
+    Base.metadata.create_all(bind=engine)
+    with TestClient(create_app()) as client:
+        yield client
+
+@pytest.fixture
+def news_search(monkeypatch):
+    """The news_search module with a key set and a fresh client, semaphore and cache."""
+    from app.services import news_search
+
+    monkeypatch.setattr(news_search, "TAVILY_API_KEY", "test")
+    monkeypatch.setattr(news_search, "_client", None)
+    monkeypatch.setattr(news_search, "_semaphore", None)
+    monkeypatch.setattr(news_search, "_client_loop", None)
+    news_search._search_cache.clear()
+    news_search._inflight.clear()
+    yield news_search
+    news_search._search_cache.clear()
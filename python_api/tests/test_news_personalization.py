@@ -0,0 +1,38 @@
+"""
+Publish dates of stored news and the ages feeds are ranked with: upstream
+dates with a "Z" or another offset are stored as naive UTC, whatever the
+server's local time zone.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+@pytest.fixture
+def kolkata_time(monkeypatch):
+    """Run with the server's local time zone set to Asia/Kolkata (UTC+05:30)."""
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+@pytest.mark.parametrize("offset", [timezone.utc, timezone(timedelta(hours=5, minutes=30)), timezone(timedelta(hours=-4))])
+def test_feed_age_of_offset_publish_date(client, kolkata_time, offset):
+    from app.database.database import SessionLocal
+    from app.models.models import NewsItem
+    from app.services.news_personalization import _age_days
+    from app.services.news_store import upsert_news_items
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    published = (now - timedelta(hours=6)).astimezone(offset).isoformat().replace("+00:00", "Z")
+    url = f"https://example.com/dated-{published}"
+    db = SessionLocal()
+    try:
+        upsert_news_items(db, [{"title": f"Dated story {published}", "content": "", "url": url, "publish_date": published}])
+        stored = db.query(NewsItem).filter(NewsItem.url == url).one().publish_date
+    finally:
+        db.close()
+
+    assert stored == (now - timedelta(hours=6)).replace(tzinfo=None)
+    assert _age_days([stored], now.replace(tzinfo=None))[0] == pytest.approx(0.25)
@@ -0,0 +1,144 @@
+"""
+News search against the local Tavily stub: timeouts and the routes' fallbacks,
+the concurrency limit, client reuse and sharing of identical searches.
+"""
+import asyncio
+
+import pytest
+
+def run(news_search, coroutine):
+    """Run a coroutine on a new event loop, closing the shared client before the loop ends."""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await news_search.close_news_client()
+    return asyncio.run(main())
+
+def test_search_returns_stub_results(news_search, stub_server, monkeypatch):
+    stub = stub_server()
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+
+    result = run(news_search, news_search.search_news("repo rate", 3))
+
+    assert result["query"] == "repo rate"
+    assert len(result["results"]) == 3
+    assert result["results"][0]["title"].startswith("Stub result 1")
+
+def test_slow_upstream_times_out(news_search, stub_server, monkeypatch):
+    stub = stub_server(delay=1.0)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+    monkeypatch.setattr(news_search, "NEWS_SEARCH_READ_TIMEOUT", 0.2)
+
+    with pytest.raises(news_search.NewsSearchError) as error:
+        run(news_search, news_search.search_news("repo rate"))
+    assert error.value.timeout
+
+def test_upstream_error_is_not_a_timeout(news_search, stub_server, monkeypatch):
+    stub = stub_server(fail_every=1)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+
+    with pytest.raises(news_search.NewsSearchError) as error:
+        run(news_search, news_search.search_news("repo rate"))
+    assert not error.value.timeout
+
+def test_search_route_falls_back_to_stored_results_on_timeout(news_search, stub_server, monkeypatch, client):
+    from app.api import news
+
+    stub = stub_server(delay=1.0)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+    monkeypatch.setattr(news_search, "NEWS_SEARCH_READ_TIMEOUT", 0.2)
+    stored = {"title": "RBI keeps repo rate unchanged", "content": "", "url": "https://example.com/rbi", "publish_date": None, "source": "example.com", "score": 1.0}
+    monkeypatch.setattr(news, "search_stored_news", lambda query, limit: [stored])
+
+    response = client.post("/api/news/search", json={"query": "repo rate", "max_results": 3})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [stored]
+    assert response.json()["local_hits"] == 1
+
+def test_search_route_returns_504_on_timeout_without_stored_results(news_search, stub_server, monkeypatch, client):
+    from app.api import news
+
+    stub = stub_server(delay=1.0)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+    monkeypatch.setattr(news_search, "NEWS_SEARCH_READ_TIMEOUT", 0.2)
+    monkeypatch.setattr(news, "search_stored_news", lambda query, limit: [])
+
+    response = client.post("/api/news/search", json={"query": "repo rate", "max_results": 3})
+
+    assert response.status_code == 504
+
+def test_category_route_returns_empty_list_on_timeout(news_search, stub_server, monkeypatch, client):
+    stub = stub_server(delay=1.0)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+    monkeypatch.setattr(news_search, "NEWS_SEARCH_READ_TIMEOUT", 0.2)
+
+    response = client.get("/api/news/category/unknown-category")
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_concurrent_searches_are_limited(news_search, stub_server, monkeypatch):
+    stub = stub_server(delay=0.2)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+    monkeypatch.setattr(news_search, "NEWS_SEARCH_CONCURRENCY", 2)
+
+    async def search_all():
+        return await asyncio.gather(*(news_search.search_news(f"query {index}") for index in range(6)))
+
+    results = run(news_search, search_all())
+
+    assert len(results) == 6
+    assert stub.stats["calls"] == 6
+    assert stub.stats["max_in_flight"] == 2
+
+def test_saturated_searches_fail_fast(news_search, stub_server, monkeypatch):
+    stub = stub_server(delay=0.5)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+    monkeypatch.setattr(news_search, "NEWS_SEARCH_CONCURRENCY", 1)
+    monkeypatch.setattr(news_search, "NEWS_SEARCH_QUEUE_TIMEOUT", 0.1)
+
+    async def search_both():
+        return await asyncio.gather(
+            news_search.search_news("first"), news_search.search_news("second"), return_exceptions=True
+        )
+
+    results = run(news_search, search_both())
+
+    errors = [result for result in results if isinstance(result, news_search.NewsSearchError)]
+    assert len(errors) == 1
+    assert errors[0].timeout
+    assert stub.stats["calls"] == 1
+
+def test_client_and_connection_are_reused(news_search, stub_server, monkeypatch):
+    stub = stub_server()
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+
+    async def search_in_turn():
+        clients = []
+        for index in range(5):
+            await news_search.search_news(f"query {index}")
+            clients.append(news_search._get_client())
+        return clients
+
+    clients = run(news_search, search_in_turn())
+
+    assert all(client is clients[0] for client in clients)
+    assert stub.stats["calls"] == 5
+    assert len(stub.stats["connections"]) == 1
+
+def test_identical_searches_share_one_upstream_call(news_search, stub_server, monkeypatch):
+    stub = stub_server(delay=0.2)
+    monkeypatch.setattr(news_search, "TAVILY_API_URL", stub.url)
+
+    async def search_same():
+        first = await asyncio.gather(*(news_search.cached_search_news("Repo  Rate") for _ in range(5)))
+        second = await news_search.cached_search_news("repo rate")
+        return first, second
+
+    first, second = run(news_search, search_same())
+
+    assert stub.stats["calls"] == 1
+    assert sum(fetched for _, fetched in first) == 1
+    assert second[1] is False